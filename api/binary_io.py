@@ -0,0 +1,137 @@
+"""
+Binary batch formats for POST /predict/batch/binary
+Large batches skip JSON and pydantic entirely: the body is mapped into a
+NumPy view and the PredictRequest range checks run vectorized over columns.
+
+    application/x-npy                     a .npy (n_rows, 3) float32/float64 matrix,
+                                          columns temperature, humidity, hour;
+                                          answered with a .npy float64 vector
+    application/vnd.apache.arrow.stream   an Arrow IPC stream with temperature,
+                                          humidity and hour columns; answered with
+                                          a one-column (predicted_energy) stream.
+                                          Needs pyarrow (415 without it)
+"""
+import io
+
+import numpy as np
+from fastapi import HTTPException
+
+NPY = "application/x-npy"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+FEATURES = ("temperature", "humidity", "hour")
+# Same bounds as PredictRequest in api/main.py.
+FEATURE_RANGES = {"temperature": (0, 60), "humidity": (0, 100), "hour": (0, 23)}
+
+# np.save writes about 128 bytes of header for a 2-D float matrix; anything far
+# larger is not ours and is rejected before the header dict is parsed.
+MAX_NPY_HEADER_SIZE = 4096
+NPY_HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+def _unsupported(detail: str) -> HTTPException:
+    return HTTPException(status_code=415, detail=detail)
+
+
+def _invalid(detail: str) -> HTTPException:
+    return HTTPException(status_code=422, detail=detail)
+
+
+# ── .npy ─────────────────────────────────────────────────────────────────────
+def read_npy(body: bytes) -> np.ndarray:
+    """
+    (n_rows, 3) view over the bytes of a .npy body, without copying.
+    Only the header is parsed in Python, by NumPy's own reader and capped at
+    MAX_NPY_HEADER_SIZE bytes; the data is used in place.
+    """
+    stream = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(stream)
+    except ValueError:
+        raise _invalid("Body is not a .npy file.")
+    if version not in NPY_HEADER_READERS:
+        raise _invalid(f"Unsupported .npy format version {version[0]}.{version[1]}.")
+    try:
+        shape, fortran_order, dtype = NPY_HEADER_READERS[version](stream, max_header_size=MAX_NPY_HEADER_SIZE)
+    except (ValueError, SyntaxError, KeyError, TypeError, RecursionError, MemoryError) as exc:
+        raise _invalid(f"Malformed .npy header: {exc}")
+
+    if dtype.kind != "f" or dtype.itemsize not in (4, 8):
+        raise _invalid(f".npy dtype must be float32 or float64, got {dtype}.")
+    if len(shape) != 2 or shape[1] != len(FEATURES):
+        raise _invalid(f".npy shape must be (n_rows, {len(FEATURES)}), got {shape}.")
+
+    offset = stream.tell()
+    count = shape[0] * shape[1]
+    if len(body) - offset != count * dtype.itemsize:
+        raise _invalid(".npy data length does not match its header.")
+    data = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+    return data.reshape(shape[::-1]).T if fortran_order else data.reshape(shape)
+
+
+def write_npy(values: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, values, allow_pickle=False)
+    return buffer.getvalue()
+
+
+# ── Arrow ────────────────────────────────────────────────────────────────────
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise _unsupported(f"{ARROW_STREAM} requires pyarrow on the server: pip install pyarrow")
+    return pa
+
+
+def read_arrow(body: bytes) -> dict:
+    """{feature: 1-D array} from an Arrow IPC stream; zero-copy for null-free float columns."""
+    pa = _pyarrow()
+    try:
+        table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    except (pa.ArrowInvalid, OSError) as exc:
+        raise _invalid(f"Body is not an Arrow IPC stream: {exc}")
+    missing = [name for name in FEATURES if name not in table.column_names]
+    if missing:
+        raise _invalid(f"Arrow stream is missing column(s): {', '.join(missing)}.")
+
+    columns = {}
+    for name in FEATURES:
+        column = table.column(name)
+        if column.null_count:
+            raise _invalid(f"{name} contains {column.null_count} null value(s).")
+        if not (pa.types.is_floating(column.type) or pa.types.is_integer(column.type)):
+            raise _invalid(f"{name} must be numeric, got {column.type}.")
+        columns[name] = column.combine_chunks().to_numpy()
+    return columns
+
+
+def write_arrow(values: np.ndarray, model_version: str = None) -> bytes:
+    pa = _pyarrow()
+    metadata = {"model_version": model_version} if model_version else None
+    table = pa.table({"predicted_energy": values}).replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# ── Validation ───────────────────────────────────────────────────────────────
+def validate_columns(columns: dict):
+    """PredictRequest's range checks over whole columns; 422 naming the first bad row."""
+    for name in FEATURES:
+        values = columns[name]
+        low, high = FEATURE_RANGES[name]
+        bad = ~((values >= low) & (values <= high))       # NaN fails both comparisons
+        if name == "hour":
+            bad |= values != np.floor(values)
+        if bad.any():
+            row = int(np.argmax(bad))
+            raise _invalid(
+                f"Row {row}: {name} must be between {low} and {high}"
+                f"{' and a whole number' if name == 'hour' else ''}, got {values[row]} "
+                f"({int(bad.sum())} invalid row(s))."
+            )
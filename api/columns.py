@@ -0,0 +1,23 @@
+"""
+Helpers for converting between request rows and NumPy columns in batch routes.
+"""
+from fastapi import HTTPException
+
+from api.config import MAX_BATCH_SIZE
+
+
+def rows_to_columns(rows: list) -> dict:
+    """Transpose a list of pydantic models into {field: list of values}."""
+    if len(rows) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(rows)} rows exceeds the limit of {MAX_BATCH_SIZE}.",
+        )
+    fields = type(rows[0]).model_fields
+    return {name: [getattr(row, name) for row in rows] for name in fields}
+
+
+def breakdown_rows(breakdown: dict) -> list:
+    """Transpose {category: array} into a list of {category: float} dicts."""
+    columns = {cat: values.tolist() for cat, values in breakdown.items()}
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
@@ -0,0 +1,72 @@
+"""
+Runtime settings for the GreenMind AI API.
+Every value can be overridden through an environment variable.
+"""
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+# Worker processes forked by the pre-fork server (python -m api.serve).
+WORKERS = _env_int("GREENMIND_WORKERS", os.cpu_count() or 1)
+
+# Maximum number of rows accepted by a single batch request.
+MAX_BATCH_SIZE = _env_int("GREENMIND_MAX_BATCH_SIZE", 10000)
+
+# Maximum number of rows accepted by POST /predict/batch/binary (.npy / Arrow bodies).
+MAX_BINARY_BATCH_SIZE = _env_int("GREENMIND_MAX_BINARY_BATCH_SIZE", 1_000_000)
+
+# Longest hourly series accepted by POST /predict/forecast (default: 8 weeks).
+MAX_FORECAST_HOURS = _env_int("GREENMIND_MAX_FORECAST_HOURS", 8 * 7 * 24)
+
+# Opt-in micro-batching of concurrent single-row /predict calls (see api/microbatch.py).
+MICROBATCH_ENABLED = _env_int("GREENMIND_MICROBATCH", 0) == 1
+MICROBATCH_WINDOW_MS = _env_float("GREENMIND_MICROBATCH_WINDOW_MS", 2.0)
+MICROBATCH_MAX_SIZE = _env_int("GREENMIND_MICROBATCH_MAX_SIZE", 256)
+
+# Opt-in cache of /predict results on rounded inputs (see api/prediction_cache.py).
+PREDICTION_CACHE_ENABLED = _env_int("GREENMIND_PREDICTION_CACHE", 0) == 1
+# Also predict the whole rounded grid whenever a model loads, if it has at most MAX_GRID_CELLS cells
+# (built in the background; about 10 µs per cell on one core).
+PREDICTION_CACHE_GRID = _env_int("GREENMIND_PREDICTION_CACHE_GRID", 0) == 1
+PREDICTION_CACHE_MAX_GRID_CELLS = _env_int("GREENMIND_PREDICTION_CACHE_MAX_GRID_CELLS", 500_000)
+# With the grid on, the default steps are coarser so it fits under MAX_GRID_CELLS (121 × 101 × 24 = 293k).
+PREDICTION_CACHE_TEMPERATURE_STEP = _env_float(
+    "GREENMIND_PREDICTION_CACHE_TEMPERATURE_STEP", 0.5 if PREDICTION_CACHE_GRID else 0.1,
+)
+PREDICTION_CACHE_HUMIDITY_STEP = _env_float(
+    "GREENMIND_PREDICTION_CACHE_HUMIDITY_STEP", 1.0 if PREDICTION_CACHE_GRID else 0.5,
+)
+PREDICTION_CACHE_MAX_ENTRIES = _env_int("GREENMIND_PREDICTION_CACHE_MAX_ENTRIES", 100_000)
+
+# Enables GET /debug/profile (on-demand sampling profiler). Off by default.
+PROFILER_ENABLED = _env_int("GREENMIND_PROFILER", 0) == 1
+
+# Forecasts longer than this many hours are streamed instead of built in one piece.
+FORECAST_STREAM_HOURS = _env_int("GREENMIND_FORECAST_STREAM_HOURS", 7 * 24)
+
+# Most shiftable loads per POST /predict/schedule request, and the default / maximum
+# time (ms) its optimizer may spend improving the greedy placement.
+MAX_SCHEDULE_LOADS = _env_int("GREENMIND_MAX_SCHEDULE_LOADS", 1000)
+SCHEDULE_TIME_BUDGET_MS = _env_float("GREENMIND_SCHEDULE_TIME_BUDGET_MS", 100.0)
+MAX_SCHEDULE_TIME_BUDGET_MS = _env_float("GREENMIND_MAX_SCHEDULE_TIME_BUDGET_MS", 2000.0)
+
+# Cache-Control max-age (seconds) for GET /api/dashboard/summary and GET /api/tips.
+REFERENCE_MAX_AGE = _env_int("GREENMIND_REFERENCE_MAX_AGE", 300)
+
+# Where each worker persists its cohort percentile sketches (see models/percentile_sketch.py).
+SKETCH_DIR = os.environ.get("GREENMIND_SKETCH_DIR") or os.path.join(ROOT, "data", "cohort_sketches")
+
+# SQLite file that keeps submitted profiles and dashboard aggregates (see data/submissions.py).
+# Set to an empty string to keep nothing.
+SUBMISSIONS_DB = os.environ.get("GREENMIND_SUBMISSIONS_DB", os.path.join(ROOT, "data", "submissions.db"))
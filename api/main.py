@@ -3,56 +3,111 @@ GreenMind AI – FastAPI Backend
 Provides energy usage prediction via a trained RandomForest model.
 
 Endpoints:
-    GET  /          → Health check
-    POST /predict   → Energy prediction (kWh)
-    GET  /docs      → Swagger UI (auto-generated)
+    GET  /               → Health check
+    POST /predict        → Energy prediction (kWh), optionally micro-batched (api/microbatch.py)
+    POST /predict/batch  → Energy predictions for many rows in one model call
+    POST /predict/batch/binary → The same for .npy / Arrow bodies, without JSON (api/binary_io.py)
+    POST /predict/forecast → Hourly kWh curve, daily totals and peaks for a weather series
+    POST /predict/schedule → Shiftable appliances placed in low-demand hours (models/load_shifter.py)
+    GET  /predict/cache/stats → Hit rate of the optional /predict cache (api/prediction_cache.py)
+    GET  /predict/drift  → PSI/KS drift of this worker's inputs vs the training data (models/drift.py)
+    /api/...             → Carbon footprint, score, tips, scenario and dashboard routes (api/routes)
+    GET  /metrics        → Prometheus metrics (api/metrics.py)
+    GET  /docs           → Swagger UI (auto-generated)
 """
 
+import json
 import os
 import sys
+import time
 from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
 
-import joblib
 import numpy as np
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, field_validator
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, field_validator, model_validator
+from starlette.concurrency import run_in_threadpool
+
+from api.config import (
+    FORECAST_STREAM_HOURS, MAX_BATCH_SIZE, MAX_BINARY_BATCH_SIZE, MAX_FORECAST_HOURS, MAX_SCHEDULE_LOADS,
+    MAX_SCHEDULE_TIME_BUDGET_MS, MICROBATCH_ENABLED, MICROBATCH_MAX_SIZE, MICROBATCH_WINDOW_MS,
+    PREDICTION_CACHE_ENABLED, PREDICTION_CACHE_GRID, PREDICTION_CACHE_HUMIDITY_STEP, PREDICTION_CACHE_MAX_ENTRIES,
+    PREDICTION_CACHE_MAX_GRID_CELLS, PREDICTION_CACHE_TEMPERATURE_STEP, PROFILER_ENABLED, SCHEDULE_TIME_BUDGET_MS,
+)
+from api import binary_io, metrics
+from api.metrics import MetricsMiddleware, TimedRoute, stage
+from api.microbatch import MicroBatcher
+from api.prediction_cache import PredictionCache
+from data.registry import reference_data
+from api.routes import carbon, dashboard, scenarios, score, tips
+from api.services import cohort_ranks, submissions
+from models import load_shifter
+from models.drift import MIN_ROWS, DriftMonitor
+from models.model_registry import ModelRegistry
 
 # Ensure stdout can handle utf-8 characters properly on Windows
 sys.stdout.reconfigure(encoding='utf-8')
 
 # ── Paths ───────────────────────────────────────────────────────────────────
 ROOT       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-MODEL_PATH = os.path.join(ROOT, "models", "energy_model.pkl")
+MODEL_PATH = os.path.join(ROOT, "models", "energy_model")   # versioned artifacts exported by models/train.py
 
-# ── Model loader ─────────────────────────────────────────────────────────────
-model = None
+# ── Model registry ───────────────────────────────────────────────────────────
+# The forest is served from the pickle-free artifacts written by
+# models/train.py: memory-mapped NumPy arrays evaluated by ForestEngine.
+# Neither joblib nor sklearn is imported at serve time. A background thread
+# loads and warms up the version named in models/energy_model/CURRENT and
+# swaps it in atomically; newly published versions are picked up the same
+# way, without a restart.
+models = ModelRegistry(MODEL_PATH)
+models.on_load(lambda version, ok: metrics.MODEL_LOADS.inc("success" if ok else "failure"))
+reference_data.on_reload(lambda snapshot: metrics.REFERENCE_RELOADS.inc())
+metrics.info("greenmind_model_info", "Active model version.", ("version",),
+             lambda: (models.active()[0],) if models.active()[0] else None)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load the ML model on startup; release on shutdown."""
-    global model
-    if os.path.exists(MODEL_PATH):
-        try:
-            model = joblib.load(MODEL_PATH)
-            print(f"✅  Model loaded from: {MODEL_PATH}")
-        except Exception as e:
-            print(f"❌ Error loading model: {e}")
-    else:
-        # On Vercel, the path might be slightly different or the model might not exist if not trained
-        print(f"⚠️  Model not found at '{MODEL_PATH}'.")
+    """Start the background model loader; stop it and flush cohort sketches and queued submissions on shutdown."""
+    models.start()
     yield
-    model = None
+    models.stop()
+    cohort_ranks.close()
+    if submissions is not None:
+        submissions.close()
 
 
-# Ensure model is checked before each prediction if lifespan hasn't run fully or for simplicity in serverless
 def get_model():
-    global model
-    if model is None:
-        if os.path.exists(MODEL_PATH):
-            model = joblib.load(MODEL_PATH)
-    return model
+    """
+    Active (version, engine); loads synchronously only if nothing is loaded yet (e.g. serverless).
+    Sync callers only: async routes use require_model_async, which never blocks the event loop.
+    """
+    return models.get()
+
+
+# Both are consulted on the event loop, so they read the active pair without ever loading.
+batcher = MicroBatcher(models.active, MICROBATCH_WINDOW_MS, MICROBATCH_MAX_SIZE) if MICROBATCH_ENABLED else None
+
+prediction_cache = PredictionCache(
+    models.active, PREDICTION_CACHE_TEMPERATURE_STEP, PREDICTION_CACHE_HUMIDITY_STEP,
+    PREDICTION_CACHE_MAX_ENTRIES, PREDICTION_CACHE_MAX_GRID_CELLS,
+) if PREDICTION_CACHE_ENABLED else None
+
+
+def build_prediction_grid(version, ok):
+    """Model-load callback: predict the cache's whole grid for the version just swapped in."""
+    active_version, engine = models.active()
+    if ok and active_version == version:
+        prediction_cache.build_grid(version, engine)
+
+
+if prediction_cache is not None and PREDICTION_CACHE_GRID:
+    models.on_load(build_prediction_grid)
+
+# Fixed-bucket histograms of every input the model is asked about (this worker only).
+drift = DriftMonitor()
 
 
 # ── App ───────────────────────────────────────────────────────────────────────
@@ -65,6 +120,7 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan,
 )
+app.router.route_class = TimedRoute
 
 # ── CORS (allow Streamlit + Render frontends) ─────────────────────────────────
 app.add_middleware(
@@ -74,6 +130,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ── Metrics (per-route latency, errors) ───────────────────────────────────────
+app.add_middleware(MetricsMiddleware)
+
+# ── Sustainability routes ─────────────────────────────────────────────────────
+for module in (carbon, score, tips, scenarios, dashboard):
+    app.include_router(module.router, prefix="/api", tags=["Sustainability"])
+    metrics.register_prefix(module.router, "/api")
+
 
 # ── Schemas ──────────────────────────────────────────────────────────────────
 class PredictRequest(BaseModel):
@@ -116,22 +180,153 @@ class PredictRequest(BaseModel):
 class PredictResponse(BaseModel):
     predicted_energy: float
     unit: str = "kWh"
+    model_version: Optional[str] = None
+
+
+class PredictBatchRequest(BaseModel):
+    rows: List[PredictRequest] = Field(..., min_length=1, description="Rows to score, in order")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "rows": [
+                    {"temperature": 32.5, "humidity": 60, "hour": 14},
+                    {"temperature": 21.0, "humidity": 55, "hour": 3},
+                ]
+            }
+        }
+    }
+
+
+class PredictBatchResponse(BaseModel):
+    predictions: List[float]
+    count: int
+    unit: str = "kWh"
+    model_version: Optional[str] = None
+
+
+class ForecastRequest(BaseModel):
+    start_hour: int         = Field(0, ge=0, le=23, description="Hour of day of the first reading (0–23)")
+    temperature: List[float] = Field(..., min_length=1, description="Hourly temperatures in °C (0–60)")
+    humidity: List[float]    = Field(..., min_length=1, description="Hourly relative humidity in % (0–100)")
+
+    @model_validator(mode="after")
+    def validate_series(self):
+        if len(self.temperature) != len(self.humidity):
+            raise ValueError("temperature and humidity must have the same length.")
+        temperature = np.asarray(self.temperature)
+        humidity = np.asarray(self.humidity)
+        if not ((temperature >= 0) & (temperature <= 60)).all():
+            raise ValueError("temperature must be between 0 and 60 °C.")
+        if not ((humidity >= 0) & (humidity <= 100)).all():
+            raise ValueError("humidity must be between 0 and 100 %.")
+        return self
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "start_hour": 0,
+                "temperature": [21.0, 20.5, 20.0, 19.8, 19.5, 19.7, 21.0, 23.5, 26.0, 28.0, 30.0, 31.5,
+                                32.5, 33.0, 33.2, 32.8, 31.5, 29.5, 27.0, 25.0, 23.8, 22.9, 22.0, 21.5],
+                "humidity": [70, 72, 74, 75, 76, 75, 72, 68, 64, 60, 57, 55,
+                             53, 52, 52, 53, 55, 58, 61, 64, 66, 68, 69, 70],
+            }
+        }
+    }
+
+
+class ForecastDay(BaseModel):
+    day: int
+    hours: int
+    total_kwh: float
+    peak_hour: int
+    peak_kwh: float
+
+
+class ForecastResponse(BaseModel):
+    start_hour: int
+    hours: int
+    predictions: List[float]
+    daily: List[ForecastDay]
+    total_kwh: float
+    unit: str = "kWh"
+    model_version: Optional[str] = None
+
+
+class ShiftableLoad(BaseModel):
+    name: str             = Field(..., max_length=64, description="Label, e.g. 'dishwasher'")
+    power_kw: float       = Field(..., gt=0, le=100, description="Average draw while running (kW)")
+    duration_hours: int   = Field(..., ge=1, description="Whole hours the load runs")
+    earliest_start: int   = Field(0, ge=0, description="First allowed start, in hours from the first reading")
+    latest_end: Optional[int] = Field(None, ge=1, description="Hour by which it must finish (default: end of the forecast)")
+
+
+class ScheduleRequest(ForecastRequest):
+    loads: List[ShiftableLoad] = Field(..., min_length=1, description="Appliances to place")
+    objective: Literal["peak", "total"] = Field(
+        "peak", description="'peak': lowest highest hour; 'total': least predicted kWh during each run",
+    )
+    time_budget_ms: float = Field(
+        SCHEDULE_TIME_BUDGET_MS, gt=0, le=MAX_SCHEDULE_TIME_BUDGET_MS,
+        description="Time the optimizer may spend placing loads and improving the placement",
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "start_hour": 18,
+                "temperature": [30.0, 28.5, 27.0, 25.5, 24.5, 23.5, 22.5, 22.0, 21.5, 21.0, 21.0, 21.5,
+                                23.0, 25.0, 27.5, 29.5, 31.0, 32.0],
+                "humidity": [55, 58, 61, 64, 66, 68, 70, 71, 72, 73, 73, 72,
+                             69, 65, 61, 58, 55, 53],
+                "loads": [
+                    {"name": "dishwasher", "power_kw": 1.2, "duration_hours": 2, "latest_end": 14},
+                    {"name": "ev_charger", "power_kw": 7.0, "duration_hours": 4, "earliest_start": 2, "latest_end": 14},
+                ],
+                "objective": "peak",
+            }
+        }
+    }
+
+
+class ScheduledLoad(BaseModel):
+    name: str
+    start: int                # hours from the first reading
+    end: int
+    day: int
+    start_hour: int           # hour of day
+    kwh: float
+    baseline_kwh: float       # predicted household kWh during the run
+
+
+class ScheduleResponse(BaseModel):
+    objective: str
+    schedule: List[ScheduledLoad]
+    baseline: List[float]
+    scheduled: List[float]
+    baseline_peak_kwh: float
+    peak_kwh: float
+    unshifted_peak_kwh: float         # every load at its earliest start
+    overlap_kwh: float                # Σ baseline_kwh
+    unshifted_overlap_kwh: float
+    passes: int
+    converged: bool
+    elapsed_ms: float
+    unit: str = "kWh"
+    model_version: Optional[str] = None
 
 
 # ── Routes ────────────────────────────────────────────────────────────────────
 @app.get("/", tags=["Health"])
 def root():
     """Health check endpoint."""
-    return {"status": "GreenMind AI API Running"}
+    version, _ = models.active()
+    return {"status": "GreenMind AI API Running", "model_version": version}
 
 
-@app.post("/predict", response_model=PredictResponse, tags=["Prediction"])
-def predict(data: PredictRequest):
-    """
-    Predict energy usage in kWh given temperature, humidity, and hour.
-    Returns the predicted value and unit.
-    """
-    current_model = get_model()
+def require_model():
+    """Return the active (version, engine) pair or raise 503 if no model is available."""
+    version, current_model = get_model()
     if current_model is None:
         raise HTTPException(
             status_code=503,
@@ -140,15 +335,356 @@ def predict(data: PredictRequest):
                 "Please run 'python models/train.py' to train and save the model."
             ),
         )
+    return version, current_model
+
+
+async def require_model_async():
+    """require_model() for async routes: a first, synchronous load runs in the threadpool, not on the event loop."""
+    version, current_model = models.active()
+    if current_model is None:
+        version, current_model = await run_in_threadpool(require_model)
+    return version, current_model
+
+
+def predict_row(row) -> tuple:
+    """(version, prediction) for one row on the active model, in the caller's thread."""
+    version, current_model = get_model()
+    with stage("inference"):
+        return version, current_model.predict_one(row)
+
+
+@app.post("/predict", response_model=PredictResponse, tags=["Prediction"])
+async def predict(data: PredictRequest):
+    """
+    Predict energy usage in kWh given temperature, humidity, and hour.
+    Returns the predicted value and unit. With GREENMIND_PREDICTION_CACHE=1 the
+    input is rounded to the cache's steps and repeated inputs skip inference.
+    """
+    await require_model_async()
+    row = [data.temperature, data.humidity, data.hour]
+    drift.observe(row)
+    if prediction_cache is not None:
+        key = prediction_cache.key(row)
+        cached = prediction_cache.get(key)
+        if cached is not None:
+            return PredictResponse(predicted_energy=round(float(cached[1]), 4), model_version=cached[0])
+        row = prediction_cache.features(key)
 
     try:
-        features = np.array([[data.temperature, data.humidity, data.hour]])
-        prediction = current_model.predict(features)[0]
+        if batcher is not None:
+            version, prediction = await batcher.predict(row)
+        else:
+            version, prediction = await run_in_threadpool(predict_row, row)
         predicted_energy = round(float(prediction), 4)
     except Exception as exc:
         raise HTTPException(
             status_code=500,
             detail=f"Prediction failed due to an internal error: {exc}",
         )
+    if prediction_cache is not None:
+        prediction_cache.put(version, key, float(prediction))
+
+    return PredictResponse(predicted_energy=predicted_energy, model_version=version)
+
+
+@app.post("/predict/batch", response_model=PredictBatchResponse, tags=["Prediction"])
+def predict_batch(data: PredictBatchRequest):
+    """
+    Predict energy usage for many rows with a single model call.
+    Predictions are returned in the same order as the input rows.
+    """
+    if len(data.rows) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(data.rows)} rows exceeds the limit of {MAX_BATCH_SIZE}.",
+        )
+    version, current_model = require_model()
 
-    return PredictResponse(predicted_energy=predicted_energy)
+    try:
+        features = np.array(
+            [[row.temperature, row.humidity, row.hour] for row in data.rows],
+            dtype=np.float64,
+        )
+        drift.observe_batch(features)
+        with stage("inference"):
+            raw = current_model.predict(features)
+        predictions = [round(float(p), 4) for p in raw]
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Prediction failed due to an internal error: {exc}",
+        )
+
+    return PredictBatchResponse(predictions=predictions, count=len(predictions), model_version=version)
+
+
+def score_binary(body: bytes, content_type: str, version: str, current_model) -> bytes:
+    """Decode a binary batch, validate it column-wise, predict and encode in the same format."""
+    if content_type == binary_io.NPY:
+        features = binary_io.read_npy(body)
+        columns = {name: features[:, i] for i, name in enumerate(binary_io.FEATURES)}
+    else:
+        columns = binary_io.read_arrow(body)
+        features = None
+    n_rows = len(columns["temperature"])
+    if n_rows == 0:
+        raise HTTPException(status_code=422, detail="Batch must contain at least one row.")
+    if n_rows > MAX_BINARY_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {n_rows} rows exceeds the limit of {MAX_BINARY_BATCH_SIZE}.",
+        )
+    binary_io.validate_columns(columns)
+    if features is None:
+        features = np.column_stack([columns[name] for name in binary_io.FEATURES])
+    drift.observe_batch(features)
+
+    try:
+        with stage("inference"):
+            predictions = current_model.predict(features)
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Prediction failed due to an internal error: {exc}",
+        )
+    if content_type == binary_io.NPY:
+        return binary_io.write_npy(predictions)
+    return binary_io.write_arrow(predictions, version)
+
+
+@app.post(
+    "/predict/batch/binary",
+    tags=["Prediction"],
+    response_class=Response,
+    responses={
+        200: {"content": {binary_io.NPY: {}, binary_io.ARROW_STREAM: {}},
+              "description": "Predictions (kWh, float64) in the request's format"},
+        413: {"description": "Too many rows"},
+        415: {"description": "Unsupported Content-Type, or Arrow without pyarrow"},
+        422: {"description": "Malformed body or out-of-range values"},
+    },
+)
+async def predict_batch_binary(request: Request):
+    """
+    Predict a batch sent as a .npy matrix (Content-Type: application/x-npy) or an
+    Arrow IPC stream (application/vnd.apache.arrow.stream) with temperature,
+    humidity and hour columns. The body is read into a NumPy view with no
+    per-value Python objects. Predictions come back unrounded in the same
+    format, in input order. The model version is in the X-Model-Version header.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in (binary_io.NPY, binary_io.ARROW_STREAM):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Content-Type must be {binary_io.NPY} or {binary_io.ARROW_STREAM}.",
+        )
+    body = await request.body()
+    version, current_model = await require_model_async()
+    content = await run_in_threadpool(score_binary, body, content_type, version, current_model)
+    return Response(content, media_type=content_type, headers={"X-Model-Version": version or ""})
+
+
+def summarize_days(predictions: np.ndarray, start_hour: int) -> List[dict]:
+    """
+    Daily totals and peak hours of an hourly curve starting at start_hour.
+    Day 0 runs from start_hour to 23:00; the curve is padded onto a
+    (days, 24) grid so every day is reduced in one vectorized pass.
+    """
+    n = len(predictions)
+    days = (start_hour + n + 23) // 24
+    grid = np.full(days * 24, np.nan)
+    grid[start_hour:start_hour + n] = predictions
+    grid = grid.reshape(days, 24)
+
+    hours = (~np.isnan(grid)).sum(axis=1)
+    totals = np.nansum(grid, axis=1)
+    peak_hours = np.nanargmax(grid, axis=1)
+    peaks = grid[np.arange(days), peak_hours]
+    return [
+        {"day": day, "hours": h, "total_kwh": round(total, 4), "peak_hour": peak_hour, "peak_kwh": round(peak, 4)}
+        for day, (h, total, peak_hour, peak) in enumerate(
+            zip(hours.tolist(), totals.tolist(), peak_hours.tolist(), peaks.tolist())
+        )
+    ]
+
+
+def stream_forecast(body: dict, chunk_size: int = 4096):
+    """Yield the forecast JSON piece by piece, so long curves are never serialized in one string."""
+    predictions = body.pop("predictions")
+    yield '{"predictions":['
+    for start in range(0, len(predictions), chunk_size):
+        prefix = "," if start else ""
+        yield prefix + ",".join(map(repr, predictions[start:start + chunk_size]))
+    yield "]," + json.dumps(body)[1:]
+
+
+def forecast_features(data: ForecastRequest) -> np.ndarray:
+    """(hours, 3) feature matrix for a weather series; the hour column wraps at midnight."""
+    n = len(data.temperature)
+    features = np.empty((n, 3), dtype=np.float64)
+    features[:, 0] = data.temperature
+    features[:, 1] = data.humidity
+    features[:, 2] = (data.start_hour + np.arange(n)) % 24
+    return features
+
+
+@app.post("/predict/forecast", response_model=ForecastResponse, tags=["Prediction"])
+def predict_forecast(data: ForecastRequest):
+    """
+    Predict the hourly kWh curve for a temperature/humidity series.
+    The whole horizon is scored in one model call; daily totals and peak hours
+    are reduced from the same curve. Horizons longer than
+    GREENMIND_FORECAST_STREAM_HOURS are streamed.
+    """
+    n = len(data.temperature)
+    if n > MAX_FORECAST_HOURS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Forecast of {n} hours exceeds the limit of {MAX_FORECAST_HOURS}.",
+        )
+    version, current_model = require_model()
+
+    try:
+        features = forecast_features(data)
+        drift.observe_batch(features)
+        with stage("inference"):
+            curve = current_model.predict(features)
+        body = {
+            "predictions": [round(p, 4) for p in curve.tolist()],
+            "daily": summarize_days(curve, data.start_hour),
+            "start_hour": data.start_hour,
+            "hours": n,
+            "total_kwh": round(float(curve.sum()), 4),
+            "unit": "kWh",
+            "model_version": version,
+        }
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Prediction failed due to an internal error: {exc}",
+        )
+
+    if n > FORECAST_STREAM_HOURS:
+        return StreamingResponse(stream_forecast(body), media_type="application/json")
+    return body
+
+
+@app.post("/predict/schedule", response_model=ScheduleResponse, tags=["Prediction"])
+def predict_schedule(data: ScheduleRequest):
+    """
+    Place shiftable appliances on the predicted hourly curve of a weather series.
+    The baseline is scored in one model call; each load then gets the start in
+    its window that minimises the predicted peak (objective='peak') or the
+    predicted household kWh during its run (objective='total').
+    """
+    started = time.perf_counter()
+    n = len(data.temperature)
+    if n > MAX_FORECAST_HOURS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Forecast of {n} hours exceeds the limit of {MAX_FORECAST_HOURS}.",
+        )
+    if len(data.loads) > MAX_SCHEDULE_LOADS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{len(data.loads)} loads exceed the limit of {MAX_SCHEDULE_LOADS}.",
+        )
+    version, current_model = require_model()
+
+    try:
+        features = forecast_features(data)
+        drift.observe_batch(features)
+        with stage("inference"):
+            baseline = current_model.predict(features)
+    except Exception as exc:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Prediction failed due to an internal error: {exc}",
+        )
+    loads = [load.model_dump() for load in data.loads]
+    try:
+        with stage("schedule"):
+            result = load_shifter.schedule(baseline, loads, data.objective, data.time_budget_ms / 1000)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    starts = result["starts"].tolist()
+    clock = [(data.start_hour + start) for start in starts]
+    return {
+        "objective": data.objective,
+        "schedule": [
+            {
+                "name": load["name"],
+                "start": start,
+                "end": start + load["duration_hours"],
+                "day": hour // 24,
+                "start_hour": hour % 24,
+                "kwh": round(load["power_kw"] * load["duration_hours"], 4),
+                "baseline_kwh": round(overlap, 4),
+            }
+            for load, start, hour, overlap in zip(loads, starts, clock, result["overlap_kwh"].tolist())
+        ],
+        "baseline": [round(p, 4) for p in baseline.tolist()],
+        "scheduled": [round(p, 4) for p in result["curve"].tolist()],
+        "baseline_peak_kwh": round(float(baseline.max()), 4),
+        "peak_kwh": round(float(result["curve"].max()), 4),
+        "unshifted_peak_kwh": round(float(result["unshifted_curve"].max()), 4),
+        "overlap_kwh": round(float(result["overlap_kwh"].sum()), 4),
+        "unshifted_overlap_kwh": round(float(result["unshifted_overlap_kwh"].sum()), 4),
+        "passes": result["passes"],
+        "converged": result["converged"],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "unit": "kWh",
+        "model_version": version,
+    }
+
+
+@app.get("/predict/cache/stats", tags=["Prediction"])
+def prediction_cache_stats():
+    """Entries, hit rate, evictions and grid of the /predict cache (GREENMIND_PREDICTION_CACHE=1)."""
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "model_version": models.active()[0], **prediction_cache.stats()}
+
+
+@app.get("/predict/drift", tags=["Prediction"])
+def predict_drift(
+    min_rows: int = Query(MIN_ROWS, ge=1, description="Live rows needed before statistics are computed"),
+    histograms: bool = Query(False, description="Include bucket edges and both histograms"),
+):
+    """
+    Drift of this worker's recent inputs against the active model's training data,
+    per feature: PSI, two-sample KS statistic and p-value, and the share of inputs
+    in ranges the training data never covered. Counts are per worker process.
+    """
+    version, current_model = models.active()
+    training = getattr(current_model, "training_histograms", None)
+    return {"model_version": version, **drift.report(training, min_rows, histograms)}
+
+
+@app.get("/predict/microbatch/stats", tags=["Prediction"])
+def microbatch_stats():
+    """Queue depth, batch-size histogram and added latency of the /predict micro-batcher."""
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text-format metrics: route latency, stage timers, errors, model loads."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/debug/profile", tags=["Health"], response_class=PlainTextResponse)
+def debug_profile(
+    seconds: float = Query(5.0, gt=0, le=60, description="Sampling duration"),
+    hz: float = Query(100.0, gt=0, le=1000, description="Samples per second"),
+):
+    """
+    Sample all threads' stacks while the server keeps serving and return collapsed
+    stacks (flamegraph.pl / speedscope input). Needs GREENMIND_PROFILER=1.
+    """
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiler disabled. Set GREENMIND_PROFILER=1 to enable it.")
+    return PlainTextResponse(metrics.sample_stacks(seconds, hz))
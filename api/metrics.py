@@ -0,0 +1,284 @@
+"""
+Metrics for the GreenMind AI API
+Hand-rolled Prometheus counters and histograms (no prometheus_client
+dependency), rendered in the text exposition format at GET /metrics.
+
+    greenmind_http_request_duration_seconds{method,route,status}   per-route latency
+    greenmind_stage_duration_seconds{route,stage}                 validation / handler / serialization,
+                                                                  inference / estimate / score
+    greenmind_errors_total{route,kind}                            5xx, validation errors, exceptions
+    greenmind_model_loads_total{result}                           model registry loads
+    greenmind_reference_reloads_total                             reference-data snapshot swaps
+    greenmind_model_info{version}                                 active model version
+
+Recording is a bisect plus two increments under a lock, a few microseconds
+per request, so it stays on in production.
+
+TimedRoute splits each request into validation (body parsing and pydantic,
+up to the endpoint call), handler (the endpoint itself) and serialization
+(response model and JSON encoding, after the endpoint returns).
+"""
+import functools
+import inspect
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi.routing import APIRoute
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {v:g}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}           # labels → [bucket counts (non-cumulative) + overflow, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._series.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total:.9g}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+# ── Metric instances ─────────────────────────────────────────────────────────
+REQUEST_SECONDS = Histogram(
+    "greenmind_http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+STAGE_SECONDS = Histogram(
+    "greenmind_stage_duration_seconds", "Time spent per request stage.", ("route", "stage"),
+)
+ERRORS = Counter("greenmind_errors_total", "Errors by route and kind.", ("route", "kind"))
+MODEL_LOADS = Counter("greenmind_model_loads_total", "Model version loads by result.", ("result",))
+REFERENCE_RELOADS = Counter("greenmind_reference_reloads_total", "Reference-data snapshot swaps.")
+
+_info = {}      # extra single-sample gauges: name → (help, labelnames, callable returning label values)
+
+
+def info(name: str, help: str, labelnames, read):
+    """Register an info-style gauge whose labels come from read() at scrape time (None = omitted)."""
+    _info[name] = (help, tuple(labelnames), read)
+
+
+def render() -> str:
+    lines = []
+    for metric in (REQUEST_SECONDS, STAGE_SECONDS, ERRORS, MODEL_LOADS, REFERENCE_RELOADS):
+        lines += metric.render()
+    for name, (help, labelnames, read) in _info.items():
+        values = read()
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+        if values is not None:
+            lines.append(f"{name}{_labels(labelnames, values)} 1")
+    return "\n".join(lines) + "\n"
+
+
+# ── Request stage timing ─────────────────────────────────────────────────────
+_current = ContextVar("greenmind_request_timing", default=None)
+
+
+def register_prefix(router, prefix: str):
+    """
+    Label an included router's routes with their full path ("/api/tips").
+    Depending on the FastAPI version, include_router either copies routes with
+    the prefix applied or serves the original route objects unprefixed.
+    """
+    for route in router.routes:
+        route.metrics_path = prefix + route.path
+
+
+def route_path(route) -> str:
+    return getattr(route, "metrics_path", None) or getattr(route, "path", None) or "unmatched"
+
+
+def route_label() -> str:
+    """Route template of the request being handled (for stage timers inside handlers)."""
+    timing = _current.get()
+    return timing[0] if timing is not None else "unknown"
+
+
+def stage(name: str):
+    """Time a stage of the current request, e.g. `with stage("inference"): ...`."""
+    return STAGE_SECONDS.time(route_label(), name)
+
+
+def _timed_endpoint(endpoint):
+    """Wrap an endpoint so the route handler knows when it started and finished."""
+    if getattr(endpoint, "_greenmind_timed", False):
+        return endpoint     # include_router re-creates routes from already wrapped endpoints
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timing = _current.get()
+            if timing is not None:
+                timing[2] = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if timing is not None:
+                    timing[3] = time.perf_counter()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            # Runs in the threadpool; the mutable timing list is shared with the handler.
+            timing = _current.get()
+            if timing is not None:
+                timing[2] = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                if timing is not None:
+                    timing[3] = time.perf_counter()
+    wrapper._greenmind_timed = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that records validation, handler and serialization time per request."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            route = route_path(self)
+            timing = [route, time.perf_counter(), None, None]    # route, start, endpoint start, endpoint end
+            token = _current.set(timing)
+            try:
+                return await handler(request)
+            finally:
+                end = time.perf_counter()
+                _current.reset(token)
+                if timing[2] is not None:
+                    STAGE_SECONDS.observe(timing[2] - timing[1], route, "validation")
+                    if timing[3] is not None:
+                        STAGE_SECONDS.observe(timing[3] - timing[2], route, "handler")
+                        STAGE_SECONDS.observe(end - timing[3], route, "serialization")
+                else:
+                    STAGE_SECONDS.observe(end - timing[1], route, "validation")
+
+        return timed_handler
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: per-route latency histogram and error counters."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            ERRORS.inc(self._route(scope), "exception")
+            raise
+        finally:
+            route = self._route(scope)
+            code = status[0]
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route, code)
+            if code >= 500:
+                ERRORS.inc(route, "http_5xx")
+            elif code == 422:
+                ERRORS.inc(route, "validation")
+
+    @staticmethod
+    def _route(scope) -> str:
+        return route_path(scope.get("route"))
+
+
+# ── Sampling profiler ────────────────────────────────────────────────────────
+def sample_stacks(seconds: float, hz: float = 100.0, exclude_thread: int = None) -> str:
+    """
+    Sample every thread's Python stack `hz` times per second for `seconds`.
+    Returns collapsed stacks ("outer;inner count" per line), ready for flamegraph.pl
+    or speedscope.
+    """
+    tally = _Tally()
+    interval = 1.0 / hz
+    deadline = time.perf_counter() + seconds
+    me = threading.get_ident()
+    while time.perf_counter() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id in (me, exclude_thread):
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            tally[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return "\n".join(f"{stack} {count}" for stack, count in tally.most_common()) + "\n"
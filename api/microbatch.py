@@ -0,0 +1,127 @@
+"""
+Micro-batching for POST /predict
+Collects single-row predictions that arrive within a short window (or until
+a batch is full) and scores them with one vectorized ForestEngine.predict
+call, then resolves each caller's future.
+
+Opt-in: set GREENMIND_MICROBATCH=1. Tuning:
+    GREENMIND_MICROBATCH_WINDOW_MS   longest wait for more rows (default 2 ms)
+    GREENMIND_MICROBATCH_MAX_SIZE    rows that trigger an immediate flush (default 256)
+
+Queue depth, a batch-size histogram and the latency added by waiting are
+kept in MicroBatcher.stats() and served at GET /predict/microbatch/stats.
+"""
+import asyncio
+import time
+
+import numpy as np
+
+from api.metrics import STAGE_SECONDS
+
+# Upper bounds of the histogram buckets (the last bucket is open-ended).
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+WAIT_MS_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 25, 50)
+
+
+def _bucket(value: float, bounds) -> int:
+    for i, bound in enumerate(bounds):
+        if value <= bound:
+            return i
+    return len(bounds)
+
+
+def _histogram(counts: list, bounds) -> dict:
+    labels = [f"le_{b:g}" for b in bounds] + ["inf"]
+    return dict(zip(labels, counts))
+
+
+class MicroBatcher:
+    def __init__(self, get_model, window_ms: float = 2.0, max_size: int = 256):
+        """
+        get_model: callable returning the active (version, engine) pair; it is
+                   called once per batch so every row in a batch shares a version.
+                   It runs on the event loop, so it must not block (e.g.
+                   ModelRegistry.active, not ModelRegistry.get).
+        """
+        self.get_model = get_model
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self._pending = []          # [(row, future, enqueued_at)]
+        self._timer = None
+        self._in_flight = 0
+        self._batches = 0
+        self._requests = 0
+        self._size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._wait_counts = [0] * (len(WAIT_MS_BUCKETS) + 1)
+        self._wait_sum_ms = 0.0
+        self._wait_max_ms = 0.0
+
+    async def predict(self, row) -> tuple:
+        """Queue one feature row; returns (model_version, prediction)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future, time.perf_counter()))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        now = time.perf_counter()
+        self._batches += 1
+        self._requests += len(batch)
+        self._size_counts[_bucket(len(batch), BATCH_SIZE_BUCKETS)] += 1
+        for _, _, enqueued_at in batch:
+            waited = (now - enqueued_at) * 1000
+            self._wait_counts[_bucket(waited, WAIT_MS_BUCKETS)] += 1
+            self._wait_sum_ms += waited
+            self._wait_max_ms = max(self._wait_max_ms, waited)
+
+        self._in_flight += 1
+        asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: list):
+        try:
+            version, engine = self.get_model()
+            if engine is None:
+                raise RuntimeError("ML model is not loaded.")
+            features = np.array([row for row, _, _ in batch], dtype=np.float64)
+            # Off the event loop: other requests keep queueing while this batch runs.
+            start = time.perf_counter()
+            predictions = await asyncio.get_running_loop().run_in_executor(None, engine.predict, features)
+            STAGE_SECONDS.observe(time.perf_counter() - start, "/predict", "inference")
+        except Exception as exc:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for (_, future, _), prediction in zip(batch, predictions.tolist()):
+                if not future.done():
+                    future.set_result((version, prediction))
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000,
+            "max_size": self.max_size,
+            "queue_depth": len(self._pending),
+            "batches_in_flight": self._in_flight,
+            "batches": self._batches,
+            "requests": self._requests,
+            "mean_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+            "batch_size_histogram": _histogram(self._size_counts, BATCH_SIZE_BUCKETS),
+            "added_latency_ms": {
+                "mean": round(self._wait_sum_ms / self._requests, 3) if self._requests else 0.0,
+                "max": round(self._wait_max_ms, 3),
+                "histogram": _histogram(self._wait_counts, WAIT_MS_BUCKETS),
+            },
+        }
@@ -0,0 +1,183 @@
+"""
+Prediction cache for POST /predict
+Sensor readings repeat constantly at their resolution, so /predict results are
+cached on inputs rounded to a fixed step: temperature to
+GREENMIND_PREDICTION_CACHE_TEMPERATURE_STEP °C (default 0.1), humidity to
+GREENMIND_PREDICTION_CACHE_HUMIDITY_STEP % (default 0.5), hour exact. With the
+cache on, /predict always answers for the rounded input, hit or miss, so a
+reading gets the same prediction whichever path serves it.
+
+Opt-in: set GREENMIND_PREDICTION_CACHE=1. Two tiers:
+    - an LRU dict of at most GREENMIND_PREDICTION_CACHE_MAX_ENTRIES rounded
+      inputs (default 100000), filled by misses
+    - with GREENMIND_PREDICTION_CACHE_GRID=1, the whole rounded input grid,
+      predicted in blocks on a background thread whenever a model version is
+      loaded, so every lookup is one array read. The grid is installed only
+      if its version is still active when it is done; until then the LRU tier
+      answers. Grids above GREENMIND_PREDICTION_CACHE_MAX_GRID_CELLS (default
+      500000, about 5 s of predictions) are not built. With the grid on,
+      api/config.py defaults the steps to 0.5 °C and 1 % (293k cells); the
+      finer LRU defaults would give 2.9M
+
+Both tiers belong to one model version. The first lookup after the active
+version changes clears the LRU, and a grid is only used for the version it
+was built from. Hit, miss, eviction and invalidation counts are kept in
+PredictionCache.stats() and served at GET /predict/cache/stats, along with
+the grid's status (off, building, ready, stale, skipped or failed).
+
+The LRU is only touched from the event loop (the /predict handler), so it
+needs no lock; the grid is swapped in from its builder thread as one reference.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from api.binary_io import FEATURE_RANGES
+
+GRID_BLOCK_ROWS = 65536     # rows per predict call while building the grid
+
+
+class PredictionCache:
+    def __init__(self, get_model, temperature_step: float = 0.1, humidity_step: float = 0.5,
+                 max_entries: int = 100_000, max_grid_cells: int = 500_000):
+        """
+        get_model: callable returning the active (version, engine) pair; the
+                   cache only answers for that version. get() calls it on the
+                   event loop, so it must not block (e.g. ModelRegistry.active).
+        """
+        self.get_model = get_model
+        self.steps = (temperature_step, humidity_step)
+        self.max_entries = max_entries
+        self.max_grid_cells = max_grid_cells
+        # Cells per axis: rounded temperature, rounded humidity, hour.
+        self.shape = (
+            round(FEATURE_RANGES["temperature"][1] / temperature_step) + 1,
+            round(FEATURE_RANGES["humidity"][1] / humidity_step) + 1,
+            FEATURE_RANGES["hour"][1] + 1,
+        )
+        self._version = None
+        self._entries = OrderedDict()       # (t, h, hour) cell → prediction
+        self._grid = None                   # (version, predictions[t, h, hour], build seconds)
+        self._builder = None                # thread building the latest grid
+        self._grid_status = "off"           # of the latest build: off, building, ready, skipped, failed
+        self.hits = 0
+        self.grid_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ── Keys ─────────────────────────────────────────────────────────────────
+    def key(self, row) -> tuple:
+        """Grid cell of a (temperature, humidity, hour) row."""
+        temperature, humidity, hour = row
+        return round(temperature / self.steps[0]), round(humidity / self.steps[1]), int(hour)
+
+    def features(self, key: tuple) -> list:
+        """The rounded row a cell stands for, the input the model is asked about."""
+        return [key[0] * self.steps[0], key[1] * self.steps[1], key[2]]
+
+    # ── Lookups ──────────────────────────────────────────────────────────────
+    def get(self, key: tuple):
+        """(version, prediction) for a cell of the active model, or None on a miss."""
+        version = self.get_model()[0]
+        grid = self._grid
+        if grid is not None and grid[0] == version:
+            self.hits += 1
+            self.grid_hits += 1
+            return version, grid[1].item(key)
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+        prediction = self._entries.get(key)
+        if prediction is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return version, prediction
+
+    def put(self, version, key: tuple, prediction: float):
+        if version != self._version:
+            return      # predicted by a model that has since been replaced
+        self._entries[key] = prediction
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ── Grid ─────────────────────────────────────────────────────────────────
+    def build_grid(self, version, engine):
+        """Start predicting every cell for this model version on a background thread (model-load callback)."""
+        cells = int(np.prod(self.shape))
+        if cells > self.max_grid_cells:
+            self._grid_status = "skipped"
+            print(f"⚠️  Prediction grid of {cells} cells exceeds GREENMIND_PREDICTION_CACHE_MAX_GRID_CELLS "
+                  f"({self.max_grid_cells}); using the LRU cache only.")
+            return
+        builder = threading.Thread(target=self._build_grid, args=(version, engine, cells),
+                                   name="prediction-grid", daemon=True)
+        self._builder = builder
+        self._grid_status = "building"
+        builder.start()
+
+    def wait_for_grid(self, timeout: float = None):
+        """Block until the latest grid build has finished (e.g. before forking workers)."""
+        builder = self._builder
+        if builder is not None:
+            builder.join(timeout)
+
+    def _build_grid(self, version, engine, cells: int):
+        try:
+            start = time.perf_counter()
+            t, h, hour = np.meshgrid(*(np.arange(n) for n in self.shape), indexing="ij")
+            features = np.column_stack([t.ravel() * self.steps[0], h.ravel() * self.steps[1], hour.ravel()])
+            blocks = []
+            for i in range(0, cells, GRID_BLOCK_ROWS):
+                if self.get_model()[0] != version:
+                    return      # replaced while building; its own build is under way
+                blocks.append(engine.predict(features[i:i + GRID_BLOCK_ROWS]))
+            elapsed = time.perf_counter() - start
+            if self.get_model()[0] != version:
+                return
+            self._grid = (version, np.concatenate(blocks).reshape(self.shape), elapsed)
+            self._grid_status = "ready"
+            print(f"✅  Prediction grid for model {version}: {cells} cells in {elapsed:.1f} s")
+        except Exception as e:
+            if self.get_model()[0] == version:
+                self._grid_status = "failed"
+            print(f"⚠️  Prediction grid for model {version} not built: {e}")
+
+    def grid_status(self) -> str:
+        """off, building, ready, stale (built for another version), skipped (too many cells) or failed."""
+        status, grid = self._grid_status, self._grid
+        if status == "ready" and grid is not None and grid[0] != self.get_model()[0]:
+            return "stale"
+        return status
+
+    def stats(self) -> dict:
+        grid = self._grid
+        lookups = self.hits + self.misses
+        return {
+            "temperature_step": self.steps[0],
+            "humidity_step": self.steps[1],
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "grid_hits": self.grid_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "grid_status": self.grid_status(),
+            "grid_cells": int(np.prod(self.shape)),
+            "max_grid_cells": self.max_grid_cells,
+            "grid": {
+                "model_version": grid[0],
+                "cells": int(grid[1].size),
+                "megabytes": round(grid[1].nbytes / 2**20, 1),
+                "build_seconds": round(grid[2], 2),
+            } if grid is not None else None,
+        }
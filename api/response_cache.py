@@ -0,0 +1,122 @@
+"""
+Response cache for the reference-data endpoints
+GET /api/dashboard/summary and GET /api/tips only change when the reference
+JSON files do, so each query variant is validated and serialized once per
+reference-data snapshot and served from bytes afterwards.
+
+Every cached entry carries:
+    - a strong ETag per representation (sha256 of the JSON body; "-gzip" /
+      "-br" suffixes for the compressed variants), so If-None-Match → 304
+    - gzip and, when the `brotli` package is installed, brotli bodies,
+      compressed once at build time and used only when smaller than the JSON
+    - Cache-Control: public, max-age=GREENMIND_REFERENCE_MAX_AGE (default 300 s)
+
+Entries are keyed by (snapshot version, route, query) and the whole cache is
+dropped when the snapshot version moves, so an edited JSON file is served as
+soon as the registry picks it up. Unknown query values (e.g. arbitrary tags)
+are bounded by a small LRU.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from fastapi import Response
+
+try:
+    import brotli
+except ImportError:     # optional: gzip only
+    brotli = None
+
+
+class CachedResponse:
+    """Serialized JSON body plus its precompressed variants and ETags."""
+
+    def __init__(self, body: bytes):
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {"identity": (body, f'"{digest}"')}
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            self.variants["gzip"] = (compressed, f'"{digest}-gzip"')
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                self.variants["br"] = (compressed, f'"{digest}-br"')
+        self.etags = {etag for _, etag in self.variants.values()}
+
+
+def _accepted_encodings(header: str) -> set:
+    """Codings from an Accept-Encoding header with a non-zero q-value."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _matches(if_none_match: str, etags: set) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
+
+
+class ResponseCache:
+    def __init__(self, max_age: int = 300, max_entries: int = 256):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, key, build) -> CachedResponse:
+        """Cached entry for key under this snapshot version; build() returns the JSON bytes."""
+        with self._lock:
+            if version == self._version:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    return entry
+        entry = CachedResponse(build())
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._version = version
+                self._entries.clear()
+            elif version < self._version:
+                return entry    # built from a snapshot that has since been replaced
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, request, entry: CachedResponse) -> Response:
+        """Pick the best encoding the client accepts; 304 when its ETag still matches."""
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next((e for e in ("br", "gzip") if e in accepted and e in entry.variants), "identity")
+        body, etag = entry.variants[encoding]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, entry.etags):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type="application/json", headers=headers)
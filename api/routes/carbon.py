@@ -1,19 +1,64 @@
 """
-Carbon footprint route: POST /api/carbon-footprint
+Carbon footprint routes: POST /api/carbon-footprint, POST /api/carbon-footprint/batch
 """
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
-from fastapi import APIRouter
-from api.schemas import CarbonInput, CarbonResponse
-from models.carbon_estimator import CarbonEstimator
+from typing import Optional
 
-router = APIRouter()
-estimator = CarbonEstimator()
+from fastapi import APIRouter, Query
+from api.metrics import TimedRoute, stage
+from api.columns import rows_to_columns, breakdown_rows
+from api.schemas import CarbonInput, CarbonResponse, CarbonBatchInput, CarbonBatchResponse
+from api.services import cohort_ranks, estimator, submissions, uncertainty_estimator
 
+router = APIRouter(route_class=TimedRoute)
 
-@router.post("/carbon-footprint", response_model=CarbonResponse)
-def calculate_carbon(inputs: CarbonInput):
-    """Calculate annual carbon footprint from lifestyle inputs."""
-    result = estimator.estimate(inputs.model_dump())
+
+@router.post("/carbon-footprint", response_model=CarbonResponse, response_model_exclude_none=True)
+def calculate_carbon(
+    inputs: CarbonInput,
+    uncertainty_samples: int = Query(0, ge=0, le=200000, description="Monte Carlo samples for p5/p50/p95 bands (0 = off)"),
+    seed: Optional[int] = Query(None, ge=0, description="Seed for reproducible bands"),
+):
+    """Calculate annual carbon footprint from lifestyle inputs, ranked within the input's cohort."""
+    profile = inputs.model_dump()
+    with stage("estimate"):
+        result = estimator.estimate(profile)
+    if submissions is not None:
+        submissions.record(
+            "carbon-footprint", profile, result["total_kg_co2_year"], result["breakdown"], region=result["region"],
+            transport_mode=result["transport_mode"], diet_type=result["diet_type"],
+        )
+    with stage("rank"):
+        result["percentile_rank"] = cohort_ranks.observe_and_rank(
+            inputs.cohort, result["total_kg_co2_year"], result["breakdown"],
+        )
+    if uncertainty_samples:
+        result["uncertainty"] = uncertainty_estimator.estimate(profile, uncertainty_samples, seed)
     return result
+
+
+@router.post("/carbon-footprint/batch", response_model=CarbonBatchResponse)
+def calculate_carbon_batch(inputs: CarbonBatchInput):
+    """Calculate carbon footprints for many profiles in one vectorized pass."""
+    columns = rows_to_columns(inputs.rows)
+    with stage("estimate"):
+        result = estimator.estimate_batch(columns)
+    breakdowns = breakdown_rows(result["breakdown"])
+    results = [
+        {
+            "total_kg_co2_year": total,
+            "breakdown": breakdown,
+            "global_average_kg": result["global_average_kg"],
+            "target_kg": result["target_kg"],
+            "vs_global_average_pct": vs_pct,
+            "region": region,
+            "region_average_kg": region_avg,
+        }
+        for total, breakdown, vs_pct, region, region_avg in zip(
+            result["total_kg_co2_year"].tolist(), breakdowns, result["vs_global_average_pct"].tolist(),
+            result["region"].tolist(), result["region_average_kg"].tolist(),
+        )
+    ]
+    return {"results": results, "count": len(results)}
@@ -1,29 +1,76 @@
 """
 Dashboard route: GET /api/dashboard/summary
-Returns static reference data for populating charts.
+Returns reference data for populating charts, plus aggregates of the profiles
+submitted so far (data/submissions.py). The serialized response is cached per
+reference-data snapshot and aggregate version (see api/response_cache.py).
 """
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
-from fastapi import APIRouter
-from api.schemas import DashboardSummary
-from data.loader import load_emissions_factors, load_eco_tips
+from fastapi import APIRouter, Request
+from starlette.concurrency import run_in_threadpool
+from api.metrics import TimedRoute
+from api.schemas import CarbonInput, DashboardSummary
+from api.services import estimator, reference_responses, submissions
+from models.carbon_estimator import ELECTRICITY
+from data.registry import reference_data
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/dashboard/summary", response_model=DashboardSummary)
-def dashboard_summary():
+async def dashboard_summary(request: Request):
     """Return global reference data for the dashboard."""
-    factors = load_emissions_factors()
-    tips = load_eco_tips()
-    return {
-        "global_average_kg": factors["global_average_annual_kg"],
-        "target_kg": factors["target_annual_kg"],
-        "uk_average_kg": factors["uk_average_annual_kg"],
-        "us_average_kg": factors["us_average_annual_kg"],
-        "india_average_kg": factors["india_average_annual_kg"],
-        "category_labels": ["Transport", "Energy", "Diet", "Shopping", "Waste"],
-        "category_colors": ["#22c55e", "#86efac", "#4ade80", "#16a34a", "#15803d"],
-        "tips_count": len(tips),
-    }
+    snapshot = reference_data.snapshot()
+    # summary() may open and query SQLite (up to its 5 s busy timeout): keep it off the event loop.
+    stats = await run_in_threadpool(submissions.summary) if submissions is not None else None
+    entry = reference_responses.get(
+        snapshot.version, ("/dashboard/summary", stats["seq"] if stats else None),
+        lambda: build_summary(snapshot, stats),
+    )
+    return reference_responses.respond(request, entry)
+
+
+def build_summary(snapshot, stats: dict = None) -> bytes:
+    factors = snapshot.emissions_factors
+    tips = snapshot.eco_tips
+    summary = DashboardSummary(
+        regions=compare_regions(snapshot, stats),
+        global_average_kg=factors["global_average_annual_kg"],
+        target_kg=factors["target_annual_kg"],
+        uk_average_kg=factors["uk_average_annual_kg"],
+        us_average_kg=factors["us_average_annual_kg"],
+        india_average_kg=factors["india_average_annual_kg"],
+        category_labels=["Transport", "Energy", "Diet", "Shopping", "Waste"],
+        category_colors=["#22c55e", "#86efac", "#4ade80", "#16a34a", "#15803d"],
+        tips_count=len(tips),
+        submissions=stats,
+    )
+    return summary.model_dump_json().encode()
+
+
+def compare_regions(snapshot, stats: dict = None) -> list:
+    """Every region's average and the default profile's footprint there, in one batch estimate."""
+    tables = estimator.tables(snapshot)
+    profile = CarbonInput().model_dump(exclude={"cohort", "region"})
+    n = len(tables.regions)
+    columns = {field: [value] * n for field, value in profile.items()}
+    columns["region"] = tables.regions
+    reference = estimator.estimate_batch(columns, snapshot=snapshot)["total_kg_co2_year"].tolist()
+    global_avg = snapshot.emissions_factors["global_average_annual_kg"]
+    by_region = stats["by_region"] if stats else {}
+    return [
+        {
+            "region": code,
+            "name": name,
+            "average_kg": average,
+            "vs_global_average_pct": round((average - global_avg) / global_avg * 100, 1),
+            "electricity_kg_per_kwh": electricity,
+            "reference_profile_kg": total,
+            "submissions": by_region.get(code),
+        }
+        for code, name, average, electricity, total in zip(
+            tables.regions, tables.region_names, tables.region_average_kg.tolist(),
+            tables.scalars[:, ELECTRICITY].tolist(), reference,
+        )
+    ]
@@ -0,0 +1,37 @@
+"""
+Scenario route: POST /api/scenarios
+Ranks "what if" changes (eco-tips, their combinations, and custom scenarios)
+by real kg CO2 saved and sustainability score gain.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from fastapi import APIRouter, HTTPException
+from api.metrics import TimedRoute
+from api.schemas import ScenarioRequest, ScenarioResponse
+from api.services import scenario_engine
+from models.scenario_engine import validate_spec
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.post("/scenarios", response_model=ScenarioResponse)
+def rank_scenarios(request: ScenarioRequest):
+    """Evaluate what-if scenarios against a profile and return the best ones."""
+    scenarios = []
+    tables = scenario_engine.estimator.tables()
+    for spec in request.scenarios:
+        changes = {"set": spec.set, "scale": spec.scale, "add": spec.add}
+        try:
+            validate_spec(changes, tables)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Scenario '{spec.name}': {e}")
+        scenarios.append({"name": spec.name, "specs": [changes]})
+
+    return scenario_engine.rank(
+        request.inputs.model_dump(),
+        scenarios=scenarios,
+        include_tips=request.include_tips,
+        max_combination_size=request.max_combination_size,
+        top_n=request.top_n,
+    )
@@ -1,27 +1,69 @@
 """
-Score route: POST /api/score
+Score routes: POST /api/score, POST /api/score/batch
 Returns sustainability score, grade, and breakdown.
 """
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 from fastapi import APIRouter
-from api.schemas import CarbonInput, ScoreResponse
-from models.carbon_estimator import CarbonEstimator
-from models.sustainability_score import SustainabilityScorer
+from api.metrics import TimedRoute, stage
+from api.columns import rows_to_columns, breakdown_rows
+from api.schemas import CarbonInput, ScoreResponse, CarbonBatchInput, ScoreBatchResponse
+from api.services import cohort_ranks, estimator, scorer, submissions
 
-router = APIRouter()
-estimator = CarbonEstimator()
-scorer = SustainabilityScorer()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.post("/score", response_model=ScoreResponse)
 def get_score(inputs: CarbonInput):
     """Calculate sustainability score from lifestyle inputs."""
-    carbon_result = estimator.estimate(inputs.model_dump())
-    score_result = scorer.score(carbon_result["total_kg_co2_year"], carbon_result["breakdown"])
+    profile = inputs.model_dump()
+    with stage("estimate"):
+        carbon_result = estimator.estimate(profile)
+    with stage("score"):
+        score_result = scorer.score(carbon_result["total_kg_co2_year"], carbon_result["breakdown"])
+    if submissions is not None:
+        submissions.record(
+            "score", profile, carbon_result["total_kg_co2_year"], carbon_result["breakdown"], score_result["grade"],
+            region=carbon_result["region"], transport_mode=carbon_result["transport_mode"],
+            diet_type=carbon_result["diet_type"],
+        )
+    with stage("rank"):
+        percentile_rank = cohort_ranks.observe_and_rank(
+            inputs.cohort, carbon_result["total_kg_co2_year"], carbon_result["breakdown"],
+        )
     return {
         **score_result,
         "total_kg_co2_year": carbon_result["total_kg_co2_year"],
         "breakdown": carbon_result["breakdown"],
+        "percentile_rank": percentile_rank,
     }
+
+
+@router.post("/score/batch", response_model=ScoreBatchResponse)
+def get_score_batch(inputs: CarbonBatchInput):
+    """Calculate sustainability scores for many profiles in one vectorized pass."""
+    columns = rows_to_columns(inputs.rows)
+    with stage("estimate"):
+        carbon_result = estimator.estimate_batch(columns)
+    with stage("score"):
+        score_result = scorer.score_batch(carbon_result["total_kg_co2_year"], carbon_result["breakdown"])
+    results = [
+        {
+            "overall_score": overall,
+            "grade": grade,
+            "grade_label": grade_label,
+            "category_scores": category_scores,
+            "total_kg_co2_year": total,
+            "breakdown": breakdown,
+        }
+        for overall, grade, grade_label, category_scores, total, breakdown in zip(
+            score_result["overall_score"].tolist(),
+            score_result["grade"].tolist(),
+            score_result["grade_label"].tolist(),
+            breakdown_rows(score_result["category_scores"]),
+            carbon_result["total_kg_co2_year"].tolist(),
+            breakdown_rows(carbon_result["breakdown"]),
+        )
+    ]
+    return {"results": results, "count": len(results)}
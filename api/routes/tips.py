@@ -1,27 +1,57 @@
 """
-Tips route: GET /api/tips
-Returns personalized eco-tips, optionally filtered by category.
+Tips routes: GET /api/tips, POST /api/tips/recommend
+Returns personalized eco-tips, optionally filtered by category or tag,
+or ranked for a user's emissions breakdown. GET /api/tips responses are
+serialized once per query and reference-data snapshot (see api/response_cache.py).
 """
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
+from api.metrics import TimedRoute, stage
 from typing import Optional
-from api.schemas import TipsResponse
-from models.eco_advisor import EcoAdvisor
+from api.schemas import TipsResponse, RecommendRequest
+from api.services import advisor, estimator, reference_responses
+from data.registry import reference_data
 
-router = APIRouter()
-advisor = EcoAdvisor()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/tips", response_model=TipsResponse)
-def get_tips(
+async def get_tips(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category: transport|energy|diet|shopping|waste"),
+    tag: Optional[str] = Query(None, description="Filter by tag, e.g. car|solar|food"),
     limit: int = Query(10, ge=1, le=50, description="Max number of tips to return"),
 ):
-    """Get eco-tips, optionally filtered by category."""
-    if category:
-        tips = advisor.get_by_category(category)[:limit]
+    """Get eco-tips, optionally filtered by category and/or tag."""
+    snapshot = reference_data.snapshot()
+    entry = reference_responses.get(
+        snapshot.version, ("/tips", category, tag, limit), lambda: build_tips(snapshot, category, tag, limit),
+    )
+    return reference_responses.respond(request, entry)
+
+
+def build_tips(snapshot, category: Optional[str], tag: Optional[str], limit: int) -> bytes:
+    """Serialized tips from `snapshot`, the one whose version the cached entry is stored under."""
+    index = advisor.index(snapshot)
+    if category and tag:
+        tips = [t for t in index.by_category.get(category, []) if tag in t.get("tags", [])][:limit]
+    elif category:
+        tips = index.by_category.get(category, [])[:limit]
+    elif tag:
+        tips = index.by_tag.get(tag, [])[:limit]
     else:
-        tips = advisor.get_all()[:limit]
+        tips = snapshot.eco_tips[:limit]
+    return TipsResponse(tips=tips, count=len(tips)).model_dump_json().encode()
+
+
+@router.post("/tips/recommend", response_model=TipsResponse)
+def recommend_tips(request: RecommendRequest):
+    """Rank tips for an emissions breakdown, or for lifestyle inputs when no breakdown is given."""
+    breakdown = request.breakdown
+    if breakdown is None:
+        with stage("estimate"):
+            breakdown = estimator.estimate(request.inputs.model_dump())["breakdown"]
+    tips = advisor.recommend(breakdown, top_n=request.top_n)
     return {"tips": tips, "count": len(tips)}
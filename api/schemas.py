@@ -1,8 +1,8 @@
 """
 Pydantic request/response schemas for the GreenMind AI API.
 """
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Optional, Dict, List
 
 
 class CarbonInput(BaseModel):
@@ -16,6 +16,8 @@ class CarbonInput(BaseModel):
     clothing_items_per_year: int = Field(10, ge=0, description="Clothing items bought per year")
     electronics_per_year: int = Field(1, ge=0, description="Electronics bought per year")
     waste_recycling_pct: float = Field(30.0, ge=0, le=100, description="Recycling percentage")
+    cohort: Optional[str] = Field(None, max_length=64, description="Cohort to rank against, e.g. an organisation (default: global)")
+    region: Optional[str] = Field(None, max_length=16, description="Grid region code, e.g. GB, US, IN (default/unknown: global factors)")
 
     class Config:
         json_schema_extra = {
@@ -34,12 +36,31 @@ class CarbonInput(BaseModel):
         }
 
 
+class UncertaintyBands(BaseModel):
+    samples: int
+    seed: int
+    percentiles: List[float]
+    total: Dict[str, float]
+    breakdown: Dict[str, Dict[str, float]]
+
+
+class PercentileRank(BaseModel):
+    cohort: str
+    count: int
+    total: float                    # % of the cohort with a lower annual footprint
+    breakdown: Dict[str, float]     # the same, per category
+
+
 class CarbonResponse(BaseModel):
     total_kg_co2_year: float
     breakdown: Dict[str, float]
     global_average_kg: float
     target_kg: float
     vs_global_average_pct: float
+    region: Optional[str] = None                # region whose factors were used ("global" as fallback)
+    region_average_kg: Optional[float] = None
+    uncertainty: Optional[UncertaintyBands] = None
+    percentile_rank: Optional[PercentileRank] = None
 
 
 class ScoreResponse(BaseModel):
@@ -49,6 +70,21 @@ class ScoreResponse(BaseModel):
     category_scores: Dict[str, float]
     total_kg_co2_year: float
     breakdown: Dict[str, float]
+    percentile_rank: Optional[PercentileRank] = None
+
+
+class CarbonBatchInput(BaseModel):
+    rows: List[CarbonInput] = Field(..., min_length=1, description="Profiles to score, in order")
+
+
+class CarbonBatchResponse(BaseModel):
+    results: List[CarbonResponse]
+    count: int
+
+
+class ScoreBatchResponse(BaseModel):
+    results: List[ScoreResponse]
+    count: int
 
 
 class TipItem(BaseModel):
@@ -66,6 +102,53 @@ class TipsResponse(BaseModel):
     count: int
 
 
+class RecommendRequest(BaseModel):
+    breakdown: Optional[Dict[str, float]] = Field(None, description="kg CO2/year per category")
+    inputs: Optional[CarbonInput] = Field(None, description="Lifestyle inputs, used when breakdown is omitted")
+    top_n: int = Field(5, ge=1, le=50, description="Number of tips to return")
+
+    @model_validator(mode="after")
+    def require_breakdown_or_inputs(self):
+        if self.breakdown is None and self.inputs is None:
+            raise ValueError("Provide either 'breakdown' or 'inputs'.")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "breakdown": {"transport": 3200, "energy": 1400, "diet": 2055, "shopping": 290, "waste": 130},
+                "top_n": 5,
+            }
+        }
+
+
+class SubmissionGroup(BaseModel):
+    count: int
+    sum_kg: float
+    mean_kg: float
+
+
+class SubmissionSummary(BaseModel):
+    count: int
+    sum_kg: float
+    mean_kg: Optional[float] = None
+    by_transport_mode: Dict[str, SubmissionGroup]
+    by_diet_type: Dict[str, SubmissionGroup]
+    by_grade: Dict[str, SubmissionGroup]
+    by_region: Dict[str, SubmissionGroup]
+    by_day: Dict[str, SubmissionGroup]      # UTC date → totals, last 30 days
+
+
+class RegionComparison(BaseModel):
+    region: str
+    name: str
+    average_kg: float
+    vs_global_average_pct: float
+    electricity_kg_per_kwh: float
+    reference_profile_kg: float                 # default CarbonInput profile, scored with this region's factors
+    submissions: Optional[SubmissionGroup] = None
+
+
 class DashboardSummary(BaseModel):
     global_average_kg: float
     target_kg: float
@@ -75,3 +158,57 @@ class DashboardSummary(BaseModel):
     category_labels: List[str]
     category_colors: List[str]
     tips_count: int
+    regions: List[RegionComparison] = []
+    submissions: Optional[SubmissionSummary] = None
+
+
+class ScenarioSpec(BaseModel):
+    name: str = Field(..., description="Label for this scenario")
+    set: Dict[str, Any] = Field(default_factory=dict, description="Fields to replace, e.g. {'diet_type': 'vegetarian'}")
+    scale: Dict[str, float] = Field(default_factory=dict, description="Fields to multiply, e.g. {'km_per_week': 0.5}")
+    add: Dict[str, float] = Field(default_factory=dict, description="Fields to offset, e.g. {'flights_short_per_year': -1}")
+
+
+class ScenarioRequest(BaseModel):
+    inputs: CarbonInput
+    scenarios: List[ScenarioSpec] = Field(default_factory=list, max_length=50, description="Custom what-if scenarios (at most 50)")
+    include_tips: bool = Field(True, description="Also evaluate every applicable eco-tip")
+    max_combination_size: int = Field(2, ge=1, le=3, description="Max tips combined per scenario")
+    top_n: int = Field(10, ge=1, le=100, description="Number of ranked scenarios to return")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "inputs": {"transport_mode": "car_petrol", "km_per_week": 200, "diet_type": "meat_heavy"},
+                "scenarios": [
+                    {"name": "Train + vegetarian", "set": {"transport_mode": "train", "diet_type": "vegetarian"}}
+                ],
+                "max_combination_size": 2,
+                "top_n": 5,
+            }
+        }
+
+
+class ScenarioBaseline(BaseModel):
+    total_kg_co2_year: float
+    breakdown: Dict[str, float]
+    overall_score: float
+    grade: str
+
+
+class ScenarioResult(BaseModel):
+    name: str
+    tip_ids: List[int]
+    changes: Dict[str, Any]
+    total_kg_co2_year: float
+    saved_kg_co2_year: float
+    breakdown: Dict[str, float]
+    overall_score: float
+    score_gain: float
+    grade: str
+
+
+class ScenarioResponse(BaseModel):
+    baseline: ScenarioBaseline
+    scenarios: List[ScenarioResult]
+    evaluated: int
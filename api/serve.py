@@ -0,0 +1,163 @@
+"""
+GreenMind AI – pre-fork production server
+Loads the app, the model and the reference data once in a parent process,
+then forks uvicorn workers that share those pages copy-on-write.
+
+    python -m api.serve --workers 4 --port 8000
+
+Before forking, the parent:
+    - imports api.main (FastAPI app, routes, pydantic schemas, NumPy) and
+      builds the OpenAPI schema
+    - loads the active model version and warms it up: its memory-mapped node
+      arrays are faulted in and the derived child-index array is built, and
+      the /predict cache grid, if enabled, is predicted
+    - parses the reference data and builds the per-snapshot lookup tables by
+      running each estimator/scorer/advisor path once
+    - gc.freeze()s everything, so collections in the workers never write to
+      the shared objects' GC headers and un-share their pages
+Garbage collection stays disabled in the parent while it builds all of this, so
+freed gaps are not left scattered over pages the workers will share. The
+parent also binds the listening socket, and every worker accepts on it.
+
+Workers start no threads until after the fork (the model watcher and the
+submission writer start in each worker's lifespan). A worker that exits is
+replaced; SIGINT/SIGTERM are forwarded to all workers for a graceful
+shutdown. A model version published while running is loaded by each worker
+on its own; restart the server to share it again.
+
+Without os.fork (Windows) this falls back to a single uvicorn process.
+"""
+import gc
+
+gc.disable()    # until the fork: see the module docstring
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+# ── Ensure project root is on sys.path ─────────────────────────────────────
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+
+from api.config import WORKERS
+from api import main
+from api.schemas import CarbonInput
+from api.services import advisor, estimator, scorer
+from data.registry import reference_data
+
+RESPAWN_DELAY = 1.0     # seconds to wait before replacing a worker that died young
+
+
+def warm_up():
+    """Load and exercise everything the workers will share; returns the model version."""
+    version, engine = main.get_model()
+    if engine is None:
+        print("⚠️  No model loaded; /predict routes will answer 503 until one is published.")
+    main.app.openapi()
+    snapshot = reference_data.snapshot()
+    estimator.tables(snapshot)
+    profile = CarbonInput().model_dump()
+    result = estimator.estimate(profile)
+    estimator.estimate_batch({field: [value] * 2 for field, value in profile.items()})
+    scorer.score(result["total_kg_co2_year"], result["breakdown"])
+    advisor.recommend(result["breakdown"])
+    if main.prediction_cache is not None:
+        main.prediction_cache.wait_for_grid()   # no builder thread may run across the fork
+    return version
+
+
+def bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, args):
+    gc.enable()
+    config = uvicorn.Config(main.app, log_level=args.log_level, timeout_keep_alive=args.keep_alive)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(args):
+    if not hasattr(os, "fork"):
+        print("⚠️  os.fork is not available; serving from a single uvicorn process.")
+        gc.enable()
+        uvicorn.run(main.app, host=args.host, port=args.port, log_level=args.log_level)
+        return
+
+    version = warm_up()
+    sock = bind(args.host, args.port)
+    gc.freeze()
+    print(f"✅  Parent {os.getpid()} loaded model {version}; "
+          f"forking {args.workers} worker(s) on http://{args.host}:{args.port}")
+
+    workers = {}            # pid → fork time
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(sock, args)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        workers[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(args.workers):
+        spawn()
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"⚠️  Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; starting a new one.")
+        if time.monotonic() - started < RESPAWN_DELAY:
+            time.sleep(RESPAWN_DELAY)
+        if not stopping:
+            spawn()
+    sock.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the GreenMind AI API from pre-forked workers.")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="Worker processes (default: GREENMIND_WORKERS or the CPU count)")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8000")))
+    parser.add_argument("--keep-alive", type=int, default=5, help="Keep-alive timeout in seconds (default 5)")
+    parser.add_argument("--log-level", default="warning")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    serve(parse_args())
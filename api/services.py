@@ -0,0 +1,32 @@
+"""
+Process-wide model instances shared by all routes.
+They read reference data from data.registry, so a change to the JSON files
+is picked up by every route at once, without a restart.
+The same goes for reference_responses, which caches serialized reference
+responses per snapshot. cohort_ranks keeps the per-cohort footprint sketches,
+and submissions (None when GREENMIND_SUBMISSIONS_DB is empty) the submission log.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from api.config import REFERENCE_MAX_AGE, SKETCH_DIR, SUBMISSIONS_DB
+from api.response_cache import ResponseCache
+from data.registry import reference_data
+from data.submissions import SubmissionStore
+from models.carbon_estimator import CarbonEstimator
+from models.sustainability_score import SustainabilityScorer
+from models.eco_advisor import EcoAdvisor
+from models.scenario_engine import ScenarioEngine
+from models.uncertainty import UncertaintyEstimator
+from models.percentile_sketch import CohortRanks
+
+estimator = CarbonEstimator(reference_data)
+scorer = SustainabilityScorer(reference_data)
+advisor = EcoAdvisor(reference_data)
+scenario_engine = ScenarioEngine(estimator, scorer, advisor)
+uncertainty_estimator = UncertaintyEstimator(estimator)
+reference_responses = ResponseCache(max_age=REFERENCE_MAX_AGE)
+cohort_ranks = CohortRanks(SKETCH_DIR)
+submissions = SubmissionStore(
+    SUBMISSIONS_DB, grade=lambda total, breakdown: scorer.score(total, breakdown)["grade"],
+) if SUBMISSIONS_DB else None
@@ -0,0 +1,153 @@
+"""
+GreenMind AI – /predict micro-batching load test
+Starts the API under uvicorn twice, once per mode: with micro-batching off
+and with it on (GREENMIND_MICROBATCH=1). Each time it drives concurrent
+single-row /predict calls for a fixed duration and reports p50/p99 latency
+and requests/sec, plus the batcher's own stats.
+
+Requires uvicorn and httpx.
+
+Usage:
+    python benchmarks/microbatch_load.py
+    python benchmarks/microbatch_load.py --concurrency 256 --duration 20 --window-ms 1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Ensure stdout can handle utf-8 characters properly on Windows
+sys.stdout.reconfigure(encoding='utf-8')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+import numpy as np
+
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env={**os.environ, **env},
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).json().get("model_version"):
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("API did not start (or has no model) within 30 s.")
+
+
+def encode_requests(n: int = 1024) -> list:
+    """Pre-encoded HTTP/1.1 keep-alive /predict requests (random valid rows)."""
+    rng = np.random.default_rng(0)
+    requests = []
+    for t, h, hr in zip(rng.uniform(0, 60, n).round(1), rng.uniform(0, 100, n).round(1), rng.integers(0, 24, n)):
+        body = json.dumps({"temperature": float(t), "humidity": float(h), "hour": int(hr)}).encode()
+        head = (
+            "POST /predict HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode()
+        requests.append(head + body)
+    return requests
+
+
+async def drive(port: int, concurrency: int, duration: float) -> np.ndarray:
+    """
+    Closed-loop load: `concurrency` keep-alive connections each send /predict
+    back to back. Uses raw asyncio streams so the generator stays much cheaper
+    than the server it measures.
+    """
+    requests = encode_requests()
+    latencies = []
+    stop_at = time.perf_counter() + duration
+
+    async def worker(i: int):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        n = i
+        try:
+            while time.perf_counter() < stop_at:
+                start = time.perf_counter()
+                writer.write(requests[n % len(requests)])
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head.startswith(b"HTTP/1.1 200"):
+                    raise RuntimeError(f"Unexpected response: {head[:40]!r}")
+                length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - start)
+                n += concurrency
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return np.array(latencies) * 1000
+
+
+def run_mode(name: str, env: dict, args) -> dict:
+    proc = start_server(args.port, env)
+    try:
+        asyncio.run(drive(args.port, args.concurrency, 1.0))   # warm-up
+        start = time.perf_counter()
+        latencies = asyncio.run(drive(args.port, args.concurrency, args.duration))
+        elapsed = time.perf_counter() - start
+        stats = httpx.get(f"http://127.0.0.1:{args.port}/predict/microbatch/stats").json()
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {
+        "mode": name,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "stats": stats,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test /predict with and without micro-batching.")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients (default 64)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per mode (default 10)")
+    parser.add_argument("--window-ms", type=float, default=2.0, help="Micro-batch window (default 2 ms)")
+    parser.add_argument("--max-size", type=int, default=256, help="Micro-batch max size (default 256)")
+    parser.add_argument("--port", type=int, default=8765)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("=" * 55)
+    print("  🌿  GreenMind AI – /predict micro-batching load test")
+    print("=" * 55)
+    print(f"\n⚙️   Concurrency {args.concurrency}  |  {args.duration:.0f} s per mode")
+
+    modes = [
+        ("off", {"GREENMIND_MICROBATCH": "0"}),
+        ("on", {
+            "GREENMIND_MICROBATCH": "1",
+            "GREENMIND_MICROBATCH_WINDOW_MS": str(args.window_ms),
+            "GREENMIND_MICROBATCH_MAX_SIZE": str(args.max_size),
+        }),
+    ]
+    results = [run_mode(name, env, args) for name, env in modes]
+
+    print(f"\n📊  {'mode':<5} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(f"    {r['mode']:<5} {r['requests']:>9} {r['rps']:>8.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+    stats = results[-1]["stats"]
+    print(f"\n📦  Micro-batcher: {stats['batches']} batches, mean size {stats['mean_batch_size']}, "
+          f"added latency mean {stats['added_latency_ms']['mean']} ms / max {stats['added_latency_ms']['max']} ms")
+    print(f"    Batch sizes: {stats['batch_size_histogram']}")
+    print("=" * 55 + "\n")
+
+
+if __name__ == "__main__":
+    main()
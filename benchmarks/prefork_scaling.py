@@ -0,0 +1,179 @@
+"""
+GreenMind AI – multi-worker memory and throughput scaling
+Starts the API with 1..N workers in two ways and measures each:
+
+    uvicorn   python -m uvicorn api.main:app --workers N  (every worker imports
+              the app and loads the model and reference data on its own)
+    prefork   python -m api.serve --workers N  (loaded once in the parent,
+              workers forked and sharing those pages copy-on-write)
+
+For every run it drives closed-loop /predict traffic (see
+benchmarks/microbatch_load.py), then reads /proc/<pid>/smaps_rollup of the
+server's processes:
+    RSS  resident pages, counting shared pages in full in every process
+    PSS  resident pages, with each shared page split between its sharers;
+         the PSS of all processes adds up to the real memory use
+    USS  pages private to the process (what killing it would free)
+
+Linux only (smaps_rollup). Requires uvicorn and httpx.
+
+Usage:
+    python benchmarks/prefork_scaling.py
+    python benchmarks/prefork_scaling.py --max-workers 8 --duration 10 --concurrency 128
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+# Ensure stdout can handle utf-8 characters properly on Windows
+sys.stdout.reconfigure(encoding='utf-8')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import httpx
+
+from benchmarks.microbatch_load import drive
+
+MODES = {
+    "uvicorn": lambda n, port: [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port),
+                                "--workers", str(n), "--log-level", "warning"],
+    "prefork": lambda n, port: [sys.executable, "-m", "api.serve", "--host", "127.0.0.1", "--port", str(port),
+                                "--workers", str(n)],
+}
+
+
+def descendants(pid: int) -> list:
+    """pids of every process below pid, from the ppid field of /proc/<pid>/stat."""
+    parents = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", encoding="utf-8") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        parents.setdefault(int(fields[1]), []).append(int(name))
+    found, stack = [], [pid]
+    while stack:
+        children = parents.get(stack.pop(), [])
+        found.extend(children)
+        stack.extend(children)
+    return found
+
+
+def memory_kb(pid: int) -> dict:
+    """RSS, PSS and USS (kB) of one process."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "uss": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
+
+
+def start(mode: str, workers: int, port: int, env: dict) -> subprocess.Popen:
+    proc = subprocess.Popen(MODES[mode](workers, port), cwd=ROOT, env={**os.environ, **env})
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).json().get("model_version"):
+                # Every worker must be up before memory is read.
+                if len(worker_pids(mode, proc.pid)) >= workers:
+                    return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{mode} server did not start (or has no model) within 60 s.")
+
+
+def worker_pids(mode: str, pid: int) -> list:
+    """Serving processes: the workers below the supervisor, or the server itself (uvicorn, 1 worker)."""
+    pids = descendants(pid)
+    if mode == "uvicorn":
+        # uvicorn's multiprocessing may add a resource tracker; serving workers import the app.
+        pids = [p for p in pids if "multiprocessing.resource_tracker" not in _cmdline(p)]
+    return pids or [pid]
+
+
+def _cmdline(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return ""
+
+
+def run(mode: str, workers: int, args, env: dict) -> dict:
+    proc = start(mode, workers, args.port, env)
+    try:
+        asyncio.run(drive(args.port, args.concurrency, 1.0))   # warm-up
+        began = time.perf_counter()
+        latencies = asyncio.run(drive(args.port, args.concurrency, args.duration))
+        elapsed = time.perf_counter() - began
+        pids = worker_pids(mode, proc.pid)
+        per_worker = [memory_kb(pid) for pid in pids]
+        parent = memory_kb(proc.pid) if proc.pid not in pids else {"pss": 0}
+    finally:
+        proc.terminate()
+        proc.wait()
+    mean = {key: sum(m[key] for m in per_worker) / len(per_worker) for key in ("rss", "pss", "uss")}
+    return {
+        "mode": mode,
+        "workers": workers,
+        "rps": len(latencies) / elapsed,
+        "worker_rss_mb": mean["rss"] / 1024,
+        "worker_pss_mb": mean["pss"] / 1024,
+        "worker_uss_mb": mean["uss"] / 1024,
+        "total_pss_mb": (parent["pss"] + sum(m["pss"] for m in per_worker)) / 1024,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Per-worker memory and throughput, uvicorn vs pre-fork.")
+    parser.add_argument("--max-workers", type=int, default=max(os.cpu_count() or 1, 2),
+                        help="Largest worker count (default: CPU count, at least 2)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent clients (default 64)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of load per run (default 5)")
+    parser.add_argument("--mode", action="append", choices=sorted(MODES), help="Only these modes (repeatable)")
+    parser.add_argument("--port", type=int, default=8766)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # /predict only; keep the submission store from opening data/submissions.db.
+    env = {"GREENMIND_SUBMISSIONS_DB": "", "GREENMIND_MICROBATCH": "0"}
+    print("=" * 78)
+    print("  🌿  GreenMind AI – multi-worker memory and throughput scaling")
+    print("=" * 78)
+    print(f"\n⚙️   {os.cpu_count()} CPU(s)  |  concurrency {args.concurrency}  |  {args.duration:.0f} s per run")
+
+    results = []
+    for mode in args.mode or ("uvicorn", "prefork"):
+        for workers in range(1, args.max_workers + 1):
+            results.append(run(mode, workers, args, env))
+            r = results[-1]
+            print(f"    {mode:<8} {workers:>2} worker(s): {r['rps']:>7.0f} req/s, "
+                  f"worker PSS {r['worker_pss_mb']:.1f} MB")
+
+    print(f"\n📊  {'mode':<8} {'workers':>7} {'req/s':>8} {'RSS/wkr':>8} {'PSS/wkr':>8} {'USS/wkr':>8} {'total PSS':>10}")
+    for r in results:
+        print(f"    {r['mode']:<8} {r['workers']:>7} {r['rps']:>8.0f} {r['worker_rss_mb']:>7.1f}M "
+              f"{r['worker_pss_mb']:>7.1f}M {r['worker_uss_mb']:>7.1f}M {r['total_pss_mb']:>9.1f}M")
+    print("=" * 78 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+GreenMind AI – Benchmark suite
+Measures the hot paths at three levels and compares against a JSON baseline.
+
+    inproc  direct calls: ForestEngine single/batch predict, CarbonEstimator.estimate,
+            SustainabilityScorer.score, EcoAdvisor.recommend, the data loaders,
+            model artifact load time and API import time
+    asgi    the same work through FastAPI's TestClient (routing, validation, serialization)
+    load    closed-loop /predict traffic against a local uvicorn server
+
+Each case reports median and p99 latency (µs) and throughput (ops/s), with
+median and throughput taken from the best of five rounds to damp noise. With
+--baseline, a case fails when its median or throughput is more than
+--threshold (default 25%) worse than the baseline, or its p99 more than twice
+that. A failing case makes the run exit with status 1. Baselines are
+machine-specific: record one per machine with --save-baseline.
+
+Usage:
+    python benchmarks/run.py                                  # all tiers, compare with benchmarks/baseline.json
+    python benchmarks/run.py --tier inproc --tier asgi        # skip the uvicorn load test
+    python benchmarks/run.py --save-baseline                  # record a new baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Ensure stdout can handle utf-8 characters properly on Windows
+sys.stdout.reconfigure(encoding='utf-8')
+
+# ── Ensure project root is on sys.path ─────────────────────────────────────
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+TIERS = ("inproc", "asgi", "load")
+
+PROFILE = {
+    "transport_mode": "car_petrol", "km_per_week": 250, "flights_short_per_year": 3,
+    "flights_long_per_year": 1, "electricity_kwh_month": 350, "natural_gas_kwh_month": 200,
+    "diet_type": "meat_heavy", "clothing_items_per_year": 25, "electronics_per_year": 3,
+    "waste_recycling_pct": 20,
+}
+PREDICT_ROW = {"temperature": 32.5, "humidity": 60, "hour": 14}
+
+
+def measure(fn, min_time: float = 0.5, min_calls: int = 20, warmup: int = 5, rounds: int = 5) -> dict:
+    """
+    Call fn for at least min_time seconds, split into `rounds` rounds.
+    Median and throughput come from the best round, which filters out rounds
+    disturbed by other load on the machine; p99 is over all calls.
+    """
+    for _ in range(warmup):
+        fn()
+    all_samples, medians, means = [], [], []
+    for _ in range(rounds):
+        samples = []
+        deadline = time.perf_counter() + min_time / rounds
+        while len(samples) < max(1, min_calls // rounds) or time.perf_counter() < deadline:
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+        medians.append(float(np.median(samples)))
+        means.append(float(np.mean(samples)))
+        all_samples += samples
+    return {
+        "median_us": round(min(medians) * 1e6, 2),
+        "p99_us": round(float(np.percentile(all_samples, 99)) * 1e6, 2),
+        "ops_per_s": round(1 / min(means), 1),
+        "calls": len(all_samples),
+    }
+
+
+# ── Tiers ───────────────────────────────────────────────────────────────────
+def bench_inproc(min_time: float) -> dict:
+    from data.registry import ReferenceRegistry
+    from data.loader import load_emissions_factors, load_eco_tips
+    from models.carbon_estimator import CarbonEstimator
+    from models.sustainability_score import SustainabilityScorer
+    from models.eco_advisor import EcoAdvisor
+    from models.forest_engine import ForestEngine
+    from models.model_registry import ModelRegistry, current_version, version_path, warm_up
+
+    model_root = os.path.join(ROOT, "models", "energy_model")
+    artifact = version_path(model_root, current_version(model_root))
+    engine = ModelRegistry(model_root).get()[1]
+    rng = np.random.default_rng(0)
+    batch = np.column_stack([rng.uniform(0, 60, 1000), rng.uniform(0, 100, 1000), rng.integers(0, 24, 1000)])
+    row = [PREDICT_ROW["temperature"], PREDICT_ROW["humidity"], PREDICT_ROW["hour"]]
+
+    estimator, scorer, advisor = CarbonEstimator(), SustainabilityScorer(), EcoAdvisor()
+    carbon = estimator.estimate(PROFILE)
+
+    def model_load():
+        warm_up(ForestEngine.load(artifact))
+
+    results = {
+        "forest.predict_one": measure(lambda: engine.predict_one(row), min_time),
+        "forest.predict_batch_1000": measure(lambda: engine.predict(batch), min_time),
+        "carbon.estimate": measure(lambda: estimator.estimate(PROFILE), min_time),
+        "score.score": measure(lambda: scorer.score(carbon["total_kg_co2_year"], carbon["breakdown"]), min_time),
+        "advisor.recommend": measure(lambda: advisor.recommend(carbon["breakdown"], top_n=5), min_time),
+        "loader.emissions_factors": measure(load_emissions_factors, min_time),
+        "loader.eco_tips": measure(load_eco_tips, min_time),
+        "loader.parse_reference_data": measure(lambda: ReferenceRegistry().reload(), min_time),
+        "model.load_and_warm": measure(model_load, min_time),
+    }
+    results["app.import"] = measure(
+        lambda: subprocess.run([sys.executable, "-c", "import api.main"], cwd=ROOT, check=True,
+                               stdout=subprocess.DEVNULL),
+        min_time=0, min_calls=5, warmup=1, rounds=5,
+    )
+    return results
+
+
+def bench_asgi(min_time: float) -> dict:
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    batch = {"rows": [PREDICT_ROW] * 100}
+    cases = {
+        "asgi.predict": ("post", "/predict", PREDICT_ROW),
+        "asgi.predict_batch_100": ("post", "/predict/batch", batch),
+        "asgi.carbon_footprint": ("post", "/api/carbon-footprint", PROFILE),
+        "asgi.score": ("post", "/api/score", PROFILE),
+        "asgi.tips_recommend": ("post", "/api/tips/recommend", {"inputs": PROFILE, "top_n": 5}),
+        "asgi.dashboard_summary": ("get", "/api/dashboard/summary", None),
+    }
+    results = {}
+    with TestClient(app) as client:
+        for name, (method, path, body) in cases.items():
+            call = (lambda p=path, b=body: client.post(p, json=b).raise_for_status()) if method == "post" \
+                else (lambda p=path: client.get(p).raise_for_status())
+            results[name] = measure(call, min_time)
+    return results
+
+
+def bench_load(duration: float, concurrency: int = 32, port: int = 8766) -> dict:
+    from benchmarks.microbatch_load import start_server, drive
+
+    proc = start_server(port, {"GREENMIND_MICROBATCH": "0"})
+    try:
+        asyncio.run(drive(port, concurrency, 1.0))   # warm-up
+        start = time.perf_counter()
+        latencies = asyncio.run(drive(port, concurrency, duration))
+        elapsed = time.perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {
+        f"load.predict_c{concurrency}": {
+            "median_us": round(float(np.percentile(latencies, 50)) * 1000, 2),
+            "p99_us": round(float(np.percentile(latencies, 99)) * 1000, 2),
+            "ops_per_s": round(len(latencies) / elapsed, 1),
+            "calls": len(latencies),
+        }
+    }
+
+
+# ── Baseline comparison ─────────────────────────────────────────────────────
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return (name, reason) pairs for every case that regressed past the threshold."""
+    failures = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["median_us"] > base["median_us"] * (1 + threshold):
+            failures.append((name, f"median {current['median_us']:.1f} µs vs {base['median_us']:.1f} µs"))
+        if current["ops_per_s"] < base["ops_per_s"] * (1 - threshold):
+            failures.append((name, f"throughput {current['ops_per_s']:.0f}/s vs {base['ops_per_s']:.0f}/s"))
+        if current["p99_us"] > base["p99_us"] * (1 + 2 * threshold):
+            failures.append((name, f"p99 {current['p99_us']:.1f} µs vs {base['p99_us']:.1f} µs"))
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the GreenMind AI benchmark suite.")
+    parser.add_argument("--tier", action="append", choices=TIERS, help="Tier(s) to run (default: all)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds per in-process/ASGI case (default 0.5)")
+    parser.add_argument("--load-duration", type=float, default=5.0, help="Seconds of load test (default 5)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON (default: benchmarks/baseline.json)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed regression (default 0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--output", help="Also write the results JSON here")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    tiers = args.tier or list(TIERS)
+    print("=" * 55)
+    print("  🌿  GreenMind AI – Benchmarks")
+    print("=" * 55)
+
+    results = {}
+    if "inproc" in tiers:
+        results.update(bench_inproc(args.min_time))
+    if "asgi" in tiers:
+        results.update(bench_asgi(args.min_time))
+    if "load" in tiers:
+        results.update(bench_load(args.load_duration))
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print(f"\n📊  {'case':<30} {'median µs':>11} {'p99 µs':>11} {'ops/s':>10} {'vs base':>8}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        delta = f"{(r['median_us'] / base['median_us'] - 1) * 100:+.0f}%" if base else "–"
+        print(f"    {name:<30} {r['median_us']:>11.1f} {r['p99_us']:>11.1f} {r['ops_per_s']:>10.0f} {delta:>8}")
+
+    document = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"\n💾  Baseline written to: {args.baseline}")
+        print("=" * 55 + "\n")
+        return 0
+
+    failures = compare(results, baseline, args.threshold)
+    if failures:
+        print(f"\n❌  {len(failures)} regression(s) beyond {args.threshold:.0%}:")
+        for name, reason in failures:
+            print(f"    {name}: {reason}")
+    elif baseline:
+        print(f"\n✅  No regressions beyond {args.threshold:.0%}.")
+    else:
+        print(f"\n⚠️  No baseline at {args.baseline}; run with --save-baseline to record one.")
+    print("=" * 55 + "\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
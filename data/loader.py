@@ -1,16 +1,19 @@
-import json
+"""
+Reference-data loaders.
+Both functions return the registry's current snapshot (see data/registry.py):
+files are parsed once per process and re-read only when they change on disk.
+The returned objects are shared – treat them as read-only.
+"""
 import os
 
+from data.registry import reference_data
+
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 def load_emissions_factors() -> dict:
-    path = os.path.join(DATA_DIR, "emissions_factors.json")
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return reference_data.snapshot().emissions_factors
 
 
 def load_eco_tips() -> list:
-    path = os.path.join(DATA_DIR, "eco_tips.json")
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return reference_data.snapshot().eco_tips
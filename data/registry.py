@@ -0,0 +1,132 @@
+"""
+Reference-data registry
+Parses emissions_factors.json and eco_tips.json once per process and hands
+out immutable snapshots.
+
+The files are re-checked at most every GREENMIND_REFERENCE_CHECK_INTERVAL
+seconds (default 1.0) by comparing mtime/size, then a SHA-256 of the content.
+When a file really changed, a new snapshot is parsed off to the side and
+swapped in with a single reference assignment, so readers always see either
+the old or the new data in full. A file that fails to parse leaves the
+current snapshot in place.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+EMISSIONS_FACTORS_FILE = "emissions_factors.json"
+ECO_TIPS_FILE = "eco_tips.json"
+
+
+class ReferenceSnapshot:
+    """One consistent version of the reference data. Treat all fields as read-only."""
+
+    def __init__(self, version: int, emissions_factors: dict, eco_tips: list, digests: dict):
+        self.version = version
+        self.emissions_factors = emissions_factors
+        self.eco_tips = eco_tips
+        self.digests = digests
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def derived(self, key: str, build):
+        """Return build(self), computed once per snapshot (e.g. compiled lookup tables)."""
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = build(self)
+            return self._derived[key]
+
+
+class ReferenceRegistry:
+    def __init__(self, data_dir: str = DATA_DIR, check_interval: float = None):
+        if check_interval is None:
+            check_interval = float(os.environ.get("GREENMIND_REFERENCE_CHECK_INTERVAL", "1.0"))
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._stats = {}
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def snapshot(self) -> ReferenceSnapshot:
+        """Current snapshot; re-checks the files when the check interval has elapsed."""
+        snap = self._snapshot
+        if snap is not None and time.monotonic() < self._next_check:
+            return snap
+        return self._refresh(force=False)
+
+    def reload(self) -> ReferenceSnapshot:
+        """Re-check the files now, regardless of the check interval."""
+        return self._refresh(force=True)
+
+    def on_reload(self, callback):
+        """Register callback(snapshot), called after each swap to a new snapshot."""
+        self._listeners.append(callback)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.data_dir, name)
+
+    def _stat(self, name: str) -> tuple:
+        st = os.stat(self._path(name))
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self, force: bool) -> ReferenceSnapshot:
+        with self._lock:
+            current = self._snapshot
+            if current is not None and not force and time.monotonic() < self._next_check:
+                return current   # another thread refreshed while we waited
+
+            names = (EMISSIONS_FACTORS_FILE, ECO_TIPS_FILE)
+            try:
+                stats = {name: self._stat(name) for name in names}
+                if current is None or stats != self._stats:
+                    new = self._load(current, names)
+                    self._stats = stats
+                    if new is not current:
+                        self._snapshot = new
+                        for callback in self._listeners:
+                            callback(new)
+            except (OSError, ValueError) as e:
+                if current is None:
+                    raise
+                print(f"⚠️  Reference data reload failed, keeping version {current.version}: {e}")
+            finally:
+                self._next_check = time.monotonic() + self.check_interval
+            return self._snapshot
+
+    def _load(self, current, names) -> ReferenceSnapshot:
+        """Parse files whose content hash changed; reuse the rest from `current`."""
+        parsed, digests = {}, {}
+        for name in names:
+            with open(self._path(name), "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            digests[name] = digest
+            if current is not None and current.digests.get(name) == digest:
+                parsed[name] = None
+            else:
+                parsed[name] = json.loads(raw.decode("utf-8"))
+
+        if current is not None and all(value is None for value in parsed.values()):
+            return current   # touched but identical content
+
+        return ReferenceSnapshot(
+            version=(current.version + 1) if current is not None else 1,
+            emissions_factors=parsed[EMISSIONS_FACTORS_FILE] if parsed[EMISSIONS_FACTORS_FILE] is not None
+            else current.emissions_factors,
+            eco_tips=parsed[ECO_TIPS_FILE] if parsed[ECO_TIPS_FILE] is not None else current.eco_tips,
+            digests=digests,
+        )
+
+
+# Process-wide registry shared by every estimator, scorer, advisor and route.
+reference_data = ReferenceRegistry()
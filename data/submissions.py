@@ -0,0 +1,249 @@
+"""
+Submission store
+Keeps every profile submitted to /api/carbon-footprint and /api/score in a
+SQLite database (WAL mode), together with running aggregates the dashboard
+reads instead of scanning the log.
+
+record() only puts a tuple on a bounded in-memory queue, so request latency
+does not depend on the disk. A background thread drains the queue every
+GREENMIND_SUBMISSIONS_FLUSH_INTERVAL seconds (default 0.5), or once 1000
+rows are waiting, and writes each batch in one transaction:
+    - the rows are appended to `submissions`
+    - the batch is folded into `aggregates` (count and kg CO2 sums per
+      transport mode, diet type, grade, region and UTC day), one upsert per key.
+      Mode, diet and region are the factor keys the estimate used, not the
+      raw inputs, so the set of aggregate keys stays bounded
+    - `meta.seq` is incremented, so readers can tell when aggregates moved
+
+Several worker processes can share one file: WAL lets readers run alongside
+the single writer, and writers wait on each other via busy_timeout. When the
+queue is full, e.g. because the disk stalls, new submissions are dropped and
+counted rather than blocking requests.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from models.carbon_estimator import CATEGORIES
+
+DIMENSIONS = ("all", "transport_mode", "diet_type", "grade", "region", "day")
+FLUSH_ROWS = 1000
+QUEUE_SIZE = 100_000
+SUMMARY_DAYS = 30
+
+_STOP = object()
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    cohort TEXT,
+    transport_mode TEXT,
+    diet_type TEXT,
+    grade TEXT,
+    region TEXT,
+    total_kg REAL NOT NULL,
+    {", ".join(f"{cat}_kg REAL" for cat in CATEGORIES)},
+    inputs TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aggregates (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    sum_total_kg REAL NOT NULL,
+    {", ".join(f"sum_{cat}_kg REAL NOT NULL" for cat in CATEGORIES)},
+    PRIMARY KEY (dimension, key)
+);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('seq', 0);
+"""
+
+INSERT_SUBMISSION = (
+    f"INSERT INTO submissions (ts, endpoint, cohort, transport_mode, diet_type, grade, region, total_kg, "
+    f"{', '.join(f'{cat}_kg' for cat in CATEGORIES)}, inputs) "
+    f"VALUES ({', '.join('?' * (9 + len(CATEGORIES)))})"
+)
+UPSERT_AGGREGATE = (
+    f"INSERT INTO aggregates VALUES ({', '.join('?' * (4 + len(CATEGORIES)))}) "
+    f"ON CONFLICT (dimension, key) DO UPDATE SET count = count + excluded.count, "
+    f"sum_total_kg = sum_total_kg + excluded.sum_total_kg, "
+    + ", ".join(f"sum_{cat}_kg = sum_{cat}_kg + excluded.sum_{cat}_kg" for cat in CATEGORIES)
+)
+
+
+def _empty_summary() -> dict:
+    return {
+        "seq": 0, "count": 0, "sum_kg": 0.0, "mean_kg": None,
+        "by_transport_mode": {}, "by_diet_type": {}, "by_grade": {}, "by_region": {}, "by_day": {},
+    }
+
+
+class SubmissionStore:
+    def __init__(self, path: str, grade=None, flush_interval: float = None):
+        """
+        grade: optional callable(total_kg, breakdown) → grade letter, run on the
+               writer thread for submissions that arrive without one.
+        """
+        if flush_interval is None:
+            flush_interval = float(os.environ.get("GREENMIND_SUBMISSIONS_FLUSH_INTERVAL", "0.5"))
+        self.path = path
+        self.grade = grade
+        self.flush_interval = flush_interval
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self._summary = None            # (seq, summary dict), re-read at most once per flush interval
+        self._summary_checked = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(submissions)")}
+        if "region" not in columns:     # databases created before regions existed
+            conn.execute("ALTER TABLE submissions ADD COLUMN region TEXT")
+        return conn
+
+    # ── Writing ──────────────────────────────────────────────────────────────
+    def record(self, endpoint: str, inputs: dict, total_kg: float, breakdown: dict, grade: str = None,
+               region: str = None, transport_mode: str = None, diet_type: str = None):
+        """
+        Queue one submission; never blocks on I/O. region, transport_mode and
+        diet_type: the factor keys the estimate used (CarbonEstimator.estimate
+        returns them), recorded and aggregated instead of the raw inputs.
+        """
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(
+                (time.time(), endpoint, inputs, total_kg, breakdown, grade, region, transport_mode, diet_type)
+            )
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_writer(self):
+        """Start the writer thread on first use (and again in a forked child, which has none)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+            self._thread = threading.Thread(target=self._run, name="submission-writer", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def close(self, timeout: float = 10.0):
+        """Flush queued submissions and stop the writer."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        self._pid = None
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  Submission store disabled, cannot open {self.path}: {e}")
+            return
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            if batch[0] is _STOP:
+                break
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < FLUSH_ROWS:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._write(conn, batch)
+            except Exception as e:
+                print(f"⚠️  Dropped {len(batch)} submissions: {e}")
+        conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: list):
+        rows, totals = [], {}
+        for ts, endpoint, inputs, total_kg, breakdown, grade, region, transport_mode, diet_type in batch:
+            if grade is None and self.grade is not None:
+                grade = self.grade(total_kg, breakdown)
+            parts = [float(breakdown.get(cat, 0.0)) for cat in CATEGORIES]
+            rows.append((ts, endpoint, inputs.get("cohort"), transport_mode, diet_type, grade, region, total_kg,
+                         *parts, json.dumps(inputs)))
+            day = time.strftime("%Y-%m-%d", time.gmtime(ts))
+            for key in (("all", "all"), ("transport_mode", transport_mode), ("diet_type", diet_type),
+                        ("grade", grade), ("region", region), ("day", day)):
+                if key[1] is None:
+                    continue
+                acc = totals.get(key)
+                if acc is None:
+                    acc = totals[key] = [0, 0.0] + [0.0] * len(CATEGORIES)
+                acc[0] += 1
+                acc[1] += total_kg
+                for i, part in enumerate(parts):
+                    acc[2 + i] += part
+        with conn:
+            conn.executemany(INSERT_SUBMISSION, rows)
+            conn.executemany(UPSERT_AGGREGATE, [(*key, *acc) for key, acc in totals.items()])
+            conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'seq'")
+
+    # ── Reading ──────────────────────────────────────────────────────────────
+    def summary(self) -> dict:
+        """
+        Aggregates for the dashboard: count and mean kg CO2 overall and per
+        transport mode, diet type, grade, region and the last SUMMARY_DAYS days (sums too).
+        Reads only the aggregates table (one row per key) and only when meta.seq
+        has moved; includes "seq" so responses can be cached per version.
+        """
+        now = time.monotonic()
+        cached = self._summary
+        if cached is not None and now < self._summary_checked + self.flush_interval:
+            return cached[1]
+        self._summary_checked = now
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=5)
+        except sqlite3.Error:
+            return _empty_summary()             # nothing written yet
+        try:
+            seq = conn.execute("SELECT value FROM meta WHERE name = 'seq'").fetchone()[0]
+            if cached is not None and cached[0] == seq:
+                return cached[1]
+            since = time.strftime("%Y-%m-%d", time.gmtime(time.time() - (SUMMARY_DAYS - 1) * 86400))
+            rows = conn.execute(
+                "SELECT dimension, key, count, sum_total_kg FROM aggregates WHERE dimension != 'day' OR key >= ?",
+                (since,),
+            ).fetchall()
+        except sqlite3.Error:
+            return _empty_summary()             # schema not created yet
+        finally:
+            conn.close()
+
+        groups = {dimension: {} for dimension in DIMENSIONS}
+        for dimension, key, count, total in rows:
+            groups[dimension][key] = {"count": count, "sum_kg": round(total, 2), "mean_kg": round(total / count, 2)}
+        overall = groups.pop("all").get("all", {"count": 0, "sum_kg": 0.0, "mean_kg": None})
+        summary = {
+            "seq": seq,
+            **overall,
+            "by_transport_mode": groups["transport_mode"],
+            "by_diet_type": groups["diet_type"],
+            "by_grade": groups["grade"],
+            "by_region": groups["region"],
+            "by_day": dict(sorted(groups["day"].items())),
+        }
+        self._summary = (seq, summary)
+        return summary
@@ -0,0 +1,226 @@
+"""
+GreenMind AI – Bulk Scorer
+Streams large CSV/JSONL survey exports through the carbon estimator,
+sustainability scorer and eco advisor, and writes one result row per input row.
+
+The input is read in fixed-size chunks, chunks are fanned out to a process
+pool, and results are written incrementally in input order. At most
+2 × workers chunks are in flight, so memory stays bounded whatever the file size.
+
+Usage:
+    python models/bulk_score.py responses.csv results.csv
+    python models/bulk_score.py responses.jsonl results.parquet --chunk-size 100000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Ensure stdout can handle utf-8 characters properly on Windows
+sys.stdout.reconfigure(encoding='utf-8')
+
+# ── Ensure project root is on sys.path ─────────────────────────────────────
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from models.carbon_estimator import CarbonEstimator, CATEGORIES
+from models.sustainability_score import SustainabilityScorer
+from models.eco_advisor import EcoAdvisor
+from models.resource_usage import peak_rss_mb
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+# ── Per-process scoring state ───────────────────────────────────────────────
+_estimator = None
+_scorer = None
+_advisor = None
+
+
+def _init_worker():
+    global _estimator, _scorer, _advisor
+    _estimator = CarbonEstimator()
+    _scorer = SustainabilityScorer()
+    _advisor = EcoAdvisor()
+
+
+def _top_tip_ids(breakdown: dict, top_n: int) -> np.ndarray:
+    """
+    Top tip ids per row, joined with ';'.
+    EcoAdvisor.recommend only depends on the order of the categories, so
+    each distinct ordering (at most 5! of them) is recommended once.
+    """
+    values = np.column_stack([breakdown[c] for c in CATEGORIES])
+    order = np.argsort(-values, axis=1, kind="stable")
+    keys = order @ (len(CATEGORIES) ** np.arange(len(CATEGORIES)))
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    tips = []
+    for row in first:
+        ranked = {CATEGORIES[c]: float(len(CATEGORIES) - rank) for rank, c in enumerate(order[row])}
+        tips.append(";".join(str(t["id"]) for t in _advisor.recommend(ranked, top_n=top_n)))
+    return np.array(tips, dtype=object)[inverse.reshape(-1)]
+
+
+def score_chunk(chunk: pd.DataFrame, top_n: int) -> pd.DataFrame:
+    """Footprint, score and top tips for one chunk of survey rows."""
+    if _estimator is None:
+        _init_worker()
+    carbon = _estimator.estimate_batch(chunk)
+    score = _scorer.score_batch(carbon["total_kg_co2_year"], carbon["breakdown"])
+
+    out = chunk.copy()
+    for cat in CATEGORIES:
+        out[f"{cat}_kg_co2_year"] = carbon["breakdown"][cat]
+    out["total_kg_co2_year"] = carbon["total_kg_co2_year"]
+    out["vs_global_average_pct"] = carbon["vs_global_average_pct"]
+    out["overall_score"] = score["overall_score"]
+    out["grade"] = score["grade"]
+    if top_n > 0:
+        out["top_tip_ids"] = _top_tip_ids(carbon["breakdown"], top_n)
+    return out
+
+
+# ── Input / output ──────────────────────────────────────────────────────────
+def detect_format(path: str, explicit: str = None) -> str:
+    if explicit:
+        return explicit
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Cannot infer format from '{path}'. Use one of {sorted(FORMATS)} or pass --*-format.")
+    return FORMATS[ext]
+
+
+def read_chunks(path: str, fmt: str, chunk_size: int):
+    """Yield DataFrames of at most chunk_size rows."""
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        raise ValueError(f"Unsupported input format: {fmt}")
+
+
+class ChunkWriter:
+    """Appends result chunks to a CSV, JSONL or Parquet file."""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self._file = None
+        self._parquet = None
+
+    def write(self, df: pd.DataFrame):
+        if self.fmt == "csv":
+            header = self._file is None
+            if header:
+                self._file = open(self.path, "w", encoding="utf-8", newline="")
+            df.to_csv(self._file, header=header, index=False)
+        elif self.fmt == "jsonl":
+            if self._file is None:
+                self._file = open(self.path, "w", encoding="utf-8")
+            df.to_json(self._file, orient="records", lines=True, force_ascii=False)
+        elif self.fmt == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise RuntimeError("Parquet output requires pyarrow: pip install pyarrow")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            raise ValueError(f"Unsupported output format: {self.fmt}")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+# ── Driver ──────────────────────────────────────────────────────────────────
+def run(input_path, output_path, input_format=None, output_format=None,
+        chunk_size=50000, workers=1, top_n=3) -> int:
+    """Score input_path into output_path. Returns the number of rows written."""
+    in_fmt = detect_format(input_path, input_format)
+    out_fmt = detect_format(output_path, output_format)
+    writer = ChunkWriter(output_path, out_fmt)
+    rows = 0
+
+    try:
+        if workers <= 1:
+            for chunk in read_chunks(input_path, in_fmt, chunk_size):
+                writer.write(score_chunk(chunk, top_n))
+                rows += len(chunk)
+            return rows
+
+        max_in_flight = 2 * workers
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for chunk in read_chunks(input_path, in_fmt, chunk_size):
+                pending.append(pool.submit(score_chunk, chunk, top_n))
+                # Wait on the oldest chunk first: keeps output ordered and memory bounded.
+                if len(pending) >= max_in_flight:
+                    result = pending.popleft().result()
+                    writer.write(result)
+                    rows += len(result)
+            while pending:
+                result = pending.popleft().result()
+                writer.write(result)
+                rows += len(result)
+        return rows
+    finally:
+        writer.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-score survey exports (footprint, score, top tips).")
+    parser.add_argument("input", help="Input file (.csv, .jsonl)")
+    parser.add_argument("output", help="Output file (.csv, .jsonl, .parquet)")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"])
+    parser.add_argument("--output-format", choices=["csv", "jsonl", "parquet"])
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Rows per chunk (default 50000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores)")
+    parser.add_argument("--top-tips", type=int, default=3, help="Tip ids per row (0 to skip)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("=" * 55)
+    print("  🌿  GreenMind AI – Bulk Scorer")
+    print("=" * 55)
+    print(f"\n📂  Input : {args.input}")
+    print(f"💾  Output: {args.output}")
+    print(f"⚙️   Chunk size {args.chunk_size}  |  Workers {args.workers}")
+
+    start = time.perf_counter()
+    rows = run(
+        args.input, args.output,
+        input_format=args.input_format, output_format=args.output_format,
+        chunk_size=args.chunk_size, workers=args.workers, top_n=args.top_tips,
+    )
+    elapsed = time.perf_counter() - start
+
+    self_rss, child_rss = peak_rss_mb()
+    print(f"\n📊  Rows scored : {rows}")
+    print(f"    Wall time   : {elapsed:.2f} s")
+    print(f"    Throughput  : {rows / elapsed if elapsed else 0:,.0f} rows/s")
+    if self_rss is not None:
+        print(f"    Peak RSS    : {self_rss:.0f} MB (main), {child_rss:.0f} MB (largest worker)")
+    print("=" * 55 + "\n")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        print(f"\n❌  {e}")
+        sys.exit(1)
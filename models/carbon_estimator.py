@@ -1,17 +1,165 @@
 """
 Carbon Footprint Estimator
 Estimates annual CO2 equivalent emissions (kg/year) from user lifestyle inputs.
+
+estimate() scores one profile; estimate_batch() scores whole populations
+held as columns (dict of arrays or a pandas DataFrame) with NumPy.
+
+Factors can differ by grid region (the "regions" block of
+emissions_factors.json). Both paths read them from FactorTables, compiled
+once per reference-data snapshot, so a lookup is array indexing by
+(region code, factor code).
 """
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from data.loader import load_emissions_factors
+import numpy as np
+
+from data.registry import reference_data
+
+CATEGORIES = ("transport", "energy", "diet", "shopping", "waste")
+GLOBAL_REGION = "global"
+
+# Fixed assumptions behind the estimate
+AVG_SHORT_FLIGHT_KM = 800
+AVG_LONG_FLIGHT_KM = 5000
+AVG_WASTE_KG_WEEK = 7  # average household
+
+# Values used when an input field is missing (mirrors estimate())
+INPUT_DEFAULTS = {
+    "transport_mode": "car_petrol",
+    "km_per_week": 0.0,
+    "flights_short_per_year": 0,
+    "flights_long_per_year": 0,
+    "electricity_kwh_month": 200.0,
+    "natural_gas_kwh_month": 100.0,
+    "diet_type": "meat_medium",
+    "clothing_items_per_year": 10,
+    "electronics_per_year": 1,
+    "waste_recycling_pct": 30.0,
+    "region": GLOBAL_REGION,
+}
+INTEGER_FIELDS = ("flights_short_per_year", "flights_long_per_year", "clothing_items_per_year", "electronics_per_year")
+CATEGORICAL_FIELDS = ("transport_mode", "diet_type", "region")
+
+# Input fields each breakdown category depends on (a region may override any factor)
+CATEGORY_FIELDS = {
+    "transport": ("transport_mode", "km_per_week", "flights_short_per_year", "flights_long_per_year", "region"),
+    "energy":    ("electricity_kwh_month", "natural_gas_kwh_month", "region"),
+    "diet":      ("diet_type", "region"),
+    "shopping":  ("clothing_items_per_year", "electronics_per_year", "region"),
+    "waste":     ("waste_recycling_pct", "region"),
+}
+
+# Scalar factors, by column of FactorTables.scalars
+SCALAR_FACTORS = (
+    ("transport", "flight_short_km"), ("transport", "flight_long_km"),
+    ("energy", "electricity_kwh"), ("energy", "natural_gas_kwh"),
+    ("shopping", "clothing_item"), ("shopping", "electronics_device"),
+    ("waste", "landfill_kg"), ("waste", "recycled_kg"),
+)
+FLIGHT_SHORT, FLIGHT_LONG, ELECTRICITY, NATURAL_GAS, CLOTHING, ELECTRONICS, LANDFILL, RECYCLED = range(len(SCALAR_FACTORS))
+
+
+def py_round(values, ndigits: int = 1) -> np.ndarray:
+    """
+    Vectorized round() that agrees with Python's built-in.
+    np.round scales by 10**ndigits first, which can flip exact-looking ties
+    (e.g. 2624.35); those few elements are re-rounded with round().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.round(values, ndigits)
+    scaled = values * 10 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        out[near_tie] = [round(v, ndigits) for v in values[near_tie].tolist()]
+    return out
+
+
+def encode(values, names: list, default: str) -> np.ndarray:
+    """
+    Map categorical values to integer codes into `names`.
+    Unknown values get the code of `default`. Only distinct values are
+    looked up in Python, so cost scales with cardinality, not row count.
+    """
+    uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    index = {name: i for i, name in enumerate(names)}
+    fallback = index[default]
+    lookup = np.array([index.get(u, fallback) for u in uniques], dtype=np.intp)
+    return lookup[inverse.reshape(-1)]
+
+
+class FactorTables:
+    """
+    Emission factors compiled into dense arrays indexed by integer code:
+        transport_factors[region, mode]    kg CO2 per km
+        diet_annual_kg[region, diet]       kg CO2 per year
+        scalars[region, SCALAR]            columns as in SCALAR_FACTORS
+    Region 0 is the global set. Each entry of the "regions" block overrides
+    only the factors it lists and falls back to the global value otherwise.
+    The *_rows lists hold the same values as Python floats for single-profile
+    lookups.
+    """
+
+    def __init__(self, factors: dict):
+        transport = factors["transport"]
+        self.transport_modes = [
+            k[:-len("_km")] for k in transport if k.endswith("_km") and not k.startswith("flight_")
+        ]
+        diet = factors["diet"]
+        self.diet_types = [k[:-len("_daily_kg_co2")] for k in diet if k.endswith("_daily_kg_co2")]
+
+        regions = factors.get("regions", {})
+        self.regions = [GLOBAL_REGION] + list(regions)
+        self.region_keys = [code.upper() for code in self.regions]     # lookups are case-insensitive
+        self.region_names = ["Global"] + [r.get("name", code) for code, r in regions.items()]
+        global_avg = factors["global_average_annual_kg"]
+        self.region_average_kg = np.array(
+            [global_avg] + [r.get("average_annual_kg", global_avg) for r in regions.values()], dtype=np.float64,
+        )
+        sets = [factors] + [
+            {cat: {**factors[cat], **override.get(cat, {})} for cat in CATEGORIES} for override in regions.values()
+        ]
+        self.transport_factors = np.array([[s["transport"][f"{m}_km"] for m in self.transport_modes] for s in sets])
+        self.diet_annual_kg = np.array(
+            [[round(s["diet"][f"{d}_daily_kg_co2"] * 365, 1) for d in self.diet_types] for s in sets]
+        )
+        self.diet_daily_kg = np.array([[s["diet"][f"{d}_daily_kg_co2"] for d in self.diet_types] for s in sets])
+        self.scalars = np.array([[s[cat][key] for cat, key in SCALAR_FACTORS] for s in sets], dtype=np.float64)
+
+        self.transport_rows = self.transport_factors.tolist()
+        self.diet_annual_rows = self.diet_annual_kg.tolist()
+        self.diet_daily_rows = self.diet_daily_kg.tolist()
+        self.scalar_rows = self.scalars.tolist()
+        self._region_index = {key: i for i, key in enumerate(self.region_keys)}
+        self._mode_index = {m: i for i, m in enumerate(self.transport_modes)}
+        self._diet_index = {d: i for i, d in enumerate(self.diet_types)}
+
+    def region_code(self, region) -> int:
+        """Row for a region code; unknown or missing regions use the global factors (0)."""
+        return self._region_index.get(str(region).upper(), 0) if region else 0
+
+    def mode_code(self, mode) -> int:
+        return self._mode_index.get(mode, self._mode_index[INPUT_DEFAULTS["transport_mode"]])
+
+    def diet_code(self, diet) -> int:
+        return self._diet_index.get(diet, self._diet_index[INPUT_DEFAULTS["diet_type"]])
 
 
 class CarbonEstimator:
-    def __init__(self):
-        self.factors = load_emissions_factors()
+    def __init__(self, registry=None):
+        self.registry = registry or reference_data
+
+    @property
+    def factors(self) -> dict:
+        """Emission factors from the current reference-data snapshot."""
+        return self.registry.snapshot().emissions_factors
+
+    def tables(self, snapshot=None) -> FactorTables:
+        """FactorTables for `snapshot` (default: current), compiled once per snapshot."""
+        snapshot = snapshot or self.registry.snapshot()
+        return snapshot.derived("carbon_factor_tables", lambda snap: FactorTables(snap.emissions_factors))
 
     def estimate(self, inputs: dict) -> dict:
         """
@@ -28,60 +176,59 @@ class CarbonEstimator:
           clothing_items_per_year: int
           electronics_per_year: int
           waste_recycling_pct: float  (0-100)
+          region: str  (grid region code from the "regions" block; default/unknown: global factors)
         """
-        factors = self.factors
+        snapshot = self.registry.snapshot()
+        factors = snapshot.emissions_factors
+        tables = self.tables(snapshot)
+        region = tables.region_code(inputs.get("region"))
+        scalars = tables.scalar_rows[region]
         breakdown = {}
 
         # --- Transport ---
-        mode = inputs.get("transport_mode", "car_petrol")
         km_week = float(inputs.get("km_per_week", 0))
         km_year = km_week * 52
-        transport_key = f"{mode}_km"
-        transport_factor = factors["transport"].get(transport_key, factors["transport"]["car_petrol_km"])
+        mode = tables.mode_code(inputs.get("transport_mode", "car_petrol"))
+        transport_factor = tables.transport_rows[region][mode]
         transport_co2 = km_year * transport_factor
 
         # Flights
         short_flights = int(inputs.get("flights_short_per_year", 0))
         long_flights = int(inputs.get("flights_long_per_year", 0))
-        avg_short_km = 800
-        avg_long_km = 5000
         flight_co2 = (
-            short_flights * avg_short_km * factors["transport"]["flight_short_km"] +
-            long_flights * avg_long_km * factors["transport"]["flight_long_km"]
+            short_flights * AVG_SHORT_FLIGHT_KM * scalars[FLIGHT_SHORT] +
+            long_flights * AVG_LONG_FLIGHT_KM * scalars[FLIGHT_LONG]
         )
         breakdown["transport"] = round(transport_co2 + flight_co2, 1)
 
         # --- Energy ---
         elec_kwh_month = float(inputs.get("electricity_kwh_month", 200))
         gas_kwh_month = float(inputs.get("natural_gas_kwh_month", 100))
-        elec_co2 = elec_kwh_month * 12 * factors["energy"]["electricity_kwh"]
-        gas_co2 = gas_kwh_month * 12 * factors["energy"]["natural_gas_kwh"]
+        elec_co2 = elec_kwh_month * 12 * scalars[ELECTRICITY]
+        gas_co2 = gas_kwh_month * 12 * scalars[NATURAL_GAS]
         breakdown["energy"] = round(elec_co2 + gas_co2, 1)
 
         # --- Diet ---
-        diet = inputs.get("diet_type", "meat_medium")
-        diet_key = f"{diet}_daily_kg_co2"
-        diet_factor = factors["diet"].get(diet_key, factors["diet"]["meat_medium_daily_kg_co2"])
-        breakdown["diet"] = round(diet_factor * 365, 1)
+        diet = tables.diet_code(inputs.get("diet_type", "meat_medium"))
+        breakdown["diet"] = tables.diet_annual_rows[region][diet]
 
         # --- Shopping ---
         clothing = int(inputs.get("clothing_items_per_year", 10))
         electronics = int(inputs.get("electronics_per_year", 1))
         shopping_co2 = (
-            clothing * factors["shopping"]["clothing_item"] +
-            electronics * factors["shopping"]["electronics_device"]
+            clothing * scalars[CLOTHING] +
+            electronics * scalars[ELECTRONICS]
         )
         breakdown["shopping"] = round(shopping_co2, 1)
 
         # --- Waste ---
         recycling_pct = float(inputs.get("waste_recycling_pct", 30)) / 100
-        avg_waste_kg_week = 7  # average household
-        waste_kg_year = avg_waste_kg_week * 52
+        waste_kg_year = AVG_WASTE_KG_WEEK * 52
         recycled = waste_kg_year * recycling_pct
         landfill = waste_kg_year * (1 - recycling_pct)
         waste_co2 = (
-            landfill * factors["waste"]["landfill_kg"] +
-            recycled * factors["waste"]["recycled_kg"]
+            landfill * scalars[LANDFILL] +
+            recycled * scalars[RECYCLED]
         )
         breakdown["waste"] = round(waste_co2, 1)
 
@@ -93,4 +240,112 @@ class CarbonEstimator:
             "global_average_kg": factors["global_average_annual_kg"],
             "target_kg": factors["target_annual_kg"],
             "vs_global_average_pct": round(((total - factors["global_average_annual_kg"]) / factors["global_average_annual_kg"]) * 100, 1),
+            "region": tables.regions[region],
+            "region_average_kg": float(tables.region_average_kg[region]),
+            # Factor keys actually used (unknown inputs fall back to the defaults).
+            "transport_mode": tables.transport_modes[mode],
+            "diet_type": tables.diet_types[diet],
         }
+
+    def estimate_batch(self, columns, snapshot=None) -> dict:
+        """
+        Vectorized estimate() over many profiles.
+
+        columns: dict of equal-length arrays (or a pandas DataFrame) keyed by the
+                 same fields as estimate(); missing fields use INPUT_DEFAULTS.
+        snapshot: reference-data snapshot to use (default: the current one).
+        Returns a dict of NumPy arrays with the same keys as estimate(), where
+        "breakdown" maps each category to an array.
+        """
+        snapshot = snapshot or self.registry.snapshot()
+        factors = snapshot.emissions_factors
+        tables = self.tables(snapshot)
+        regions = self.region_codes(columns, tables)
+        breakdown = self.breakdown_batch(columns, snapshot=snapshot, regions=regions)
+
+        total = sum(breakdown[c] for c in CATEGORIES)
+        global_avg = factors["global_average_annual_kg"]
+
+        return {
+            "total_kg_co2_year": py_round(total, 1),
+            "breakdown": breakdown,
+            "global_average_kg": global_avg,
+            "target_kg": factors["target_annual_kg"],
+            "vs_global_average_pct": py_round((total - global_avg) / global_avg * 100, 1),
+            "region": np.array(tables.regions, dtype=object)[regions],
+            "region_average_kg": tables.region_average_kg[regions],
+        }
+
+    @staticmethod
+    def region_codes(columns, tables: FactorTables) -> np.ndarray:
+        """Region row per profile (case-insensitive; missing or unknown → global)."""
+        n = len(columns[next(iter(columns))])
+        if "region" not in columns:
+            return np.zeros(n, dtype=np.intp)
+        values = np.char.upper(np.asarray(columns["region"], dtype=str))
+        return encode(values, tables.region_keys, GLOBAL_REGION.upper())
+
+    def breakdown_batch(self, columns, categories=CATEGORIES, snapshot=None, regions=None) -> dict:
+        """
+        Vectorized per-category kg CO2/year, computing only `categories`.
+        Only the fields listed in CATEGORY_FIELDS for those categories are read.
+        regions: region codes from region_codes(), if the caller already has them.
+        """
+        snapshot = snapshot or self.registry.snapshot()
+        tables = self.tables(snapshot)
+        n = len(columns[next(iter(columns))])
+        if regions is None:
+            regions = self.region_codes(columns, tables)
+        scalars = tables.scalars[regions]       # (n, len(SCALAR_FACTORS))
+
+        def col(name):
+            if name not in columns:
+                return np.full(n, INPUT_DEFAULTS[name], dtype=np.float64)
+            values = np.asarray(columns[name], dtype=np.float64)
+            return np.trunc(values) if name in INTEGER_FIELDS else values   # int() semantics
+
+        def codes(name, names):
+            values = columns[name] if name in columns else np.full(n, INPUT_DEFAULTS[name])
+            return encode(values, names, INPUT_DEFAULTS[name])
+
+        breakdown = {}
+
+        # --- Transport ---
+        if "transport" in categories:
+            mode_codes = codes("transport_mode", tables.transport_modes)
+            transport_co2 = col("km_per_week") * 52 * tables.transport_factors[regions, mode_codes]
+            flight_co2 = (
+                col("flights_short_per_year") * AVG_SHORT_FLIGHT_KM * scalars[:, FLIGHT_SHORT] +
+                col("flights_long_per_year") * AVG_LONG_FLIGHT_KM * scalars[:, FLIGHT_LONG]
+            )
+            breakdown["transport"] = py_round(transport_co2 + flight_co2, 1)
+
+        # --- Energy ---
+        if "energy" in categories:
+            elec_co2 = col("electricity_kwh_month") * 12 * scalars[:, ELECTRICITY]
+            gas_co2 = col("natural_gas_kwh_month") * 12 * scalars[:, NATURAL_GAS]
+            breakdown["energy"] = py_round(elec_co2 + gas_co2, 1)
+
+        # --- Diet ---
+        if "diet" in categories:
+            breakdown["diet"] = tables.diet_annual_kg[regions, codes("diet_type", tables.diet_types)]
+
+        # --- Shopping ---
+        if "shopping" in categories:
+            shopping_co2 = (
+                col("clothing_items_per_year") * scalars[:, CLOTHING] +
+                col("electronics_per_year") * scalars[:, ELECTRONICS]
+            )
+            breakdown["shopping"] = py_round(shopping_co2, 1)
+
+        # --- Waste ---
+        if "waste" in categories:
+            recycling_pct = col("waste_recycling_pct") / 100
+            waste_kg_year = AVG_WASTE_KG_WEEK * 52
+            waste_co2 = (
+                waste_kg_year * (1 - recycling_pct) * scalars[:, LANDFILL] +
+                waste_kg_year * recycling_pct * scalars[:, RECYCLED]
+            )
+            breakdown["waste"] = py_round(waste_co2, 1)
+
+        return breakdown
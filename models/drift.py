@@ -0,0 +1,221 @@
+"""
+Feature Drift Monitor
+Compares the inputs the energy model is asked about with the data it was
+trained on.
+
+Every feature gets fixed buckets over its PredictRequest range (BUCKETS):
+temperature 0–60 °C in 1 °C steps, humidity 0–100 % in 2 % steps, and one
+bucket per hour. Values outside a range land in its first or last bucket.
+Because the buckets never move, histograms can be added together, stored in
+the model artifact and compared bucket by bucket:
+
+    - models/train.py records the training data's histograms in the
+      artifact's manifest.json ("training_histograms")
+    - every worker counts live inputs into two fixed-size arrays: the current
+      window and the previous one, rotated every GREENMIND_DRIFT_WINDOW
+      seconds (default 3600). A report therefore covers the last one to two
+      windows, in constant memory. A single row costs one increment per
+      feature; a batch costs one bincount
+    - DriftMonitor.report() computes per feature the population stability
+      index (PSI), the two-sample Kolmogorov–Smirnov statistic over the bucket
+      edges with its asymptotic p-value, and the share of live inputs in
+      buckets the training data never reached
+
+Counts are per worker process and updated without a lock. A concurrent
+increment can occasionally be lost, which does not matter for a drift signal.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+# feature → (low, high, buckets); the same ranges as PredictRequest in api/main.py.
+BUCKETS = {
+    "temperature": (0.0, 60.0, 60),
+    "humidity": (0.0, 100.0, 50),
+    "hour": (0.0, 24.0, 24),
+}
+PSI_FLOOR = 1e-4            # bucket share used in place of 0, so PSI stays finite
+PSI_MODERATE = 0.1          # common rule of thumb: < 0.1 stable, 0.1–0.25 moderate, > 0.25 significant
+PSI_SIGNIFICANT = 0.25
+MIN_ROWS = 100
+SMALL_BATCH = 16            # batches up to this size are cheaper to count row by row
+
+
+class FeatureHistograms:
+    """
+    Fixed-bucket counts for every feature, flattened into one vector. Batches
+    are counted into an int64 array; single rows go to a plain list, whose
+    increments are several times cheaper than indexing into NumPy.
+    """
+
+    def __init__(self, buckets: dict = None):
+        self.buckets = {name: tuple(spec) for name, spec in (buckets or BUCKETS).items()}
+        self.features = list(self.buckets)
+        sizes = [int(bins) for _, _, bins in self.buckets.values()]
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).tolist()
+        self.counts = np.zeros(sum(sizes), dtype=np.int64)
+        self._row_counts = [0] * len(self.counts)
+        self.rows = 0
+        # (offset, low, buckets per unit, last bucket) per feature, for the per-row path.
+        self._lookup = [
+            (offset, low, bins / (high - low), bins - 1)
+            for offset, (low, high, bins) in zip(self.offsets, self.buckets.values())
+        ]
+
+    def add_row(self, row):
+        """Count one row (values in self.features order): one increment per feature."""
+        counts = self._row_counts
+        for (offset, low, scale, last), value in zip(self._lookup, row):
+            i = int((value - low) * scale)
+            counts[offset + (0 if i < 0 else last if i > last else i)] += 1
+        self.rows += 1
+
+    def add(self, X):
+        """Count a (n_rows, n_features) matrix with one bincount (row by row when small)."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) <= SMALL_BATCH:
+            for row in X.tolist():
+                self.add_row(row)
+            return
+        index = np.empty(X.shape, dtype=np.int64)
+        for j, (offset, low, scale, last) in enumerate(self._lookup):
+            index[:, j] = np.clip((X[:, j] - low) * scale, 0, last).astype(np.int64) + offset
+        self.counts += np.bincount(index.ravel(), minlength=len(self.counts))
+        self.rows += len(X)
+
+    def total(self) -> np.ndarray:
+        """All counts, batch and single-row, as one int64 vector."""
+        return self.counts + np.array(self._row_counts, dtype=np.int64)
+
+    def feature(self, name: str, total: np.ndarray = None) -> np.ndarray:
+        i = self.features.index(name)
+        total = self.total() if total is None else total
+        return total[self.offsets[i]:self.offsets[i] + int(self.buckets[name][2])]
+
+    def edges(self, name: str) -> list:
+        low, high, bins = self.buckets[name]
+        return np.linspace(low, high, int(bins) + 1).tolist()
+
+    def to_dict(self) -> dict:
+        total = self.total()
+        return {
+            "buckets": {name: list(spec) for name, spec in self.buckets.items()},
+            "rows": int(self.rows),
+            "counts": {name: self.feature(name, total).tolist() for name in self.features},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FeatureHistograms":
+        histograms = cls(data["buckets"])
+        histograms.counts[:] = np.concatenate([data["counts"][name] for name in histograms.features])
+        histograms.rows = int(data["rows"])
+        return histograms
+
+
+def ks_p_value(statistic: float, n: int, m: int) -> float:
+    """Asymptotic two-sample KS p-value (Kolmogorov series with Stephens' small-sample correction)."""
+    if statistic <= 0 or not n or not m:
+        return 1.0
+    effective = np.sqrt(n * m / (n + m))
+    lam = (effective + 0.12 + 0.11 / effective) * statistic
+    k = np.arange(1, 101)
+    p = 2 * np.sum((-1.0) ** (k - 1) * np.exp(-2 * k * k * lam * lam))
+    return float(min(max(p, 0.0), 1.0))
+
+
+def compare(training: np.ndarray, live: np.ndarray) -> dict:
+    """PSI, binned KS statistic and p-value, and unseen share for one feature's bucket counts."""
+    n, m = int(training.sum()), int(live.sum())
+    expected = training / max(n, 1)
+    actual = live / max(m, 1)
+    psi_expected, psi_actual = np.maximum(expected, PSI_FLOOR), np.maximum(actual, PSI_FLOOR)
+    psi = float(np.sum((psi_actual - psi_expected) * np.log(psi_actual / psi_expected)))
+    ks = float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+    return {
+        "psi": round(psi, 4),
+        "ks": round(ks, 4),
+        "ks_p_value": round(ks_p_value(ks, n, m), 6),
+        "unseen_share": round(float(actual[training == 0].sum()), 4),
+        "status": "stable" if psi < PSI_MODERATE else "moderate" if psi < PSI_SIGNIFICANT else "significant",
+    }
+
+
+class DriftMonitor:
+    def __init__(self, window: float = None, buckets: dict = None):
+        if window is None:
+            window = float(os.environ.get("GREENMIND_DRIFT_WINDOW", "3600"))
+        self.window = window
+        self.buckets = buckets or BUCKETS
+        self._current = FeatureHistograms(self.buckets)
+        self._previous = FeatureHistograms(self.buckets)
+        self._rotate_at = time.monotonic() + window
+        self._lock = threading.Lock()
+
+    # ── Hot path ─────────────────────────────────────────────────────────────
+    def observe(self, row):
+        """Count one input row (temperature, humidity, hour)."""
+        if time.monotonic() >= self._rotate_at:
+            self._rotate()
+        self._current.add_row(row)
+
+    def observe_batch(self, X):
+        """Count a (n_rows, 3) input matrix."""
+        if time.monotonic() >= self._rotate_at:
+            self._rotate()
+        self._current.add(X)
+
+    def _rotate(self):
+        with self._lock:
+            now = time.monotonic()
+            if now < self._rotate_at:
+                return      # another thread rotated first
+            # After a whole idle window the current counts are too old to keep.
+            stale = now >= self._rotate_at + self.window
+            self._previous = FeatureHistograms(self.buckets) if stale else self._current
+            self._current = FeatureHistograms(self.buckets)
+            self._rotate_at = now + self.window
+
+    # ── Reporting ────────────────────────────────────────────────────────────
+    def live(self) -> FeatureHistograms:
+        """Counts of the current and previous windows together."""
+        if time.monotonic() >= self._rotate_at:
+            self._rotate()
+        current, previous = self._current, self._previous
+        merged = FeatureHistograms(self.buckets)
+        merged.counts = current.total() + previous.total()
+        merged.rows = current.rows + previous.rows
+        return merged
+
+    def report(self, training: dict = None, min_rows: int = MIN_ROWS, histograms: bool = False) -> dict:
+        """
+        Drift of this worker's live inputs against the training histograms
+        (a FeatureHistograms.to_dict() from the model manifest). Statistics are
+        None when the model has no training histograms or fewer than min_rows
+        inputs were seen.
+        """
+        live = self.live()
+        reference = FeatureHistograms.from_dict(training) if training else None
+        if reference is not None and reference.buckets != live.buckets:
+            reference = None    # artifact recorded with other buckets: not comparable
+        ready = reference is not None and live.rows >= min_rows
+
+        features = {}
+        for name in live.features:
+            entry = compare(reference.feature(name), live.feature(name)) if ready else {"status": None}
+            if histograms:
+                entry["edges"] = live.edges(name)
+                entry["live"] = live.feature(name).tolist()
+                entry["training"] = reference.feature(name).tolist() if reference is not None else None
+            features[name] = entry
+        return {
+            "pid": os.getpid(),
+            "window_seconds": self.window,
+            "live_rows": int(live.rows),
+            "training_rows": reference.rows if reference is not None else None,
+            "drift": any(f["status"] == "significant" for f in features.values()) if ready else None,
+            "features": features,
+        }
@@ -1,16 +1,58 @@
 """
 Eco Advisor
 Returns personalised eco-tips based on the user's highest-impact categories.
+
+Tips are indexed once per reference-data snapshot (by category and by tag,
+with impact weights precomputed), so recommend() only looks at the best
+top_n tips of each category and picks the overall top_n with a heap.
 """
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from data.loader import load_eco_tips
+import heapq
+
+from data.registry import reference_data
+
+IMPACT_WEIGHTS = {"high": 3, "medium": 2, "low": 1}
+
+
+class TipIndex:
+    """Lookup structures over one tip catalogue. Positions refer to the catalogue order."""
+
+    def __init__(self, tips: list):
+        self.tips = tips
+        self.weights = [IMPACT_WEIGHTS.get(t.get("impact", "low"), 1) for t in tips]
+        self.by_category = {}    # category → tips, catalogue order
+        self.positions = {}      # category → positions, catalogue order
+        self.by_tag = {}         # tag → tips, catalogue order
+        for pos, tip in enumerate(tips):
+            cat = tip.get("category", "")
+            self.by_category.setdefault(cat, []).append(tip)
+            self.positions.setdefault(cat, []).append(pos)
+            for tag in tip.get("tags", []):
+                self.by_tag.setdefault(tag, []).append(tip)
+
+        # category → positions by impact weight (desc), then catalogue order
+        weights = self.weights
+        self.ranked = {
+            cat: sorted(positions, key=lambda p: -weights[p])
+            for cat, positions in self.positions.items()
+        }
 
 
 class EcoAdvisor:
-    def __init__(self):
-        self.tips = load_eco_tips()
+    def __init__(self, registry=None):
+        self.registry = registry or reference_data
+
+    @property
+    def tips(self) -> list:
+        """Tips from the current reference-data snapshot."""
+        return self.registry.snapshot().eco_tips
+
+    def index(self, snapshot=None) -> TipIndex:
+        """TipIndex for `snapshot` (default: the current one), built once per snapshot."""
+        snapshot = snapshot or self.registry.snapshot()
+        return snapshot.derived("eco_tip_index", lambda snap: TipIndex(snap.eco_tips))
 
     def recommend(self, breakdown: dict, top_n: int = 5) -> list:
         """
@@ -18,31 +60,41 @@ class EcoAdvisor:
 
         breakdown: dict of {category: kg_co2_year}
         Returns a list of tip dicts sorted by relevance + impact.
+        relevance = (n_categories - category_rank) * impact_weight; ties keep
+        catalogue order, and tips outside the breakdown score 0.
         """
+        if top_n <= 0:
+            return []
+        index = self.index()
+
         # Sort categories by emission descending
         sorted_cats = sorted(breakdown.items(), key=lambda x: x[1], reverse=True)
         priority_cats = [cat for cat, _ in sorted_cats]
+        n_cats = len(priority_cats)
 
-        scored_tips = []
-        for tip in self.tips:
-            cat = tip.get("category", "")
-            impact = tip.get("impact", "low")
-            impact_weight = {"high": 3, "medium": 2, "low": 1}.get(impact, 1)
+        # Within a category relevance only varies with the weight, so its
+        # top_n tips by weight are the only ones that can make the cut.
+        candidates = []
+        for rank, cat in enumerate(priority_cats):
+            for pos in index.ranked.get(cat, [])[:top_n]:
+                candidates.append(((n_cats - rank) * index.weights[pos], -pos))
+        best = heapq.nlargest(top_n, candidates)
+        result = [index.tips[-neg_pos] for _, neg_pos in best]
 
-            # Priority: appear in top-emission categories
-            try:
-                cat_rank = priority_cats.index(cat)
-            except ValueError:
-                cat_rank = len(priority_cats)
-
-            relevance = (len(priority_cats) - cat_rank) * impact_weight
-            scored_tips.append((relevance, tip))
-
-        scored_tips.sort(key=lambda x: x[0], reverse=True)
-        return [tip for _, tip in scored_tips[:top_n]]
+        # Fill up with zero-relevance tips (categories not in the breakdown), in catalogue order.
+        if len(result) < top_n:
+            others = [index.positions[cat] for cat in index.positions if cat not in breakdown]
+            for pos in heapq.merge(*others):
+                if len(result) == top_n:
+                    break
+                result.append(index.tips[pos])
+        return result
 
     def get_by_category(self, category: str) -> list:
-        return [t for t in self.tips if t["category"] == category]
+        return self.index().by_category.get(category, [])
+
+    def get_by_tag(self, tag: str) -> list:
+        return self.index().by_tag.get(tag, [])
 
     def get_all(self) -> list:
         return self.tips
@@ -0,0 +1,160 @@
+"""
+Forest Inference Engine
+Evaluates a fitted RandomForestRegressor from flat NumPy node arrays.
+
+All trees are concatenated into contiguous per-node arrays (feature,
+threshold, left, right, value). Leaves point to themselves, so a batch is
+evaluated by stepping every (row, tree) cursor max_depth times with pure
+array indexing – no per-call input checks or thread pools.
+
+Engines can be saved as a pickle-free artifact directory (manifest.json plus
+one .npy file per array) that loads via memory mapping without sklearn. The
+manifest may also carry the training data's feature histograms
+(models/drift.py), which the API compares live inputs against.
+"""
+import json
+import os
+
+import numpy as np
+
+TREE_LEAF = -1      # sklearn marker for "no child"
+BLOCK_ROWS = 256    # rows per traversal block, keeps cursors cache-resident
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+ARRAY_NAMES = ("feature", "threshold", "left", "right", "value", "roots")
+
+
+class ForestEngine:
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, feature_names=None,
+                 training_histograms=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float64)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.n_trees = len(self.roots)
+        self.n_features = int(self.feature.max()) + 1 if len(self.feature) else 0
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.training_histograms = training_histograms     # FeatureHistograms.to_dict(), or None
+
+        # children[2 * node + went_left] → next node, one gather per step.
+        self._children = np.empty(2 * len(self.left), dtype=np.intp)
+        self._children[0::2] = self.right
+        self._children[1::2] = self.left
+
+    @classmethod
+    def from_sklearn(cls, model) -> "ForestEngine":
+        """Compile a fitted sklearn forest (or single tree) into flat arrays."""
+        estimators = getattr(model, "estimators_", [model])
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for est in estimators:
+            tree = est.tree_
+            n = tree.node_count
+            ids = np.arange(n, dtype=np.int64)
+            is_leaf = tree.children_left == TREE_LEAF
+
+            # Leaves become self-loops so extra traversal steps are no-ops.
+            left = np.where(is_leaf, ids, tree.children_left) + offset
+            right = np.where(is_leaf, ids, tree.children_right) + offset
+            feature = np.where(is_leaf, 0, tree.feature)
+
+            features.append(feature)
+            thresholds.append(tree.threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.array(roots),
+            max_depth=max_depth,
+            feature_names=getattr(model, "feature_names_in_", None),
+        )
+
+    def save(self, directory: str):
+        """Write the engine as a versioned artifact directory (no pickle)."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name), allow_pickle=False)
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "n_trees": self.n_trees,
+            "n_nodes": int(len(self.value)),
+            "max_depth": self.max_depth,
+            "feature_names": self.feature_names,
+        }
+        if self.training_histograms is not None:
+            manifest["training_histograms"] = self.training_histograms
+        with open(os.path.join(directory, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "ForestEngine":
+        """Load an artifact directory written by save(); arrays are memory-mapped by default."""
+        with open(os.path.join(directory, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported model artifact format {manifest.get('format_version')!r} "
+                f"(expected {FORMAT_VERSION}). Re-export with 'python models/train.py --export-only'."
+            )
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in ARRAY_NAMES
+        }
+        return cls(max_depth=manifest["max_depth"], feature_names=manifest["feature_names"],
+                   training_histograms=manifest.get("training_histograms"), **arrays)
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Predict a (n_rows, n_features) matrix. Returns a float64 array of n_rows.
+
+        Inputs are rounded to float32 first and tree outputs are accumulated in
+        tree order, exactly as sklearn does, so results match it bit for bit.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        X = X.astype(np.float64)
+        if X.shape[0] == 1:
+            return np.array([self.predict_one(X[0])])
+
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            out[start:start + len(block)] = self._predict_block(block)
+        return out
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        offsets = np.arange(n_rows, dtype=np.intp) * n_features
+
+        # nodes has shape (n_trees, n_rows): one cursor per tree per row.
+        nodes = np.repeat(self.roots[:, None], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            went_left = flat[offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self._children[2 * nodes + went_left]
+
+        return np.cumsum(self.value[nodes], axis=0)[-1] / self.n_trees
+
+    def predict_one(self, row) -> float:
+        """Predict a single feature row, e.g. [temperature, humidity, hour]."""
+        x = np.asarray(row, dtype=np.float32).astype(np.float64)
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            went_left = x[self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self._children[2 * nodes + went_left]
+        return float(np.cumsum(self.value[nodes])[-1] / self.n_trees)
@@ -0,0 +1,154 @@
+"""
+Load Shifter
+Schedules flexible appliances (dishwasher, laundry, EV charging, ...) into the
+hours where the energy model predicts the least household demand.
+
+A load runs for `duration_hours` whole hours at `power_kw` and must start and
+finish inside its window [earliest_start, latest_end), in hours from the start
+of the horizon. The baseline curve is predicted once for the whole horizon
+(one model call), so every candidate start of every load is priced from the
+same array:
+
+    objective="total"  each load goes where the predicted baseline kWh over its
+                       run is lowest. Loads do not interact, so this is an argmin
+                       over window sums of one cumulative sum, and optimal.
+    objective="peak"   minimise the highest hour of baseline + loads. Loads are
+                       placed greedily, largest energy first, each at the start
+                       whose highest hour is lowest (ties: least baseline kWh,
+                       then earliest). While the time budget lasts, each load is
+                       then lifted out and re-placed if a strictly better start
+                       exists, until a full pass moves nothing.
+
+The time budget covers the greedy placement too. Loads it has not reached
+when time runs out go to their least-baseline start (as objective="total"
+would place them), and the result is reported as not converged.
+"""
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+OBJECTIVES = ("peak", "total")
+DEFAULT_TIME_BUDGET_S = 0.2
+
+
+def load_bounds(loads: list, n_hours: int) -> tuple:
+    """
+    (first_start, last_start, duration, power) arrays for a list of load dicts.
+    Raises ValueError naming the first load whose window cannot hold it.
+    """
+    n = len(loads)
+    first, last = np.empty(n, dtype=np.int64), np.empty(n, dtype=np.int64)
+    durations, powers = np.empty(n, dtype=np.int64), np.empty(n)
+    for i, load in enumerate(loads):
+        name = load.get("name", i)
+        duration = int(load["duration_hours"])
+        earliest = int(load.get("earliest_start") or 0)
+        latest = load.get("latest_end")
+        latest = n_hours if latest is None else int(latest)
+        if duration < 1 or load["power_kw"] <= 0:
+            raise ValueError(f"Load {name!r}: duration_hours and power_kw must be positive.")
+        if latest > n_hours:
+            raise ValueError(f"Load {name!r}: latest_end {latest} is beyond the {n_hours}-hour horizon.")
+        if latest - earliest < duration:
+            raise ValueError(
+                f"Load {name!r}: a {duration}-hour run does not fit between hours {earliest} and {latest}."
+            )
+        first[i], last[i] = earliest, latest - duration
+        durations[i], powers[i] = duration, float(load["power_kw"])
+    return first, last, durations, powers
+
+
+def _place_total(baseline: np.ndarray, first, last, durations) -> np.ndarray:
+    cumulative = np.concatenate(([0.0], np.cumsum(baseline)))
+    starts = first.copy()
+    for i, (a, b, d) in enumerate(zip(first.tolist(), last.tolist(), durations.tolist())):
+        sums = cumulative[a + d:b + d + 1] - cumulative[a:b + 1]
+        starts[i] = a + int(np.argmin(sums))
+    return starts
+
+
+def _place_peak(baseline: np.ndarray, first, last, durations, powers, deadline: float) -> tuple:
+    cumulative = np.concatenate(([0.0], np.cumsum(baseline)))
+    curve = baseline.copy()
+    bounds = list(zip(first.tolist(), last.tolist(), durations.tolist(), powers.tolist()))
+
+    def candidates(i):
+        """Highest hour and baseline kWh of every start in load i's window, against the current curve."""
+        a, b, d, _ = bounds[i]
+        peaks = np.round(sliding_window_view(curve[a:b + d], d).max(axis=1), 9)    # rounding: stable ties
+        sums = cumulative[a + d:b + d + 1] - cumulative[a:b + 1]
+        return peaks, sums
+
+    order = np.lexsort((-durations, -(durations * powers))).tolist()
+    starts = first.copy()
+    for k, i in enumerate(order):
+        if time.perf_counter() >= deadline:
+            rest = np.array(order[k:])
+            starts[rest] = _place_total(baseline, first[rest], last[rest], durations[rest])
+            return starts, 0, False
+        a, _, d, p = bounds[i]
+        peaks, sums = candidates(i)
+        s = a + int(np.lexsort((sums, peaks))[0])
+        starts[i] = s
+        curve[s:s + d] += p
+
+    passes, converged = 0, False
+    while not converged and time.perf_counter() < deadline:
+        passes += 1
+        converged = True
+        for i in order:
+            if time.perf_counter() >= deadline:
+                converged = False
+                break
+            a, _, d, p = bounds[i]
+            s = int(starts[i])
+            curve[s:s + d] -= p
+            peaks, sums = candidates(i)
+            j = int(np.lexsort((sums, peaks))[0])
+            if (peaks[j], sums[j]) < (peaks[s - a], sums[s - a]):
+                s = a + j
+                starts[i] = s
+                converged = False
+            curve[s:s + d] += p
+    return starts, passes, converged
+
+
+def add_loads(baseline: np.ndarray, starts: np.ndarray, durations, powers) -> np.ndarray:
+    """Baseline plus every load at its start, built with one difference array."""
+    delta = np.zeros(len(baseline) + 1)
+    np.add.at(delta, starts, powers)
+    np.add.at(delta, starts + durations, -powers)
+    return baseline + np.cumsum(delta[:-1])
+
+
+def schedule(baseline, loads: list, objective: str = "peak", time_budget_s: float = DEFAULT_TIME_BUDGET_S) -> dict:
+    """
+    Place every load on the predicted baseline curve (kWh per hour).
+
+    Returns {"starts", "curve", "unshifted_curve", "overlap_kwh",
+    "unshifted_overlap_kwh", "passes", "converged"}. overlap_kwh is each
+    load's baseline kWh over its run; unshifted_* assume every load starts
+    at its earliest_start.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {', '.join(OBJECTIVES)}.")
+    deadline = time.perf_counter() + time_budget_s
+    baseline = np.asarray(baseline, dtype=np.float64)
+    first, last, durations, powers = load_bounds(loads, len(baseline))
+
+    if objective == "total":
+        starts, passes, converged = _place_total(baseline, first, last, durations), 0, True
+    else:
+        starts, passes, converged = _place_peak(baseline, first, last, durations, powers, deadline)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(baseline)))
+    return {
+        "starts": starts,
+        "curve": add_loads(baseline, starts, durations, powers),
+        "unshifted_curve": add_loads(baseline, first, durations, powers),
+        "overlap_kwh": cumulative[starts + durations] - cumulative[starts],
+        "unshifted_overlap_kwh": cumulative[first + durations] - cumulative[first],
+        "passes": passes,
+        "converged": converged,
+    }
@@ -0,0 +1,163 @@
+"""
+Model registry
+Versioned serving artifacts and an atomically hot-swapped active model.
+
+Layout (written by models/train.py):
+    models/energy_model/
+        CURRENT            ← name of the active version, e.g. "v3"
+        v1/  v2/  v3/      ← ForestEngine artifact directories
+
+publish() writes a new version directory completely, then repoints CURRENT
+with os.replace, so readers never see a partial version.
+
+ModelRegistry keeps the active (version, engine) pair behind a single
+reference. A background thread polls CURRENT every
+GREENMIND_MODEL_CHECK_INTERVAL seconds (default 2.0). When it changes, the
+new version is loaded, every array page is read and a warm-up prediction
+is run, and only then is the pair swapped in. Requests read the pair once
+and never touch the filesystem.
+"""
+import os
+import re
+import threading
+
+import numpy as np
+
+from models.forest_engine import ForestEngine, ARRAY_NAMES, MANIFEST_NAME
+
+CURRENT_NAME = "CURRENT"
+VERSION_PATTERN = re.compile(r"^v(\d+)$")
+LEGACY_VERSION = "v0"   # artifact written directly into the root (before versioning)
+
+
+def list_versions(root: str) -> list:
+    """Version directory names under root, oldest first."""
+    if not os.path.isdir(root):
+        return []
+    found = [(int(m.group(1)), name) for name in os.listdir(root) if (m := VERSION_PATTERN.match(name))]
+    return [name for _, name in sorted(found)]
+
+
+def current_version(root: str):
+    """Active version name, or None if nothing has been published."""
+    try:
+        with open(os.path.join(root, CURRENT_NAME), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        if os.path.exists(os.path.join(root, MANIFEST_NAME)):
+            return LEGACY_VERSION
+        return None
+
+
+def version_path(root: str, version: str) -> str:
+    return root if version == LEGACY_VERSION else os.path.join(root, version)
+
+
+def publish(engine: ForestEngine, root: str) -> str:
+    """Save engine as the next version under root and make it current. Returns the version name."""
+    versions = list_versions(root)
+    version = f"v{int(VERSION_PATTERN.match(versions[-1]).group(1)) + 1 if versions else 1}"
+    engine.save(os.path.join(root, version))
+    activate(root, version)
+    return version
+
+
+def activate(root: str, version: str):
+    """Point CURRENT at an existing version (also used to roll back)."""
+    if not os.path.exists(os.path.join(version_path(root, version), MANIFEST_NAME)):
+        raise FileNotFoundError(f"Model version '{version}' not found under '{root}'.")
+    tmp = os.path.join(root, f".{CURRENT_NAME}.{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(root, CURRENT_NAME))
+
+
+def warm_up(engine: ForestEngine):
+    """Fault in every array page and run both prediction paths once."""
+    for name in ARRAY_NAMES:
+        np.asarray(getattr(engine, name)).sum()
+    rows = np.zeros((2, max(engine.n_features, 1)))
+    engine.predict(rows)
+    engine.predict_one(rows[0])
+
+
+class ModelRegistry:
+    def __init__(self, root: str, check_interval: float = None):
+        if check_interval is None:
+            check_interval = float(os.environ.get("GREENMIND_MODEL_CHECK_INTERVAL", "2.0"))
+        self.root = root
+        self.check_interval = check_interval
+        self._active = (None, None)     # (version, engine), replaced as one reference
+        self._failed = None             # version that failed to load; not retried until CURRENT moves
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []
+
+    def on_load(self, callback):
+        """Register callback(version, ok), called after every load attempt, outside the registry lock."""
+        self._listeners.append(callback)
+
+    def active(self) -> tuple:
+        """(version, engine) currently serving; (None, None) before the first load."""
+        return self._active
+
+    def get(self) -> tuple:
+        """
+        Active (version, engine). Before anything is loaded (e.g. no background
+        thread on serverless platforms) the first caller loads synchronously.
+        """
+        active = self._active
+        if active[1] is None:
+            return self.refresh()
+        return active
+
+    def refresh(self) -> tuple:
+        """Load and swap in the CURRENT version if it differs from the active one."""
+        with self._lock:
+            version = current_version(self.root)
+            if version is None or version in (self._active[0], self._failed):
+                return self._active
+            try:
+                engine = ForestEngine.load(version_path(self.root, version))
+                warm_up(engine)
+                ok = True
+            except Exception as e:
+                self._failed = version
+                print(f"❌ Error loading model version {version}: {e}")
+                ok = False
+            if ok:
+                previous = self._active[0]
+                self._active = (version, engine)
+                print(f"✅  Model {version} loaded from: {version_path(self.root, version)}"
+                      + (f" (replaces {previous})" if previous else ""))
+            active = self._active
+        # Outside the lock, so a slow listener never holds up get(); a failing one is only logged.
+        for callback in self._listeners:
+            try:
+                callback(version, ok)
+            except Exception as e:
+                print(f"⚠️  Model load listener {getattr(callback, '__name__', callback)!r} failed: {e}")
+        return active
+
+    def start(self):
+        """Start the background loader (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:     # e.g. CURRENT unreadable: keep serving and retry
+                print(f"⚠️  Model check failed: {e}")
+            self._stop.wait(self.check_interval)
@@ -0,0 +1,208 @@
+"""
+GreenMind AI – Out-of-core Training
+Trains the energy forest on CSVs that do not fit in memory.
+
+1. The CSV is streamed once in chunks into a columnar cache: one raw binary
+   file per column plus a manifest.json, opened later as np.memmap. A seeded
+   per-row split flag (1 byte/row) marks the held-out test rows, so no
+   index array over the whole dataset is ever materialized. The cache is
+   reused as long as the source file's size and mtime are unchanged.
+2. Each worker process draws a random subsample of training rows from the
+   memmapped columns and fits a small RandomForestRegressor on it.
+3. The workers' estimators_ are merged into one forest, which is scored on
+   the test rows block by block (streaming R²).
+
+Peak memory is bounded by chunk_size and subsample_rows, not by the file size.
+"""
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# ── Ensure project root is on sys.path ─────────────────────────────────────
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+CACHE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+SPLIT_COLUMN = "_split"           # 0 = train, 1 = test
+FEATURE_DTYPE = np.float32        # sklearn casts X to float32 anyway, so this is lossless
+TARGET_DTYPE = np.float64
+
+
+def _source_stamp(path: str) -> dict:
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class ColumnCache:
+    """Memory-mapped, read-only view of a cache directory written by build_cache."""
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != CACHE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache format in '{directory}'; delete it to rebuild.")
+        self.directory = directory
+        self.rows = self.manifest["rows"]
+        self.columns = {
+            name: np.memmap(os.path.join(directory, f"{name}.bin"), dtype=dtype, mode="r", shape=(self.rows,))
+            if self.rows else np.empty(0, dtype=dtype)
+            for name, dtype in self.manifest["columns"].items()
+        }
+
+    def take(self, names, index: np.ndarray) -> np.ndarray:
+        """(len(index), len(names)) float64 matrix of the given rows; index should be sorted."""
+        out = np.empty((len(index), len(names)), dtype=np.float64)
+        for j, name in enumerate(names):
+            out[:, j] = self.columns[name][index]
+        return out
+
+
+def build_cache(csv_path: str, cache_dir: str, features, target, chunk_size: int = 1_000_000,
+                test_size: float = 0.2, seed: int = 42) -> ColumnCache:
+    """
+    Stream csv_path into a columnar cache under cache_dir (or reuse it if still current).
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"Dataset not found at '{csv_path}'.")
+    stamp = _source_stamp(csv_path)
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if (manifest.get("format_version") == CACHE_FORMAT_VERSION and manifest.get("source") == stamp
+                and manifest.get("test_size") == test_size and manifest.get("seed") == seed):
+            return ColumnCache(cache_dir)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)   # an interrupted rebuild must not look valid
+
+    dtypes = {name: FEATURE_DTYPE for name in features}
+    dtypes[target] = TARGET_DTYPE
+    dtypes[SPLIT_COLUMN] = np.uint8
+    files = {name: open(os.path.join(cache_dir, f"{name}.bin"), "wb") for name in dtypes}
+    rng = np.random.default_rng(seed)
+    rows = 0
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            missing = [c for c in list(features) + [target] if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"Dataset is missing required columns: {missing}")
+            for name in list(features) + [target]:
+                files[name].write(chunk[name].to_numpy(dtype=dtypes[name]).tobytes())
+            files[SPLIT_COLUMN].write((rng.random(len(chunk)) < test_size).astype(np.uint8).tobytes())
+            rows += len(chunk)
+    finally:
+        for f in files.values():
+            f.close()
+
+    manifest = {
+        "format_version": CACHE_FORMAT_VERSION,
+        "source": stamp,
+        "rows": rows,
+        "test_size": test_size,
+        "seed": seed,
+        "features": list(features),
+        "target": target,
+        "columns": {name: np.dtype(dtype).name for name, dtype in dtypes.items()},
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return ColumnCache(cache_dir)
+
+
+def sample_rows(cache: ColumnCache, split: int, n: int, rng: np.random.Generator) -> np.ndarray:
+    """Sorted indices of up to n random rows with the given split flag, drawn without a full index."""
+    flags = cache.columns[SPLIT_COLUMN]
+    if cache.rows == 0:
+        return np.empty(0, dtype=np.int64)
+    if n >= cache.rows:
+        return np.flatnonzero(np.asarray(flags) == split)
+    share = cache.manifest["test_size"] if split == 1 else 1 - cache.manifest["test_size"]
+    draw = min(cache.rows, int(n / max(share, 1e-9) * 1.1) + 16)
+    index = np.unique(rng.integers(0, cache.rows, size=draw))
+    index = index[flags[index] == split]
+    if len(index) > n:
+        index = np.sort(rng.choice(index, size=n, replace=False))
+    return index
+
+
+def fit_subsample(cache_dir: str, n_trees: int, subsample_rows: int, seed: int, params: dict):
+    """Worker task: fit n_trees on a random subsample of the cached training rows."""
+    cache = ColumnCache(cache_dir)
+    rng = np.random.default_rng(seed)
+    index = sample_rows(cache, 0, subsample_rows, rng)
+    X = cache.take(cache.manifest["features"], index)
+    y = np.asarray(cache.columns[cache.manifest["target"]][index])
+    model = RandomForestRegressor(n_estimators=n_trees, random_state=seed, n_jobs=1, **params)
+    model.fit(X, y)
+    return model
+
+
+def merge_forests(models: list) -> RandomForestRegressor:
+    """Concatenate the trees of several fitted forests (same features) into one forest."""
+    merged = models[0]
+    for other in models[1:]:
+        merged.estimators_ += other.estimators_
+    merged.n_estimators = len(merged.estimators_)
+    return merged
+
+
+def train_out_of_core(cache: ColumnCache, n_estimators: int = 100, subsample_rows: int = 1_000_000,
+                      workers: int = 1, seed: int = 42, params: dict = None) -> RandomForestRegressor:
+    """Fit n_estimators trees split across `workers` tasks, each on its own subsample."""
+    params = params if params is not None else {"max_depth": 10}
+    tasks = max(1, min(workers, n_estimators))
+    trees = [n_estimators // tasks + (i < n_estimators % tasks) for i in range(tasks)]
+    seeds = np.random.SeedSequence(seed).generate_state(tasks).tolist()
+    args = [(cache.directory, t, subsample_rows, s, params) for t, s in zip(trees, seeds)]
+
+    if workers <= 1:
+        models = [fit_subsample(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            models = list(pool.map(fit_subsample, *zip(*args)))
+    return merge_forests(models)
+
+
+def evaluate_streaming(model, cache: ColumnCache, block_rows: int = 1_000_000):
+    """
+    R² of model on the cached test rows, one block at a time.
+    Returns (r2, test_rows, X_sample) where X_sample is the first test block (for parity checks).
+    """
+    features = cache.manifest["features"]
+    target = cache.columns[cache.manifest["target"]]
+    flags = cache.columns[SPLIT_COLUMN]
+    n = 0
+    mean = m2 = ss_res = 0.0      # running mean / sum of squared deviations of y (Chan et al.)
+    X_sample = None
+    for start in range(0, cache.rows, block_rows):
+        stop = min(start + block_rows, cache.rows)
+        index = start + np.flatnonzero(np.asarray(flags[start:stop]) == 1)
+        if len(index) == 0:
+            continue
+        X = cache.take(features, index)
+        y = np.asarray(target[index])
+        residual = y - model.predict(X)
+        block_mean = float(y.mean())
+        block_m2 = float(np.dot(y - block_mean, y - block_mean))
+        total = n + len(y)
+        delta = block_mean - mean
+        m2 += block_m2 + delta * delta * n * len(y) / total
+        mean += delta * len(y) / total
+        n = total
+        ss_res += float(np.dot(residual, residual))
+        if X_sample is None:
+            X_sample = X[:10000]
+    if n == 0:
+        raise ValueError("No test rows in the cache; the dataset is too small for out-of-core training.")
+    if m2 == 0:
+        # Constant target: R² is undefined. Like sklearn's r2_score, 1 for a perfect fit, else 0.
+        return (1.0 if ss_res == 0 else 0.0), n, X_sample
+    return 1 - ss_res / m2, n, X_sample
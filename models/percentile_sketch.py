@@ -0,0 +1,474 @@
+"""
+Cohort Percentile Ranks
+Streaming t-digests of annual footprints (total and per category) for each
+cohort, e.g. an organisation, so a response can say "lower than 80% of your
+cohort" without keeping every submission.
+
+A TDigest holds at most ~COMPRESSION centroids plus a small insert buffer,
+so memory per cohort stays bounded however many users submit. Ranking is an
+interpolation over the centroids' cumulative weights: a binary search, O(log n).
+
+Every worker process writes its own sketches to
+<directory>/sketch-<pid>.json every GREENMIND_SKETCH_PERSIST_INTERVAL seconds
+(default 5) and re-reads the other workers' files as often, from a background
+thread; requests never wait on the disk. Ranks use all of them: a rank is a
+CDF, and the CDF of merged digests is the weight-averaged CDF of the parts. A
+file left by a worker that has exited is claimed by one live worker (atomic
+rename), merged into its own sketches once they are persisted with it, and
+deleted, so history survives restarts without the file count growing.
+
+Files carry a stamp of the process that wrote them (boot id and start time,
+where /proc provides them), so a reused pid is not mistaken for a live
+worker. A claimer records the claimed file's name in its own file before
+deleting it; a claimed file left behind by a claimer that died is deleted
+if some file already lists it, and claimed again otherwise.
+"""
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
+
+COMPRESSION = 100       # t-digest δ: ~δ centroids, tail error ~1/δ²
+BUFFER_SIZE = 256       # unmerged values kept before a compress pass
+MAX_COHORTS = 1000      # further cohorts are not tracked (rank = None)
+DEFAULT_COHORT = "global"
+
+SKETCH_PATTERN = re.compile(r"^sketch-(\d+)\.json$")
+CLAIMED_PATTERN = re.compile(r"^claimed-(\d+)-(?:([0-9a-f]*\.\d+|)-)?(sketch-\d+\.json)$")
+
+
+class TDigest:
+    """Merging t-digest (Dunning & Ertl) with the arcsine scale function k1."""
+
+    def __init__(self, compression: float = COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self._buffer = []               # sorted values not yet merged into centroids
+        self._xs, self._ys = [], []     # interpolation knots of the centroids
+
+    def add(self, value: float):
+        insort(self._buffer, value)
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= BUFFER_SIZE:
+            self._compress()
+
+    def merge(self, other: "TDigest"):
+        """Fold another digest's centroids into this one."""
+        other._compress()
+        if other.count:
+            self._absorb(other.means, other.weights, other.min, other.max)
+
+    def _absorb(self, means, weights, low: float, high: float):
+        self.count += float(np.sum(weights))
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+        self._compress(np.asarray(means, dtype=np.float64), np.asarray(weights, dtype=np.float64))
+
+    def _compress(self, extra_means=None, extra_weights=None):
+        if not self._buffer and extra_means is None:
+            return
+        means, weights = [self.means], [self.weights]
+        if self._buffer:
+            means.append(np.array(self._buffer))
+            weights.append(np.ones(len(self._buffer)))
+            self._buffer = []
+        if extra_means is not None:
+            means.append(extra_means)
+            weights.append(extra_weights)
+        means, weights = np.concatenate(means), np.concatenate(weights)
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order].tolist(), weights[order].tolist()
+
+        # Greedy pass: a centroid may grow while it spans at most one unit of k(q).
+        total = sum(weights)
+        scale = self.compression / (2 * np.pi)
+        merged_means, merged_weights = [means[0]], [weights[0]]
+        done = 0.0                      # weight of the closed centroids
+        limit = total * _q_limit(0.0, scale)
+        for mean, weight in zip(means[1:], weights[1:]):
+            if done + merged_weights[-1] + weight <= limit:
+                w = merged_weights[-1] + weight
+                merged_means[-1] += (mean - merged_means[-1]) * weight / w
+                merged_weights[-1] = w
+            else:
+                done += merged_weights[-1]
+                limit = total * _q_limit(done / total, scale)
+                merged_means.append(mean)
+                merged_weights.append(weight)
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+        cumulative = np.cumsum(self.weights) - self.weights / 2
+        self._xs = np.concatenate(([self.min], self.means, [self.max])).tolist()
+        self._ys = np.concatenate(([0.0], cumulative, [total])).tolist()
+
+    def cdf(self, value: float) -> float:
+        """
+        Estimated fraction of the weight below value (ties count half).
+        Centroids are interpolated; buffered values are counted exactly.
+        """
+        if self.count == 0:
+            return float("nan")
+        buffer = self._buffer
+        low, high = bisect_left(buffer, value), bisect_right(buffer, value)
+        return (self._centroid_weight_below(value) + low + (high - low) / 2) / self.count
+
+    def _centroid_weight_below(self, value: float) -> float:
+        xs, ys = self._xs, self._ys
+        if not xs or value < xs[0]:
+            return 0.0
+        if value > xs[-1]:
+            return ys[-1]
+        i = bisect_left(xs, value)
+        if xs[i] == value:
+            # Equal to one or more knots: average their cumulative weights.
+            j = bisect_right(xs, value) - 1
+            return (ys[i] + ys[j]) / 2
+        x0, x1, y0, y1 = xs[i - 1], xs[i], ys[i - 1], ys[i]
+        return y0 + (y1 - y0) * (value - x0) / (x1 - x0)
+
+    def to_dict(self) -> dict:
+        self._compress()
+        return {
+            "compression": self.compression, "count": self.count, "min": self.min, "max": self.max,
+            "means": self.means.tolist(), "weights": self.weights.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TDigest":
+        digest = cls(data["compression"])
+        if data["count"]:
+            digest._absorb(data["means"], data["weights"], data["min"], data["max"])
+        return digest
+
+
+def _q_limit(q: float, scale: float) -> float:
+    """Largest quantile a centroid starting at q may reach: k⁻¹(k(q) + 1), k(q) = scale·asin(2q − 1)."""
+    k = scale * np.arcsin(2 * q - 1) + 1
+    if k >= scale * np.pi / 2:
+        return 1.0
+    return (np.sin(k / scale) + 1) / 2
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True     # os.kill(pid, 0) is not a probe on Windows; keep the file
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_stamp(pid: int) -> str:
+    """
+    "<boot id prefix>.<start time>" of a running process, which a reused pid
+    or a reboot changes; "" where /proc is not available.
+    """
+    try:
+        with open("/proc/sys/kernel/random/boot_id", encoding="ascii") as f:
+            boot = f.read().strip().replace("-", "")[:12]
+        with open(f"/proc/{pid}/stat", encoding="ascii", errors="replace") as f:
+            stat = f.read()
+        start = stat[stat.rindex(")") + 2:].split()[19]     # field 22, starttime
+    except (OSError, ValueError, IndexError):
+        return ""
+    return f"{boot}.{start}"
+
+
+def _process_alive(pid: int, stamp: str = None) -> bool:
+    """pid is running and, if a stamp was recorded, it is still the process that recorded it."""
+    if not _pid_alive(pid):
+        return False
+    if stamp:
+        current = _process_stamp(pid)
+        if current and current != stamp:
+            return False
+    return True
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class CohortRanks:
+    """
+    Per-cohort digests of the total and each category, shared across worker processes.
+
+    Requests only touch memory, under the lock. A background thread per
+    process ("sketch-sync", started on first use and again in a forked child)
+    does all the file work every `interval` seconds: it persists this worker's
+    digests, claims the files of exited workers, and re-reads the others.
+    """
+
+    def __init__(self, directory: str, interval: float = None, max_cohorts: int = MAX_COHORTS):
+        if interval is None:
+            interval = float(os.environ.get("GREENMIND_SKETCH_PERSIST_INTERVAL", "5.0"))
+        self.directory = directory
+        self.interval = interval
+        self.max_cohorts = max_cohorts
+        self._lock = threading.Lock()
+        self._pid = None
+        self._local = {}            # cohort → {"total": TDigest, category: TDigest}
+        self._others = {}           # cohort → same, merged from the other workers' files
+        self._files = {}            # path → (mtime_ns, parsed file); sync thread only
+        self._absorbed = set()      # claimed-file names merged into our file; sync thread only
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"sketch-{pid}.json")
+
+    def _ensure_process(self):
+        """
+        Start empty in a new process (a forked child must not re-count its
+        parent's data) and start its sync thread. Called with the lock held.
+        """
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        self._pid = pid
+        self._local, self._others, self._files = {}, {}, {}
+        self._absorbed = set()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(pid, self._stop), name="sketch-sync", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        """Stop the sync thread after one last sync (persists pending digests)."""
+        with self._lock:
+            thread, stop = self._thread, self._stop
+            if thread is None or self._pid != os.getpid():
+                return
+            self._thread = None
+        stop.set()
+        thread.join(timeout)
+
+    def observe_and_rank(self, cohort: str, total: float, breakdown: dict) -> dict:
+        """
+        Add one footprint to the cohort, then rank it against everything seen so far.
+        Ranks are the % of the cohort with a lower value; None if the cohort cannot be tracked.
+        """
+        cohort = cohort or DEFAULT_COHORT
+        with self._lock:
+            self._ensure_process()
+            digests = self._local.get(cohort)
+            if digests is None:
+                if len(self._local) >= self.max_cohorts and cohort not in self._others:
+                    return None
+                digests = self._local[cohort] = {}
+            values = {"total": total, **breakdown}
+            for name, value in values.items():
+                digests.setdefault(name, TDigest()).add(float(value))
+            self._dirty = True
+            others = self._others.get(cohort, {})
+            ranks = {name: self._rank(digests.get(name), others.get(name), value) for name, value in values.items()}
+            count = digests["total"].count + (others["total"].count if "total" in others else 0)
+        return {
+            "cohort": cohort,
+            "count": int(count),
+            "total": ranks.pop("total"),
+            "breakdown": ranks,
+        }
+
+    @staticmethod
+    def _rank(local: TDigest, other: TDigest, value: float) -> float:
+        parts = [d for d in (local, other) if d is not None and d.count]
+        weight = sum(d.count for d in parts)
+        return round(100 * sum(d.cdf(value) * d.count for d in parts) / weight, 2)
+
+    # ── Persistence (sync thread) ────────────────────────────────────────────
+    def _run(self, pid: int, stop: threading.Event):
+        # Resume from this pid's own file, left by an earlier process with the same pid.
+        own = self._read(self._path(pid))
+        if own is not None:
+            self._absorbed = set(own.get("absorbed", []))
+            with self._lock:
+                self._merge_into(self._local, own["cohorts"])
+        while True:
+            try:
+                self._sync(pid)
+            except Exception as e:
+                print(f"⚠️  Cohort sketch sync failed: {e}")
+            if stop.is_set():
+                break       # close(): that was the final sync
+            stop.wait(self.interval)
+
+    def _read(self, path: str):
+        """The parsed file ({"pid", "stamp", "absorbed", "cohorts"}), or None if missing or unreadable."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or not isinstance(data.get("cohorts"), dict):
+                raise ValueError("no cohorts")
+            return data
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️  Ignoring unreadable sketch file {path}: {e}")
+            return None
+
+    @staticmethod
+    def _merge_into(target: dict, cohorts: dict):
+        for cohort, digests in cohorts.items():
+            slot = target.setdefault(cohort, {})
+            for name, data in digests.items():
+                slot.setdefault(name, TDigest()).merge(TDigest.from_dict(data))
+
+    @staticmethod
+    def _to_dicts(cohorts: dict) -> dict:
+        return {
+            cohort: {name: digest.to_dict() for name, digest in digests.items()}
+            for cohort, digests in cohorts.items()
+        }
+
+    def _take_snapshot(self, force: bool = False):
+        """
+        This worker's digests as persistable dicts and clears the dirty flag;
+        None if nothing changed since the last snapshot (unless force).
+        """
+        with self._lock:
+            if not (self._dirty or force):
+                return None
+            self._dirty = False
+            return self._to_dicts(self._local)
+
+    def _sync(self, pid: int):
+        """
+        Persist this worker's digests, absorb files of exited workers and
+        claimed files their claimer left behind, re-merge the rest.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            names = os.listdir(self.directory)
+        except OSError as e:
+            print(f"⚠️  Cohort sketches not shared: {e}")
+            return
+        self._absorbed &= set(names)    # a claimed file only needs its mark until it is deleted
+
+        own = self._path(pid)
+        live, claimed = {}, []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if CLAIMED_PATTERN.match(name):
+                claimed.append(path)
+                continue
+            match = SKETCH_PATTERN.match(name)
+            if match is None or path == own:
+                continue
+            other_pid = int(match.group(1))
+            if not _pid_alive(other_pid):
+                self._claim(pid, path)
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            cached = self._files.get(path)
+            if cached is None or cached[0] != mtime:
+                data = self._read(path)
+                if data is None:
+                    continue
+                cached = (mtime, data)
+            if not _process_alive(other_pid, cached[1].get("stamp")):
+                self._claim(pid, path)      # the pid now belongs to another process
+                continue
+            live[path] = cached
+        if claimed:
+            self._recover(pid, claimed, [data for _, data in live.values()])
+
+        if live.keys() != self._files.keys() or any(live[p][0] != self._files[p][0] for p in live):
+            others = {}
+            for _, data in live.values():
+                self._merge_into(others, data["cohorts"])
+            with self._lock:
+                self._others = others
+        self._files = live
+
+        cohorts = self._take_snapshot()
+        if cohorts is not None and not self._persist(pid, cohorts):
+            with self._lock:
+                self._dirty = True      # retry on the next sync
+
+    def _recover(self, pid: int, claimed: list, live: list):
+        """
+        Deal with claimed files whose claimer has died: delete the ones some
+        file already lists as absorbed, claim the others again.
+        """
+        absorbed = set(self._absorbed)
+        for data in live + [self._read(path) for path in claimed]:
+            if data is not None:
+                absorbed.update(data.get("absorbed", []))
+        for path in claimed:
+            name = os.path.basename(path)
+            claimer, stamp, _ = CLAIMED_PATTERN.match(name).groups()
+            if name in absorbed:
+                _remove(path)           # merged, but its claimer did not get to delete it
+            elif not _process_alive(int(claimer), stamp):
+                self._claim(pid, path)
+
+    def _claim(self, pid: int, path: str):
+        """
+        Take over the file of an exited worker (or a claimed file its claimer
+        left behind): rename it (only one worker wins), persist our digests
+        with its data folded in and its name marked as absorbed, and only then
+        add its data to self._local and delete it. If the persist fails the
+        file is handed back untouched, so its digests are never counted twice.
+        """
+        original = CLAIMED_PATTERN.match(os.path.basename(path))
+        original = original.group(3) if original else os.path.basename(path)
+        claimed_name = f"claimed-{pid}-{_process_stamp(pid)}-{original}"
+        claimed = os.path.join(self.directory, claimed_name)
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            return
+        data = self._read(claimed)
+        if data is None:
+            _remove(claimed)            # unreadable: nothing to keep
+            return
+        combined = {}
+        self._merge_into(combined, self._take_snapshot(force=True))
+        self._merge_into(combined, data["cohorts"])
+        # Its own marks stay valid: whatever it absorbed is now in our file.
+        absorbed = self._absorbed | set(data.get("absorbed", [])) | {claimed_name}
+        if not self._persist(pid, self._to_dicts(combined), absorbed):
+            with self._lock:
+                self._dirty = True
+            os.replace(claimed, path)   # not persisted: hand the file back
+            return
+        self._absorbed = absorbed
+        with self._lock:
+            self._merge_into(self._local, data["cohorts"])
+            self._dirty = True          # requests since the snapshot are not in the file yet
+        _remove(claimed)
+
+    def _persist(self, pid: int, cohorts: dict, absorbed: set = None) -> bool:
+        tmp = self._path(pid) + ".tmp"
+        absorbed = self._absorbed if absorbed is None else absorbed
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"pid": pid, "stamp": _process_stamp(pid), "absorbed": sorted(absorbed),
+                           "cohorts": cohorts}, f)
+            os.replace(tmp, self._path(pid))
+            return True
+        except OSError as e:
+            print(f"⚠️  Could not persist cohort sketches to {self._path(pid)}: {e}")
+            return False
@@ -0,0 +1,20 @@
+"""
+Resource usage helpers shared by the command-line tools (models/train.py,
+models/bulk_score.py).
+"""
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> tuple:
+    """(this process, largest child process) peak RSS in MB, or (None, None) if unavailable."""
+    if resource is None:
+        return None, None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024   # bytes on macOS, KB on Linux
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return self_rss, child_rss
@@ -0,0 +1,233 @@
+"""
+Scenario Engine
+Answers "what if" questions: applies input changes (from eco-tips or
+user-defined) to a profile and ranks them by real kg CO2 saved and score gain.
+
+A scenario is a list of change specs, each of the form
+    {"set": {field: value}, "scale": {field: factor}, "add": {field: delta}}
+Tips carry their spec in eco_tips.json under "scenario".
+
+All scenarios are evaluated together as rows of a column grid. For each
+breakdown category only the rows that touch one of its input fields are
+recomputed (CarbonEstimator.breakdown_batch on that subset); every other
+row reuses the baseline value.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import math
+from itertools import combinations
+
+import numpy as np
+
+from models.carbon_estimator import (
+    CarbonEstimator, FactorTables, CATEGORIES, CATEGORY_FIELDS, CATEGORICAL_FIELDS, INPUT_DEFAULTS, INTEGER_FIELDS, py_round,
+)
+from models.sustainability_score import SustainabilityScorer
+from models.eco_advisor import EcoAdvisor
+
+SPEC_OPERATIONS = ("set", "scale", "add")
+FIELD_MAX = {"waste_recycling_pct": 100.0}
+MAX_COMBINED_TIPS = 20      # only the best-saving single tips are combined: C(20, 3) = 1140 triples
+MAX_CANDIDATES = 2000       # hard limit on scenarios evaluated per request
+
+
+def spec_fields(spec: dict) -> set:
+    """Input fields touched by a change spec."""
+    return {field for op in SPEC_OPERATIONS for field in spec.get(op, {})}
+
+
+def _is_finite_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_spec(spec: dict, tables: FactorTables = None):
+    """
+    Raise ValueError for unknown operations or fields, or for values the
+    estimator cannot use: numeric fields take finite numbers, transport_mode
+    and diet_type a known factor key (from `tables`, when given), region a
+    string or None.
+    """
+    unknown_ops = set(spec) - set(SPEC_OPERATIONS)
+    if unknown_ops:
+        raise ValueError(f"Unknown scenario operation(s): {sorted(unknown_ops)}")
+    unknown_fields = spec_fields(spec) - set(INPUT_DEFAULTS)
+    if unknown_fields:
+        raise ValueError(f"Unknown scenario field(s): {sorted(unknown_fields)}")
+    for op in ("scale", "add"):
+        bad = [f for f in spec.get(op, {}) if f in CATEGORICAL_FIELDS]
+        if bad:
+            raise ValueError(f"Cannot {op} categorical field(s): {bad}")
+        bad = [f for f, value in spec.get(op, {}).items() if not _is_finite_number(value)]
+        if bad:
+            raise ValueError(f"{op} needs finite numbers for field(s): {bad}")
+
+    known = {
+        "transport_mode": tables.transport_modes if tables is not None else None,
+        "diet_type": tables.diet_types if tables is not None else None,
+    }
+    for field, value in spec.get("set", {}).items():
+        if field == "region":
+            if value is not None and not isinstance(value, str):
+                raise ValueError("region must be a region code string or null.")
+        elif field in CATEGORICAL_FIELDS:
+            if not isinstance(value, str):
+                raise ValueError(f"{field} must be a string.")
+            if known[field] is not None and value not in known[field]:
+                raise ValueError(f"Unknown {field} {value!r}; expected one of {', '.join(known[field])}.")
+        elif not _is_finite_number(value):
+            raise ValueError(f"{field} must be a finite number, got {value!r}.")
+
+
+def apply_spec(values: dict, spec: dict) -> dict:
+    """Apply one change spec to a profile; returns only the changed fields."""
+    changed = {}
+    for field, value in spec.get("set", {}).items():
+        changed[field] = value
+    for field, factor in spec.get("scale", {}).items():
+        changed[field] = float(changed.get(field, values[field])) * factor
+    for field, delta in spec.get("add", {}).items():
+        changed[field] = float(changed.get(field, values[field])) + delta
+    for field, value in changed.items():
+        if field not in CATEGORICAL_FIELDS:
+            value = min(max(float(value), 0.0), FIELD_MAX.get(field, float("inf")))
+            changed[field] = int(value) if field in INTEGER_FIELDS else value
+    return changed
+
+
+class ScenarioEngine:
+    def __init__(self, estimator: CarbonEstimator = None, scorer: SustainabilityScorer = None,
+                 advisor: EcoAdvisor = None):
+        self.estimator = estimator or CarbonEstimator()
+        self.scorer = scorer or SustainabilityScorer()
+        self.advisor = advisor or EcoAdvisor()
+
+    def tip_scenarios(self) -> list:
+        """One scenario per tip that declares a "scenario" spec."""
+        return [
+            {"name": tip["tip"], "tip_ids": [tip["id"]], "specs": [tip["scenario"]]}
+            for tip in self.advisor.get_all()
+            if tip.get("scenario")
+        ]
+
+    def evaluate(self, inputs: dict, scenarios: list) -> dict:
+        """
+        Evaluate scenarios against a profile.
+
+        inputs:    profile dict (CarbonInput fields; missing ones use INPUT_DEFAULTS)
+        scenarios: list of {"specs": [spec, ...], ...}
+        Returns {"baseline": estimate-style dict + score, "changes": [dict per scenario],
+                 "breakdown": {cat: array}, "total": array, "overall_score": array, "grade": array}
+        """
+        snapshot = self.estimator.registry.snapshot()
+        profile = {field: inputs.get(field, default) for field, default in INPUT_DEFAULTS.items()}
+        base_columns = {field: [value] for field, value in profile.items()}
+        base_breakdown = self.estimator.breakdown_batch(base_columns, snapshot=snapshot)
+
+        # Build the grid: only changed cells differ from the baseline.
+        n = len(scenarios)
+        changes = []
+        for scenario in scenarios:
+            changed = {}
+            for spec in scenario["specs"]:
+                changed.update(apply_spec({**profile, **changed}, spec))
+            changes.append(changed)
+
+        columns = {}
+        touched = {}
+        for field, value in profile.items():
+            rows = [i for i, changed in enumerate(changes) if field in changed]
+            if field in CATEGORICAL_FIELDS:
+                column = np.full(n, value, dtype=object)
+            else:
+                column = np.full(n, float(value))
+            for i in rows:
+                column[i] = changes[i][field]
+            columns[field] = column
+            touched[field] = rows
+
+        # Recompute each category only for the scenarios that touch it.
+        breakdown = {}
+        for cat in CATEGORIES:
+            values = np.repeat(base_breakdown[cat], n)
+            rows = sorted({i for field in CATEGORY_FIELDS[cat] for i in touched[field]})
+            if rows:
+                subset = {field: columns[field][rows] for field in CATEGORY_FIELDS[cat]}
+                values[rows] = self.estimator.breakdown_batch(subset, categories=(cat,), snapshot=snapshot)[cat]
+            breakdown[cat] = values
+
+        total = py_round(sum(breakdown[c] for c in CATEGORIES), 1)
+        score = self.scorer.score_batch(total, breakdown)
+
+        base_total = py_round(sum(base_breakdown[c] for c in CATEGORIES), 1)
+        base_score = self.scorer.score_batch(base_total, base_breakdown)
+        return {
+            "baseline": {
+                "total_kg_co2_year": float(base_total[0]),
+                "breakdown": {c: float(base_breakdown[c][0]) for c in CATEGORIES},
+                "overall_score": float(base_score["overall_score"][0]),
+                "grade": base_score["grade"][0],
+            },
+            "changes": changes,
+            "breakdown": breakdown,
+            "total": total,
+            "overall_score": score["overall_score"],
+            "grade": score["grade"],
+        }
+
+    def rank(self, inputs: dict, scenarios: list = None, include_tips: bool = True,
+             max_combination_size: int = 2, top_n: int = 10) -> dict:
+        """
+        Rank scenarios by kg CO2 saved (then score gain).
+
+        Tip scenarios that save anything on their own are also combined, up to
+        max_combination_size tips per scenario, as long as they change
+        different fields. Only the MAX_COMBINED_TIPS best-saving tips are
+        combined, and generation stops at MAX_CANDIDATES scenarios, so the
+        cost stays bounded however large the tip catalogue grows. Only
+        scenarios that reduce the footprint are returned.
+        """
+        candidates = [dict(s, tip_ids=s.get("tip_ids", [])) for s in (scenarios or [])]
+        if include_tips:
+            tips = self.tip_scenarios()
+            single = self.evaluate(inputs, tips) if tips else None
+            kept = [i for i in range(len(tips)) if single["total"][i] < single["baseline"]["total_kg_co2_year"]]
+            saving = [tips[i] for i in kept]
+            fields = [set().union(*(spec_fields(spec) for spec in s["specs"])) for s in saving]
+            candidates.extend(saving)
+            # Combine the best savers only, in catalogue order (stable sort: ties keep it).
+            best = sorted(range(len(saving)), key=lambda j: single["total"][kept[j]])[:MAX_COMBINED_TIPS]
+            pool = sorted(best)
+            combos = (combo for size in range(2, max_combination_size + 1) for combo in combinations(pool, size))
+            for combo in combos:
+                if len(candidates) >= MAX_CANDIDATES:
+                    break
+                combo_fields = [fields[i] for i in combo]
+                if sum(len(f) for f in combo_fields) != len(set().union(*combo_fields)):
+                    continue   # two tips change the same field
+                candidates.append({
+                    "name": " + ".join(saving[i]["name"] for i in combo),
+                    "tip_ids": [tid for i in combo for tid in saving[i]["tip_ids"]],
+                    "specs": [spec for i in combo for spec in saving[i]["specs"]],
+                })
+
+        result = self.evaluate(inputs, candidates)
+        baseline = result["baseline"]
+        saved = py_round(baseline["total_kg_co2_year"] - result["total"], 1)
+        gain = py_round(result["overall_score"] - baseline["overall_score"], 1)
+
+        order = np.lexsort((-gain, -saved))
+        ranked = []
+        for i in order[saved[order] > 0][:top_n].tolist():
+            ranked.append({
+                "name": candidates[i]["name"],
+                "tip_ids": candidates[i]["tip_ids"],
+                "changes": result["changes"][i],
+                "total_kg_co2_year": float(result["total"][i]),
+                "saved_kg_co2_year": float(saved[i]),
+                "breakdown": {c: float(result["breakdown"][c][i]) for c in CATEGORIES},
+                "overall_score": float(result["overall_score"][i]),
+                "score_gain": float(gain[i]),
+                "grade": result["grade"][i],
+            })
+        return {"baseline": baseline, "scenarios": ranked, "evaluated": len(candidates)}
@@ -0,0 +1,163 @@
+"""
+GreenMind AI – Hyperparameter Search
+k-fold cross-validated grid or random search over RandomForestRegressor
+parameters, scored on accuracy *and* serving cost.
+
+The feature matrix, target and fold assignment are written once as .npy
+files and memory-mapped by every worker, so trials share them without
+copies. Trials run on a process pool; a trial whose running mean R² falls
+more than `early_stop_margin` below the best finished trial is stopped
+after its current fold. Each trial records mean fit time, ForestEngine
+single-row latency, per-row batch latency and node count next to R².
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import Value
+
+# ── Ensure project root is on sys.path ─────────────────────────────────────
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+
+from models.forest_engine import ForestEngine
+
+GRID = {
+    "n_estimators": [50, 100, 200],
+    "max_depth": [6, 10, 14, None],
+    "min_samples_leaf": [1, 5],
+    "max_features": [1.0, 0.6],
+}
+LATENCY_ROWS = 200      # single-row calls timed per trial
+BATCH_ROWS = 1024       # rows in the timed batch call
+
+# ── Per-process search state ────────────────────────────────────────────────
+_shared = None
+_best = None
+
+
+def _init_worker(shared_dir: str, best):
+    global _shared, _best
+    _shared = {
+        name: np.load(os.path.join(shared_dir, f"{name}.npy"), mmap_mode="r")
+        for name in ("X", "y", "fold")
+    }
+    _best = best
+
+
+def grid_trials() -> list:
+    """Every combination of GRID."""
+    return [dict(zip(GRID, values)) for values in product(*GRID.values())]
+
+
+def random_trials(n: int, seed: int = 42) -> list:
+    """n parameter sets drawn from ranges around GRID."""
+    rng = np.random.default_rng(seed)
+    depths = [4, 6, 8, 10, 12, 14, 16, None]
+    return [
+        {
+            "n_estimators": int(rng.integers(20, 301)),
+            "max_depth": depths[int(rng.integers(len(depths)))],
+            "min_samples_leaf": int(rng.integers(1, 11)),
+            "max_features": round(float(rng.uniform(0.3, 1.0)), 2),
+        }
+        for _ in range(n)
+    ]
+
+
+def share_arrays(X: np.ndarray, y: np.ndarray, folds: int, seed: int, directory: str) -> str:
+    """Write X, y and a shuffled fold id per row as .npy files for memory-mapping."""
+    fold = np.arange(len(y)) % folds
+    np.random.default_rng(seed).shuffle(fold)
+    np.save(os.path.join(directory, "X.npy"), np.ascontiguousarray(X, dtype=np.float64))
+    np.save(os.path.join(directory, "y.npy"), np.ascontiguousarray(y, dtype=np.float64))
+    np.save(os.path.join(directory, "fold.npy"), fold.astype(np.int8))
+    return directory
+
+
+def serving_cost(model, X: np.ndarray) -> dict:
+    """ForestEngine latency for single rows (median) and per row in a BATCH_ROWS call (best of 3)."""
+    engine = ForestEngine.from_sklearn(model)
+    rows = X[:LATENCY_ROWS]
+    single = []
+    for row in rows:
+        start = time.perf_counter()
+        engine.predict_one(row)
+        single.append(time.perf_counter() - start)
+    batch_rows = np.resize(X, (BATCH_ROWS, X.shape[1]))
+    batch = []
+    for _ in range(3):
+        start = time.perf_counter()
+        engine.predict(batch_rows)
+        batch.append(time.perf_counter() - start)
+    return {
+        "predict_one_us": round(float(np.median(single)) * 1e6, 1),
+        "predict_batch_us_per_row": round(min(batch) / BATCH_ROWS * 1e6, 2),
+        "nodes": int(len(engine.feature)),
+    }
+
+
+def run_trial(params: dict, seed: int = 42, early_stop_margin: float = 0.05) -> dict:
+    """Cross-validate one parameter set on the shared folds."""
+    X, y, fold = _shared["X"], _shared["y"], _shared["fold"]
+    folds = int(fold.max()) + 1
+    scores, fit_times, cost = [], [], None
+    stopped = False
+    for k in range(folds):
+        test = fold == k
+        model = RandomForestRegressor(random_state=seed, n_jobs=1, **params)
+        start = time.perf_counter()
+        model.fit(X[~test], y[~test])
+        fit_times.append(time.perf_counter() - start)
+        scores.append(r2_score(y[test], model.predict(X[test])))
+        if cost is None:
+            cost = serving_cost(model, np.asarray(X[test]))
+        if k + 1 < folds and np.mean(scores) < _best.value - early_stop_margin:
+            stopped = True
+            break
+
+    r2 = float(np.mean(scores))
+    if not stopped:
+        with _best.get_lock():
+            _best.value = max(_best.value, r2)
+    return {
+        "params": params,
+        "r2_mean": round(r2, 4),
+        "r2_std": round(float(np.std(scores)), 4),
+        "folds_run": len(scores),
+        "stopped_early": stopped,
+        "fit_s": round(float(np.mean(fit_times)), 4),
+        **cost,
+    }
+
+
+def search(X, y, trials: list, folds: int = 5, workers: int = 1, seed: int = 42,
+           early_stop_margin: float = 0.05) -> list:
+    """Run all trials; returns their records sorted by R² (best first)."""
+    best = Value("d", float("-inf"))
+    with tempfile.TemporaryDirectory(prefix="greenmind-search-") as shared_dir:
+        share_arrays(np.asarray(X), np.asarray(y), folds, seed, shared_dir)
+        if workers <= 1:
+            _init_worker(shared_dir, best)
+            results = [run_trial(params, seed, early_stop_margin) for params in trials]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shared_dir, best)) as pool:
+                futures = [pool.submit(run_trial, params, seed, early_stop_margin) for params in trials]
+                results = [f.result() for f in futures]
+    return sorted(results, key=lambda r: (r["stopped_early"], -r["r2_mean"]))
+
+
+def pick(results: list, r2_tolerance: float = 0.005) -> tuple:
+    """(most accurate trial, cheapest-to-serve trial within r2_tolerance of it)."""
+    complete = [r for r in results if not r["stopped_early"]]
+    best = complete[0]
+    within = [r for r in complete if r["r2_mean"] >= best["r2_mean"] - r2_tolerance]
+    cheapest = min(within, key=lambda r: (r["predict_one_us"], r["predict_batch_us_per_row"]))
+    return best, cheapest
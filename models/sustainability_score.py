@@ -1,11 +1,15 @@
 """
 Sustainability Score Model
 Generates a 0–100 sustainability score and letter grade from lifestyle inputs.
+score_batch() does the same for whole populations with NumPy.
 """
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from data.loader import load_emissions_factors
+import numpy as np
+
+from data.registry import reference_data
+from models.carbon_estimator import py_round
 
 
 GRADE_THRESHOLDS = [
@@ -17,10 +21,32 @@ GRADE_THRESHOLDS = [
     (0,  "F",  "Needs work – your footprint is significantly above targets."),
 ]
 
+# Ascending copies of GRADE_THRESHOLDS for np.searchsorted
+_GRADE_CUTS = np.array([t for t, _, _ in reversed(GRADE_THRESHOLDS)], dtype=np.float64)
+_GRADES = np.array([g for _, g, _ in reversed(GRADE_THRESHOLDS)], dtype=object)
+_GRADE_LABELS = np.array([label for _, _, label in reversed(GRADE_THRESHOLDS)], dtype=object)
+
+WORST_CASE_KG = 20000  # High-consumption profile
+
+# Category maximums (rough estimates for scoring)
+CATEGORY_MAX = {
+    "transport": 6000,
+    "energy":    3000,
+    "diet":      2700,
+    "shopping":  1500,
+    "waste":     200,
+}
+DEFAULT_CATEGORY_MAX = 2000
+
 
 class SustainabilityScorer:
-    def __init__(self):
-        self.factors = load_emissions_factors()
+    def __init__(self, registry=None):
+        self.registry = registry or reference_data
+
+    @property
+    def factors(self) -> dict:
+        """Emission factors from the current reference-data snapshot."""
+        return self.registry.snapshot().emissions_factors
 
     def score(self, total_kg_co2: float, breakdown: dict) -> dict:
         """
@@ -28,24 +54,16 @@ class SustainabilityScorer:
         Breakdown weights are taken into account for category scores.
         """
         target = self.factors["target_annual_kg"]
-        worst_case = 20000  # High-consumption profile
+        worst_case = WORST_CASE_KG
 
         # Overall score (100 = at target or below, 0 = at worst_case or above)
         clamped = max(target, min(worst_case, total_kg_co2))
         raw_score = 100 * (1 - (clamped - target) / (worst_case - target))
         overall = round(max(0, min(100, raw_score)), 1)
 
-        # Category maximums (rough estimates for scoring)
-        category_max = {
-            "transport": 6000,
-            "energy":    3000,
-            "diet":      2700,
-            "shopping":  1500,
-            "waste":     200,
-        }
         category_scores = {}
         for cat, val in breakdown.items():
-            cat_max = category_max.get(cat, 2000)
+            cat_max = CATEGORY_MAX.get(cat, DEFAULT_CATEGORY_MAX)
             cat_score = 100 * (1 - min(val, cat_max) / cat_max)
             category_scores[cat] = round(max(0, cat_score), 1)
 
@@ -62,3 +80,33 @@ class SustainabilityScorer:
             "grade_label": grade_label,
             "category_scores": category_scores,
         }
+
+    def score_batch(self, total_kg_co2, breakdown: dict) -> dict:
+        """
+        Vectorized score() over many profiles.
+
+        total_kg_co2: array of annual totals
+        breakdown:    dict of {category: array}, as returned by CarbonEstimator.estimate_batch
+        Returns a dict of arrays with the same keys as score(); grades are
+        resolved with np.searchsorted over the grade thresholds.
+        """
+        target = self.factors["target_annual_kg"]
+        worst_case = WORST_CASE_KG
+
+        clamped = np.clip(np.asarray(total_kg_co2, dtype=np.float64), target, worst_case)
+        raw_score = 100 * (1 - (clamped - target) / (worst_case - target))
+        overall = py_round(np.clip(raw_score, 0, 100), 1)
+
+        category_scores = {}
+        for cat, val in breakdown.items():
+            cat_max = CATEGORY_MAX.get(cat, DEFAULT_CATEGORY_MAX)
+            cat_score = 100 * (1 - np.minimum(val, cat_max) / cat_max)
+            category_scores[cat] = py_round(np.maximum(0, cat_score), 1)
+
+        grade_idx = np.searchsorted(_GRADE_CUTS, overall, side="right") - 1
+        return {
+            "overall_score": overall,
+            "grade": _GRADES[grade_idx],
+            "grade_label": _GRADE_LABELS[grade_idx],
+            "category_scores": category_scores,
+        }
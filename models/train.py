@@ -3,11 +3,20 @@ GreenMind AI – Model Trainer
 Trains a RandomForestRegressor on energy usage data and saves the model.
 
 Usage:
-    python models/train.py
+    python models/train.py                 # train, save the pickle and export the serving artifact
+    python models/train.py --export-only   # re-export the artifact from the existing pickle
+                                           # (training histograms from --data, if present)
+    python models/train.py --out-of-core --data meter_history.csv --workers 8
+                                           # stream a large CSV through a memory-mapped column cache
+    python models/train.py --search grid --folds 5 --workers 4
+                                           # cross-validated parameter search (accuracy + serving cost)
 """
 
+import argparse
+import json
 import os
 import sys
+import time
 
 # Ensure stdout can handle utf-8 characters properly on Windows
 sys.stdout.reconfigure(encoding='utf-8')
@@ -21,11 +30,19 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score
 import joblib
+import numpy as np
+
+from models.drift import FeatureHistograms
+from models.forest_engine import ForestEngine
+from models.model_registry import publish
+from models.resource_usage import peak_rss_mb
 
 # ── Paths ───────────────────────────────────────────────────────────────────
 DATA_PATH  = os.path.join(ROOT, "data", "energy_data.csv")
 MODEL_DIR  = os.path.join(ROOT, "models")
 MODEL_PATH = os.path.join(MODEL_DIR, "energy_model.pkl")
+ARTIFACT_DIR = os.path.join(MODEL_DIR, "energy_model")   # versioned pickle-free serving artifacts
+SEARCH_RESULTS_PATH = os.path.join(MODEL_DIR, "search_results.json")
 
 FEATURES = ["temperature", "humidity", "hour"]
 TARGET   = "energy_usage"
@@ -67,37 +84,153 @@ def train(df: pd.DataFrame):
     return model, r2, X_test, y_pred
 
 
+def check_engine_parity(model, X) -> float:
+    """Return the max absolute difference between ForestEngine and sklearn predictions."""
+    engine = ForestEngine.from_sklearn(model)
+    return float(np.max(np.abs(engine.predict(np.asarray(X)) - model.predict(X))))
+
+
 def save_model(model, path: str):
     """Persist the trained model with joblib."""
     os.makedirs(os.path.dirname(path), exist_ok=True)
     joblib.dump(model, path)
 
 
-def main():
+def export_artifact(model, directory: str, histograms: dict = None) -> str:
+    """
+    Publish the forest as the next version of memory-mappable .npy arrays for the
+    API (no sklearn needed to load). Running servers pick it up without a restart.
+    histograms: the training data's FeatureHistograms.to_dict(), for drift monitoring.
+    """
+    engine = ForestEngine.from_sklearn(model)
+    engine.training_histograms = histograms
+    return publish(engine, directory)
+
+
+def feature_histograms(X) -> dict:
+    """Fixed-bucket histograms of a (n_rows, len(FEATURES)) matrix, as stored in the manifest."""
+    histograms = FeatureHistograms()
+    histograms.add(X)
+    return histograms.to_dict()
+
+
+def export_only(args):
+    print(f"\n📂  Loading model from:  {MODEL_PATH}")
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError(f"Model not found at '{MODEL_PATH}'. Train it first with 'python models/train.py'.")
+    model = joblib.load(MODEL_PATH)
+    histograms = None
+    if os.path.exists(args.data):
+        print(f"    Training histograms from: {args.data}")
+        histograms = feature_histograms(load_data(args.data)[FEATURES].to_numpy())
+    print(f"\n📦  Exporting serving artifact to: {ARTIFACT_DIR}")
+    version = export_artifact(model, ARTIFACT_DIR, histograms)
+    print(f"    ✅  Artifact exported successfully as version {version}.")
+
+
+def train_streaming(args):
+    """Out-of-core path: CSV → memmapped column cache → subsample forests merged into one."""
+    from models.out_of_core import build_cache, train_out_of_core, evaluate_streaming
+
+    cache_dir = args.cache_dir or os.path.splitext(args.data)[0] + ".cache"
+    print(f"\n🗂️   Column cache: {cache_dir}")
+    start = time.perf_counter()
+    cache = build_cache(args.data, cache_dir, FEATURES, TARGET, chunk_size=args.chunk_size)
+    print(f"    Rows: {cache.rows}  ({time.perf_counter() - start:.1f} s)")
+    histograms = FeatureHistograms()
+    for block in range(0, cache.rows, args.chunk_size):
+        stop = min(block + args.chunk_size, cache.rows)
+        histograms.add(np.column_stack([np.asarray(cache.columns[name][block:stop]) for name in FEATURES]))
+
+    print(f"\n🧠  Training RandomForestRegressor on {args.subsample_rows} row subsamples "
+          f"across {args.workers} worker(s) ...")
+    model = train_out_of_core(cache, subsample_rows=args.subsample_rows, workers=args.workers)
+    r2, test_rows, X_check = evaluate_streaming(model, cache, block_rows=args.chunk_size)
+    return model, r2, test_rows, X_check, histograms.to_dict()
+
+
+def run_search(args):
+    """Cross-validated parameter search; prints a trial table and writes it as JSON."""
+    from models.search import grid_trials, random_trials, search, pick
+
+    print("=" * 55)
+    print("  🌿  GreenMind AI – Parameter Search")
+    print("=" * 55)
+
+    print(f"\n📂  Loading dataset from:  {args.data}")
+    df = load_data(args.data)
+    trials = grid_trials() if args.search == "grid" else random_trials(args.trials)
+    print(f"    Rows: {len(df)}  |  Trials: {len(trials)} ({args.search})  |  "
+          f"Folds: {args.folds}  |  Workers: {args.workers}")
+
+    start = time.perf_counter()
+    results = search(df[FEATURES].to_numpy(), df[TARGET].to_numpy(), trials,
+                     folds=args.folds, workers=args.workers, early_stop_margin=args.early_stop_margin)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n📊  Trials (best R² first, {elapsed:.1f} s):")
+    print(f"    {'R²':>7} {'±':>6} {'fit s':>7} {'1-row µs':>9} {'µs/row':>7} {'nodes':>7}  params")
+    for r in results:
+        flag = "  ⏹️  stopped" if r["stopped_early"] else ""
+        print(f"    {r['r2_mean']:>7.4f} {r['r2_std']:>6.4f} {r['fit_s']:>7.3f} {r['predict_one_us']:>9.1f} "
+              f"{r['predict_batch_us_per_row']:>7.2f} {r['nodes']:>7}  {r['params']}{flag}")
+
+    best, cheapest = pick(results, args.r2_tolerance)
+    print(f"\n🏆  Most accurate      : {best['params']}  (R² {best['r2_mean']:.4f})")
+    print(f"⚡  Cheapest within {args.r2_tolerance} R²: {cheapest['params']}  "
+          f"(R² {cheapest['r2_mean']:.4f}, {cheapest['predict_one_us']:.0f} µs/prediction)")
+
+    with open(args.search_output, "w", encoding="utf-8") as f:
+        json.dump({"search": args.search, "folds": args.folds, "rows": len(df), "trials": results}, f, indent=2)
+    print(f"\n💾  Results written to: {args.search_output}")
+    print("=" * 55 + "\n")
+
+
+def main(args):
     print("=" * 55)
     print("  🌿  GreenMind AI – Energy Model Trainer")
     print("=" * 55)
 
-    print(f"\n📂  Loading dataset from:  {DATA_PATH}")
-    df = load_data(DATA_PATH)
-    print(f"    Rows: {len(df)}  |  Columns: {list(df.columns)}")
+    start = time.perf_counter()
+    if args.out_of_core:
+        model, r2, test_rows, X_test, histograms = train_streaming(args)
+    else:
+        print(f"\n📂  Loading dataset from:  {args.data}")
+        df = load_data(args.data)
+        print(f"    Rows: {len(df)}  |  Columns: {list(df.columns)}")
 
-    print("\n🧠  Training RandomForestRegressor (80/20 split) ...")
-    model, r2, X_test, y_pred = train(df)
+        print("\n🧠  Training RandomForestRegressor (80/20 split) ...")
+        model, r2, X_test, y_pred = train(df)
+        test_rows = len(X_test)
+        histograms = feature_histograms(df[FEATURES].to_numpy())
+    elapsed = time.perf_counter() - start
+    self_rss, child_rss = peak_rss_mb()
 
     print(f"\n📊  Model Evaluation:")
     print(f"    R² Score  : {r2:.4f}  ({r2 * 100:.2f}%)")
-    print(f"    Test rows : {len(X_test)}")
+    print(f"    Test rows : {test_rows}")
+    print(f"    Wall time : {elapsed:.2f} s")
+    if self_rss is not None:
+        print(f"    Peak RSS  : {self_rss:.0f} MB (main), {child_rss:.0f} MB (largest worker)")
 
     if r2 < 0.5:
         print("    ⚠️  Warning: R² is below 0.5. Consider reviewing the data.")
     else:
         print("    ✅  Model accuracy is acceptable.")
 
+    parity = check_engine_parity(model, X_test)
+    print(f"    Engine parity (max |Δ| vs sklearn): {parity:.2e}")
+    if parity > 1e-9:
+        raise RuntimeError("ForestEngine predictions diverge from sklearn; refusing to save.")
+
     print(f"\n💾  Saving model to: {MODEL_PATH}")
     save_model(model, MODEL_PATH)
     print("    ✅  Model saved successfully.")
 
+    print(f"\n📦  Exporting serving artifact to: {ARTIFACT_DIR}")
+    version = export_artifact(model, ARTIFACT_DIR, histograms)
+    print(f"    ✅  Artifact exported successfully as version {version}.")
+
     print("\n" + "=" * 55)
     print("  🚀  Next steps:")
     print("  uvicorn api.main:app --reload --port 8000")
@@ -105,11 +238,49 @@ def main():
     print("=" * 55 + "\n")
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the GreenMind AI energy model.")
+    parser.add_argument(
+        "--export-only",
+        action="store_true",
+        help="Skip training and re-export the serving artifact from the saved pickle.",
+    )
+    parser.add_argument("--data", default=DATA_PATH, help="Training CSV (default: data/energy_data.csv)")
+    parser.add_argument(
+        "--out-of-core",
+        action="store_true",
+        help="Stream the CSV into a memory-mapped column cache and train on subsamples (bounded memory).",
+    )
+    parser.add_argument("--cache-dir", help="Column cache directory (default: <data>.cache next to the CSV)")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000, help="CSV rows per chunk (default 1000000)")
+    parser.add_argument("--subsample-rows", type=int, default=1_000_000,
+                        help="Training rows drawn per worker (default 1000000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for --out-of-core and --search (default: all cores)")
+    parser.add_argument("--search", choices=["grid", "random"],
+                        help="Cross-validated parameter search instead of training")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds for --search (default 5)")
+    parser.add_argument("--trials", type=int, default=20, help="Parameter sets for --search random (default 20)")
+    parser.add_argument("--early-stop-margin", type=float, default=0.05,
+                        help="Stop a trial whose running R² trails the best finished trial by more (default 0.05)")
+    parser.add_argument("--r2-tolerance", type=float, default=0.005,
+                        help="R² a cheaper model may give up against the best one (default 0.005)")
+    parser.add_argument("--search-output", default=SEARCH_RESULTS_PATH,
+                        help="Trial results JSON (default: models/search_results.json)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        main()
+        if args.export_only:
+            export_only(args)
+        elif args.search:
+            run_search(args)
+        else:
+            main(args)
     except FileNotFoundError as e:
-        print(f"\n❌  Dataset Error: {e}")
+        print(f"\n❌  Missing file: {e}")
         sys.exit(1)
     except Exception as e:
         print(f"\n❌  Unexpected error: {e}")
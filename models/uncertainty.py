@@ -0,0 +1,122 @@
+"""
+Carbon Estimate Uncertainty
+Monte Carlo bands around CarbonEstimator's point estimates.
+
+Every emission factor and fixed assumption (average flight distances, weekly
+household waste) gets a mean-preserving lognormal multiplier. Its coefficient
+of variation comes from the "uncertainty" block of emissions_factors.json.
+Sampling is vectorized over samples × terms with a seeded NumPy Generator,
+so the same seed always reproduces the same bands.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from models.carbon_estimator import (
+    CarbonEstimator, CATEGORIES, INPUT_DEFAULTS, AVG_SHORT_FLIGHT_KM, AVG_LONG_FLIGHT_KM, AVG_WASTE_KG_WEEK,
+    FLIGHT_SHORT, FLIGHT_LONG, ELECTRICITY, NATURAL_GAS, CLOTHING, ELECTRONICS, LANDFILL, RECYCLED,
+)
+
+# Order of the sampled multipliers (rows of the multiplier matrix)
+TERMS = (
+    "transport_km", "flight_km", "avg_short_flight_km", "avg_long_flight_km",
+    "electricity_kwh", "natural_gas_kwh", "diet",
+    "clothing_item", "electronics_device",
+    "landfill_kg", "recycled_kg", "avg_waste_kg_week",
+)
+DEFAULT_PERCENTILES = (5.0, 50.0, 95.0)
+
+
+def lognormal_multipliers(rng: np.random.Generator, cv: np.ndarray, samples: int) -> np.ndarray:
+    """(len(cv), samples) float32 multipliers with mean 1 and coefficient of variation cv."""
+    sigma = np.sqrt(np.log1p(cv ** 2)).astype(np.float32)[:, None]
+    z = rng.standard_normal((len(cv), samples), dtype=np.float32)
+    return np.exp(-0.5 * sigma ** 2 + sigma * z)
+
+
+def sorted_percentiles(values: np.ndarray, percentiles) -> np.ndarray:
+    """
+    np.percentile(values, percentiles, axis=1) with linear interpolation.
+    A full float32 sort is several times faster than np.partition here.
+    """
+    ordered = np.sort(values, axis=1)
+    pos = np.asarray(percentiles, dtype=np.float64) / 100 * (ordered.shape[1] - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, ordered.shape[1] - 1)
+    frac = (pos - lo)[:, None]
+    return ordered[:, lo].T * (1 - frac) + ordered[:, hi].T * frac
+
+
+def percentile_key(q: float) -> str:
+    return f"p{q:g}"
+
+
+class UncertaintyEstimator:
+    def __init__(self, estimator: CarbonEstimator = None):
+        self.estimator = estimator or CarbonEstimator()
+
+    def estimate(self, inputs: dict, samples: int = 10000, seed: int = None,
+                 percentiles=DEFAULT_PERCENTILES) -> dict:
+        """
+        Percentile bands of the annual footprint, per category and in total.
+
+        seed: Generator seed; when omitted a fresh one is drawn and returned,
+              so any result can be reproduced later.
+        Returns {"samples", "seed", "percentiles", "total": {"mean", "p5", ...},
+                 "breakdown": {category: {"mean", "p5", ...}}}
+        """
+        snapshot = self.estimator.registry.snapshot()
+        tables = self.estimator.tables(snapshot)
+        cv = snapshot.emissions_factors.get("uncertainty", {})
+        if seed is None:
+            seed = int(np.random.SeedSequence().generate_state(1)[0])
+        rng = np.random.default_rng(seed)
+        m = dict(zip(TERMS, lognormal_multipliers(rng, np.array([cv.get(t, 0.0) for t in TERMS]), samples)))
+
+        # Deterministic parts of each term, exactly as in CarbonEstimator.estimate
+        p = {field: inputs.get(field, default) for field, default in INPUT_DEFAULTS.items()}
+        region = tables.region_code(p["region"])
+        f = tables.scalar_rows[region]
+        mode_factor = tables.transport_rows[region][tables.mode_code(p["transport_mode"])]
+        diet_factor = tables.diet_daily_rows[region][tables.diet_code(p["diet_type"])]
+        recycling = float(p["waste_recycling_pct"]) / 100
+
+        flights = (
+            int(p["flights_short_per_year"]) * AVG_SHORT_FLIGHT_KM * f[FLIGHT_SHORT] * m["avg_short_flight_km"] +
+            int(p["flights_long_per_year"]) * AVG_LONG_FLIGHT_KM * f[FLIGHT_LONG] * m["avg_long_flight_km"]
+        )
+        values = {
+            "transport": float(p["km_per_week"]) * 52 * mode_factor * m["transport_km"] + flights * m["flight_km"],
+            "energy": (
+                float(p["electricity_kwh_month"]) * 12 * f[ELECTRICITY] * m["electricity_kwh"] +
+                float(p["natural_gas_kwh_month"]) * 12 * f[NATURAL_GAS] * m["natural_gas_kwh"]
+            ),
+            "diet": diet_factor * 365 * m["diet"],
+            "shopping": (
+                int(p["clothing_items_per_year"]) * f[CLOTHING] * m["clothing_item"] +
+                int(p["electronics_per_year"]) * f[ELECTRONICS] * m["electronics_device"]
+            ),
+            "waste": AVG_WASTE_KG_WEEK * 52 * m["avg_waste_kg_week"] * (
+                (1 - recycling) * f[LANDFILL] * m["landfill_kg"] +
+                recycling * f[RECYCLED] * m["recycled_kg"]
+            ),
+        }
+        stacked = np.vstack([values[c] for c in CATEGORIES])
+        stacked = np.vstack([stacked, stacked.sum(axis=0)])
+
+        qs = sorted_percentiles(stacked, percentiles)      # (len(percentiles), categories + 1)
+        means = stacked.mean(axis=1, dtype=np.float64)
+        bands = []
+        for j in range(stacked.shape[0]):
+            band = {"mean": round(float(means[j]), 1)}
+            band.update({percentile_key(q): round(float(qs[i, j]), 1) for i, q in enumerate(percentiles)})
+            bands.append(band)
+
+        return {
+            "samples": samples,
+            "seed": seed,
+            "percentiles": [float(q) for q in percentiles],
+            "total": bands[-1],
+            "breakdown": dict(zip(CATEGORIES, bands[:-1])),
+        }
@@ -0,0 +1,15 @@
+"""
+Shared test setup: puts the project root on sys.path and keeps the API from
+writing into data/ (no submission log, cohort sketches in a temp directory).
+Both settings are read when api.config is imported, so they are set here,
+before any test module imports the app.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ["GREENMIND_SUBMISSIONS_DB"] = ""
+os.environ["GREENMIND_SKETCH_DIR"] = tempfile.mkdtemp(prefix="greenmind-sketches-")
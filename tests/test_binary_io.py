@@ -0,0 +1,133 @@
+"""
+Binary batch ingestion: .npy bodies (C and Fortran order, float32/float64)
+are read as views and predicted exactly like JSON batches, and malformed,
+oversized or hostile headers are answered with 422 before any parsing
+work grows with them.
+"""
+import io
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from api import binary_io
+from api.main import app
+
+NPY = {"content-type": binary_io.NPY}
+
+
+def npy(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def npy_with_header(header: str, version: tuple = (1, 0), data: bytes = b"") -> bytes:
+    """A .npy body with an arbitrary header string (padded like np.save does)."""
+    raw = header.encode("latin1")
+    prefix = 10 if version == (1, 0) else 12
+    raw += b" " * (-(prefix + len(raw) + 1) % 64) + b"\n"
+    size = len(raw).to_bytes(2 if version == (1, 0) else 4, "little")
+    return b"\x93NUMPY" + bytes(version) + size + raw + data
+
+
+def features(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(0, 60, n), rng.uniform(0, 100, n), rng.integers(0, 24, n)])
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def rejected(body: bytes) -> str:
+    with pytest.raises(HTTPException) as info:
+        binary_io.read_npy(body)
+    assert info.value.status_code == 422
+    return info.value.detail
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_read_npy_round_trips(dtype, order):
+    X = np.asarray(features(50), dtype=dtype, order=order)
+    view = binary_io.read_npy(npy(X))
+    np.testing.assert_array_equal(view, X)
+    assert view.dtype == dtype
+
+
+def test_version_2_header_is_read():
+    X = features(5)
+    header = np.lib.format.header_data_from_array_1_0(X)
+    buffer = io.BytesIO()
+    np.lib.format.write_array_header_2_0(buffer, header)
+    np.testing.assert_array_equal(binary_io.read_npy(buffer.getvalue() + X.tobytes()), X)
+
+
+@pytest.mark.parametrize("body, message", [
+    (b"", "not a .npy"),
+    (b"PK\x03\x04 not numpy", "not a .npy"),
+    (b"\x93NUMPY\x09\x00", "Unsupported"),
+    (npy_with_header("{'descr': '<f8', 'fortran_order': False}"), "Malformed"),
+    (npy_with_header("not a dict"), "Malformed"),
+    (npy_with_header("{'descr': '<f8', 'fortran_order': False, 'shape': (2, 3), 'extra': 1}"), "Malformed"),
+    (npy_with_header("{'descr': '|O', 'fortran_order': False, 'shape': (1, 3)}"), "float32 or float64"),
+    (npy_with_header("{'descr': '<i8', 'fortran_order': False, 'shape': (1, 3)}"), "float32 or float64"),
+    (npy_with_header("{'descr': '<f8', 'fortran_order': False, 'shape': (3,)}"), "shape"),
+    (npy_with_header("{'descr': '<f8', 'fortran_order': False, 'shape': (2, 3)}", data=b"\x00" * 40), "length"),
+])
+def test_malformed_bodies_are_rejected(body, message):
+    assert message in rejected(body)
+
+
+def test_oversized_header_is_rejected_before_parsing():
+    nested = "{'descr': '<f8', 'fortran_order': False, 'shape': (1, 3), 'x': " + "[" * 50_000 + "]" * 50_000 + "}"
+    assert "Malformed" in rejected(npy_with_header(nested, version=(2, 0)))
+    padded = "{'descr': '<f8', 'fortran_order': False, 'shape': (1, 3)}" + " " * binary_io.MAX_NPY_HEADER_SIZE
+    assert "Malformed" in rejected(npy_with_header(padded, version=(2, 0), data=b"\x00" * 24))
+
+
+def test_binary_predictions_match_json_batch(client):
+    X = features(200, seed=3)
+    response = client.post("/predict/batch/binary", content=npy(X.astype(np.float32)), headers=NPY)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == binary_io.NPY
+    assert response.headers["x-model-version"]
+    predictions = np.load(io.BytesIO(response.content))
+    assert predictions.shape == (200,) and predictions.dtype == np.float64
+
+    rows = [{"temperature": float(t), "humidity": float(h), "hour": int(hr)}
+            for t, h, hr in X.astype(np.float32).astype(np.float64)]
+    expected = client.post("/predict/batch", json={"rows": rows}).json()["predictions"]
+    np.testing.assert_allclose(predictions, expected, rtol=0, atol=5.1e-5)      # JSON rounds to 4 places
+
+
+@pytest.mark.parametrize("body, headers, status", [
+    (npy(features(3)), {"content-type": "application/json"}, 415),
+    (npy(np.empty((0, 3))), NPY, 422),
+    (npy(np.array([[20.0, 50.0, 3.5]])), NPY, 422),            # fractional hour
+    (npy(np.array([[20.0, 150.0, 3.0]])), NPY, 422),           # humidity out of range
+    (npy(np.array([[np.nan, 50.0, 3.0]])), NPY, 422),
+    (npy_with_header("{'descr': '<f8', 'fortran_order': False, 'shape': (1, 3), 'x': " + "(" * 10_000 + ")" * 10_000
+                     + "}", version=(2, 0)), NPY, 422),
+])
+def test_bad_requests_get_client_errors(client, body, headers, status):
+    response = client.post("/predict/batch/binary", content=body, headers=headers)
+    assert response.status_code == status
+
+
+def test_row_limit_is_enforced(client, monkeypatch):
+    from api import main
+    monkeypatch.setattr(main, "MAX_BINARY_BATCH_SIZE", 10)
+    assert client.post("/predict/batch/binary", content=npy(features(11)), headers=NPY).status_code == 413
+
+
+def test_validate_columns_names_the_first_bad_row():
+    columns = {name: features(6)[:, i] for i, name in enumerate(binary_io.FEATURES)}
+    columns["temperature"][4] = 61.0
+    columns["temperature"][5] = -1.0
+    with pytest.raises(HTTPException) as info:
+        binary_io.validate_columns(columns)
+    assert info.value.detail.startswith("Row 4: temperature") and "2 invalid row(s)" in info.value.detail
@@ -0,0 +1,74 @@
+"""
+Streaming bulk scorer: output rows come back in input order with the same
+footprint, score and tips as the single-profile paths, whatever the chunk
+size, worker count and file format.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from models import bulk_score
+from models.carbon_estimator import CATEGORIES, CarbonEstimator
+from models.eco_advisor import EcoAdvisor
+from models.sustainability_score import SustainabilityScorer
+
+N = 257
+
+
+@pytest.fixture(scope="module")
+def survey() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        "respondent": np.arange(N),
+        "transport_mode": rng.choice(["car_petrol", "bus", "train", "bicycle", "unknown"], N),
+        "km_per_week": rng.uniform(0, 600, N).round(1),
+        "flights_short_per_year": rng.integers(0, 6, N),
+        "electricity_kwh_month": rng.uniform(50, 900, N).round(1),
+        "diet_type": rng.choice(["meat_heavy", "vegetarian", "vegan"], N),
+        "waste_recycling_pct": rng.uniform(0, 100, N).round(1),
+    })
+
+
+def expected(row: dict) -> dict:
+    carbon = CarbonEstimator().estimate(row)
+    score = SustainabilityScorer().score(carbon["total_kg_co2_year"], carbon["breakdown"])
+    tips = EcoAdvisor().recommend(carbon["breakdown"], top_n=3)
+    return {
+        "total_kg_co2_year": carbon["total_kg_co2_year"],
+        "overall_score": score["overall_score"],
+        "grade": score["grade"],
+        "top_tip_ids": ";".join(str(t["id"]) for t in tips),
+        **{f"{cat}_kg_co2_year": carbon["breakdown"][cat] for cat in CATEGORIES},
+    }
+
+
+def read(path, fmt: str) -> pd.DataFrame:
+    return pd.read_csv(path, dtype={"top_tip_ids": str}) if fmt == "csv" else \
+        pd.read_json(path, lines=True, dtype={"top_tip_ids": str})
+
+
+@pytest.mark.parametrize("workers, chunk_size, fmt", [(1, 50, "csv"), (2, 40, "jsonl"), (1, 1000, "csv")])
+def test_bulk_scores_match_single_profile_paths(survey, tmp_path, workers, chunk_size, fmt):
+    source = tmp_path / f"survey.{fmt}"
+    if fmt == "csv":
+        survey.to_csv(source, index=False)
+    else:
+        survey.to_json(source, orient="records", lines=True)
+    output = tmp_path / f"scored.{fmt}"
+
+    rows = bulk_score.run(str(source), str(output), chunk_size=chunk_size, workers=workers, top_n=3)
+
+    assert rows == N
+    scored = read(output, fmt)
+    assert scored["respondent"].tolist() == list(range(N))     # input order kept
+    for record, result in zip(survey.to_dict("records"), scored.to_dict("records")):
+        for key, value in expected(record).items():
+            if isinstance(value, str):
+                assert str(result[key]) == value, key
+            else:
+                assert result[key] == pytest.approx(value, abs=1e-9), key
+
+
+def test_unknown_extension_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        bulk_score.detect_format(str(tmp_path / "survey.xlsx"))
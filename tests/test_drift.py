@@ -0,0 +1,159 @@
+"""
+Drift monitor: fixed-bucket histograms count rows and batches alike, PSI and
+the binned KS statistic match their definitions, the KS p-value follows the
+Kolmogorov distribution, and the live window rotates and reports drift only
+once it has a comparable training histogram and enough rows.
+"""
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from models import drift as drift_module
+from models.drift import BUCKETS, PSI_FLOOR, DriftMonitor, FeatureHistograms, compare, ks_p_value
+
+
+def inputs(n: int, seed: int = 0, temperature: float = 20.0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.normal(temperature, 5, n), rng.uniform(20, 90, n), rng.integers(0, 24, n)])
+
+
+def expected_counts(X: np.ndarray) -> dict:
+    counts = {}
+    for j, (name, (low, high, bins)) in enumerate(BUCKETS.items()):
+        index = np.clip(np.floor((X[:, j] - low) * bins / (high - low)), 0, bins - 1).astype(int)
+        counts[name] = np.bincount(index, minlength=bins).tolist()
+    return counts
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# ── FeatureHistograms ────────────────────────────────────────────────────────
+def test_rows_and_batches_land_in_the_same_buckets():
+    X = np.vstack([inputs(500), [[-5.0, 150.0, 23.0], [75.0, -1.0, 0.0]]])     # out of range: edge buckets
+    by_row, small, large = FeatureHistograms(), FeatureHistograms(), FeatureHistograms()
+    for row in X.tolist():
+        by_row.add_row(row)
+    for start in range(0, len(X), 10):
+        small.add(X[start:start + 10])
+    large.add(X)
+    for histograms in (by_row, small, large):
+        assert histograms.rows == len(X)
+        assert histograms.to_dict()["counts"] == expected_counts(X)
+
+
+def test_dict_round_trip():
+    histograms = FeatureHistograms()
+    histograms.add(inputs(300))
+    histograms.add_row([21.0, 55.0, 7.0])
+    copy = FeatureHistograms.from_dict(histograms.to_dict())
+    assert copy.rows == 301
+    np.testing.assert_array_equal(copy.total(), histograms.total())
+    assert copy.edges("hour") == list(range(25))
+
+
+# ── Statistics ───────────────────────────────────────────────────────────────
+def test_identical_distributions_do_not_drift():
+    counts = np.array([10, 40, 30, 20])
+    result = compare(counts, counts * 3)
+    assert result == {"psi": 0.0, "ks": 0.0, "ks_p_value": 1.0, "unseen_share": 0.0, "status": "stable"}
+
+
+def test_psi_ks_and_unseen_share_match_their_definitions():
+    training = np.array([50, 30, 20, 0])
+    live = np.array([10, 30, 40, 20])
+    result = compare(training, live)
+    expected = np.maximum(training / training.sum(), PSI_FLOOR)
+    actual = np.maximum(live / live.sum(), PSI_FLOOR)
+    assert result["psi"] == pytest.approx(np.sum((actual - expected) * np.log(actual / expected)), abs=1e-4)
+    assert result["ks"] == pytest.approx(0.4)          # CDFs 0.5/0.8/1.0 vs 0.1/0.4/0.8
+    assert result["unseen_share"] == pytest.approx(0.2)
+    assert result["status"] == "significant"
+
+
+@pytest.mark.parametrize("lam, p", [(0.5, 0.9639), (1.0, 0.2700), (1.358, 0.0500), (1.628, 0.0100)])
+def test_ks_p_value_follows_the_kolmogorov_distribution(lam, p):
+    n = m = 10_000
+    effective = np.sqrt(n * m / (n + m))
+    statistic = lam / (effective + 0.12 + 0.11 / effective)
+    assert ks_p_value(statistic, n, m) == pytest.approx(p, abs=5e-4)
+
+
+def test_ks_p_value_edge_cases():
+    assert ks_p_value(0.0, 100, 100) == 1.0
+    assert ks_p_value(0.5, 0, 100) == 1.0
+    assert 0.0 <= ks_p_value(1.0, 10_000, 10_000) < 1e-12
+
+
+# ── DriftMonitor ─────────────────────────────────────────────────────────────
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(drift_module.time, "monotonic", clock)
+    return clock
+
+
+def training_histograms(n: int = 5000) -> dict:
+    histograms = FeatureHistograms()
+    histograms.add(inputs(n, seed=1))
+    return histograms.to_dict()
+
+
+def test_live_window_covers_the_current_and_previous_window(clock):
+    monitor = DriftMonitor(window=60)
+    monitor.observe_batch(inputs(100))
+    clock.now = 61
+    monitor.observe([20.0, 50.0, 3.0])
+    assert monitor.live().rows == 101
+    clock.now = 122
+    monitor.observe([20.0, 50.0, 3.0])
+    assert monitor.live().rows == 2                   # the first window aged out
+    clock.now = 300
+    assert monitor.live().rows == 0                   # a whole idle window: both dropped
+
+
+def test_report_needs_training_histograms_and_enough_rows(clock):
+    monitor = DriftMonitor(window=60)
+    monitor.observe_batch(inputs(50))
+    for training, min_rows in ((None, 10), (training_histograms(), 100)):
+        report = monitor.report(training, min_rows)
+        assert report["drift"] is None
+        assert all(f["status"] is None for f in report["features"].values())
+
+    other = FeatureHistograms({"temperature": (0.0, 60.0, 30), "humidity": (0.0, 100.0, 50), "hour": (0.0, 24.0, 24)})
+    report = monitor.report(other.to_dict(), min_rows=10)
+    assert report["training_rows"] is None and report["drift"] is None
+
+
+def test_shifted_inputs_are_reported_as_drift(clock):
+    training = training_histograms()
+    stable, shifted = DriftMonitor(window=60), DriftMonitor(window=60)
+    stable.observe_batch(inputs(2000, seed=2))
+    shifted.observe_batch(inputs(2000, seed=2, temperature=35.0))
+
+    report = stable.report(training)
+    assert report["drift"] is False and report["training_rows"] == 5000
+    assert report["features"]["temperature"]["ks_p_value"] > 0.01
+
+    report = shifted.report(training, histograms=True)
+    temperature = report["features"]["temperature"]
+    assert report["drift"] is True and temperature["status"] == "significant"
+    assert temperature["ks"] > 0.5 and temperature["ks_p_value"] < 1e-6
+    assert report["features"]["humidity"]["status"] == "stable"
+    assert len(temperature["edges"]) == len(temperature["live"]) + 1 == 61
+    assert sum(temperature["live"]) == 2000 and sum(temperature["training"]) == 5000
+
+
+def test_drift_route_reports_every_feature():
+    client = TestClient(app)
+    client.post("/predict", json={"temperature": 22.0, "humidity": 50.0, "hour": 9})
+    body = client.get("/predict/drift", params={"min_rows": 1, "histograms": True}).json()
+    assert set(body["features"]) == set(BUCKETS)
+    assert body["live_rows"] >= 1
+    assert all("edges" in f for f in body["features"].values())
@@ -0,0 +1,83 @@
+"""
+Indexed EcoAdvisor: the heap-based top-N must return exactly what a full
+sort of every tip by relevance returns (ties in catalogue order), for the
+shipped catalogue and for a large synthetic one.
+"""
+import numpy as np
+import pytest
+
+from data.registry import ReferenceSnapshot
+from models.carbon_estimator import CATEGORIES
+from models.eco_advisor import IMPACT_WEIGHTS, EcoAdvisor
+
+
+class StaticRegistry:
+    """A registry that always hands out one snapshot with the given tips."""
+
+    def __init__(self, tips: list):
+        self._snapshot = ReferenceSnapshot(1, {}, tips, {})
+
+    def snapshot(self):
+        return self._snapshot
+
+
+def reference_recommend(tips: list, breakdown: dict, top_n: int) -> list:
+    """Score every tip and sort them all (stable), as EcoAdvisor did before it was indexed."""
+    priority = [cat for cat, _ in sorted(breakdown.items(), key=lambda x: x[1], reverse=True)]
+    scored = []
+    for tip in tips:
+        cat = tip.get("category", "")
+        rank = priority.index(cat) if cat in priority else len(priority)
+        scored.append(((len(priority) - rank) * IMPACT_WEIGHTS.get(tip.get("impact", "low"), 1), tip))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [tip for _, tip in scored[:max(top_n, 0)]]
+
+
+def synthetic_tips(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    categories = list(CATEGORIES) + ["general"]
+    return [
+        {
+            "id": i,
+            "category": categories[rng.integers(len(categories))],
+            "impact": ["high", "medium", "low", "unknown"][rng.integers(4)],
+            "tip": f"tip {i}",
+            "tags": [f"tag{rng.integers(5)}"],
+        }
+        for i in range(n)
+    ]
+
+
+def random_breakdowns(count: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        cats = [c for c in CATEGORIES if rng.random() < 0.85] or [CATEGORIES[0]]
+        # Small integers so equal values (ties between categories) are common.
+        yield {cat: float(rng.integers(0, 4)) for cat in cats}
+
+
+@pytest.mark.parametrize("n_tips", [0, 7, 2000])
+def test_top_n_matches_full_sort(n_tips):
+    tips = synthetic_tips(n_tips)
+    advisor = EcoAdvisor(StaticRegistry(tips))
+    for i, breakdown in enumerate(random_breakdowns(200)):
+        top_n = [0, 1, 3, 5, 50, n_tips + 3][i % 6]
+        got = [t["id"] for t in advisor.recommend(breakdown, top_n=top_n)]
+        assert got == [t["id"] for t in reference_recommend(tips, breakdown, top_n)], (breakdown, top_n)
+
+
+def test_shipped_catalogue_matches_full_sort():
+    advisor = EcoAdvisor()
+    tips = advisor.get_all()
+    for breakdown in random_breakdowns(100, seed=2):
+        for top_n in (1, 5, len(tips)):
+            assert advisor.recommend(breakdown, top_n) == reference_recommend(tips, breakdown, top_n)
+
+
+def test_index_lookups_keep_catalogue_order():
+    tips = synthetic_tips(300)
+    advisor = EcoAdvisor(StaticRegistry(tips))
+    for cat in CATEGORIES:
+        assert advisor.get_by_category(cat) == [t for t in tips if t["category"] == cat]
+    assert advisor.get_by_tag("tag1") == [t for t in tips if "tag1" in t["tags"]]
+    assert advisor.get_by_tag("missing") == []
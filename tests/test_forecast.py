@@ -0,0 +1,91 @@
+"""
+POST /predict/forecast: the hourly curve equals row-by-row batch predictions,
+daily totals match a plain per-day loop, and horizons past
+FORECAST_STREAM_HOURS stream exactly the JSON the in-memory path returns.
+"""
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.main import app, stream_forecast, summarize_days
+
+
+def weather(hours: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    return {
+        "start_hour": 5,
+        "temperature": np.round(rng.uniform(5, 40, hours), 1).tolist(),
+        "humidity": np.round(rng.uniform(20, 90, hours), 1).tolist(),
+    }
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def test_summarize_days_matches_per_day_loop():
+    curve = np.random.default_rng(1).uniform(0.5, 3.0, 61)
+    start_hour = 19
+    days = summarize_days(curve, start_hour)
+
+    clock = start_hour + np.arange(len(curve))
+    assert [d["day"] for d in days] == list(range(int(clock[-1] // 24) + 1))
+    for d in days:
+        values = curve[clock // 24 == d["day"]]
+        hours = clock[clock // 24 == d["day"]] % 24
+        assert d["hours"] == len(values)
+        assert d["total_kwh"] == round(float(values.sum()), 4)
+        assert d["peak_hour"] == hours[values.argmax()]
+        assert d["peak_kwh"] == round(float(values.max()), 4)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 4096])
+def test_stream_forecast_yields_the_same_json(chunk_size):
+    body = {"predictions": [1.25, 0.1 + 0.2, 3.0, 12.3456], "daily": [], "start_hour": 0, "hours": 4,
+            "total_kwh": 16.9, "unit": "kWh", "model_version": "v1"}
+    expected = json.loads(json.dumps(body))
+    streamed = "".join(stream_forecast(dict(body), chunk_size=chunk_size))
+    assert json.loads(streamed) == expected
+
+
+def test_forecast_curve_matches_batch_predictions(client):
+    request = weather(50)
+    response = client.post("/predict/forecast", json=request)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["hours"] == 50 and body["start_hour"] == 5
+
+    rows = [{"temperature": t, "humidity": h, "hour": (5 + i) % 24}
+            for i, (t, h) in enumerate(zip(request["temperature"], request["humidity"]))]
+    batch = client.post("/predict/batch", json={"rows": rows}).json()
+    assert body["predictions"] == batch["predictions"]
+    assert sum(d["hours"] for d in body["daily"]) == 50
+    assert body["total_kwh"] == pytest.approx(sum(body["predictions"]), abs=1e-3)
+
+
+def test_long_forecast_streams_the_in_memory_body(client, monkeypatch):
+    request = weather(24 * 5, seed=2)
+    in_memory = client.post("/predict/forecast", json=request)
+    assert in_memory.status_code == 200
+
+    monkeypatch.setattr(main, "FORECAST_STREAM_HOURS", 24)
+    streamed = client.post("/predict/forecast", json=request)
+    assert streamed.status_code == 200
+    assert "content-length" not in streamed.headers       # chunked, not built in one piece
+    assert streamed.json() == in_memory.json()
+
+
+def test_forecast_over_the_limit_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_FORECAST_HOURS", 48)
+    response = client.post("/predict/forecast", json=weather(49))
+    assert response.status_code == 413
+
+
+def test_forecast_rejects_mismatched_series(client):
+    request = weather(10)
+    request["humidity"] = request["humidity"][:-1]
+    assert client.post("/predict/forecast", json=request).status_code == 422
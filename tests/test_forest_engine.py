@@ -0,0 +1,83 @@
+"""
+ForestEngine parity with scikit-learn's RandomForestRegressor.predict, for the
+batch and single-row paths, and across a save/load round trip of the .npy
+artifact. Needs scikit-learn (a training-time dependency only).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ensemble = pytest.importorskip("sklearn.ensemble")
+
+from models.forest_engine import BLOCK_ROWS, ForestEngine
+from models.model_registry import ModelRegistry
+from models.train import FEATURES, TARGET
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOLERANCE = 1e-9
+
+
+@pytest.fixture(scope="module")
+def data():
+    df = pd.read_csv(os.path.join(ROOT, "data", "energy_data.csv"))
+    return df[FEATURES], df[TARGET]
+
+
+@pytest.fixture(scope="module")
+def forest(data):
+    X, y = data
+    return ensemble.RandomForestRegressor(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+
+
+@pytest.fixture(scope="module")
+def rows():
+    """Random rows over the PredictRequest ranges, enough for several traversal blocks."""
+    rng = np.random.default_rng(0)
+    n = 3 * BLOCK_ROWS + 17
+    return pd.DataFrame({
+        "temperature": rng.uniform(0, 60, n),
+        "humidity": rng.uniform(0, 100, n),
+        "hour": rng.integers(0, 24, n).astype(float),
+    })
+
+
+def assert_parity(engine: ForestEngine, model, rows: pd.DataFrame):
+    expected = model.predict(rows)
+    X = rows.to_numpy()
+    np.testing.assert_allclose(engine.predict(X), expected, rtol=0, atol=TOLERANCE)
+    single = np.array([engine.predict_one(row) for row in X[:200]])
+    np.testing.assert_allclose(single, expected[:200], rtol=0, atol=TOLERANCE)
+    np.testing.assert_allclose(engine.predict(X[:1]), expected[:1], rtol=0, atol=TOLERANCE)
+
+
+def test_batch_and_single_row_match_sklearn(forest, rows):
+    assert_parity(ForestEngine.from_sklearn(forest), forest, rows)
+
+
+def test_training_rows_match_sklearn(forest, data):
+    # Split thresholds are midpoints between training values, so these rows test the float32 rounding.
+    X, _ = data
+    assert_parity(ForestEngine.from_sklearn(forest), forest, X)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_artifact_round_trip(forest, rows, tmp_path, mmap):
+    engine = ForestEngine.from_sklearn(forest)
+    engine.save(str(tmp_path))
+    loaded = ForestEngine.load(str(tmp_path), mmap=mmap)
+    assert loaded.n_trees == engine.n_trees
+    assert loaded.max_depth == engine.max_depth
+    assert loaded.feature_names == FEATURES
+    for name in ("feature", "threshold", "left", "right", "value", "roots"):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(engine, name))
+    assert_parity(loaded, forest, rows)
+
+
+def test_shipped_artifact_matches_pickle(rows):
+    joblib = pytest.importorskip("joblib")
+    model = joblib.load(os.path.join(ROOT, "models", "energy_model.pkl"))
+    _, engine = ModelRegistry(os.path.join(ROOT, "models", "energy_model"), check_interval=3600).get()
+    assert engine is not None
+    assert_parity(engine, model, rows)
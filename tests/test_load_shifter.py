@@ -0,0 +1,136 @@
+"""
+Load shifting: objective="total" is optimal, objective="peak" matches a
+brute-force search on small cases, the time budget bounds the greedy
+placement too (unreached loads get their least-baseline start), and the
+route rejects too many loads or windows that cannot hold them.
+"""
+import itertools
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api import main
+from api.main import app
+from models import load_shifter
+from models.load_shifter import add_loads, load_bounds, schedule
+
+
+def baseline_curve(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 1.0 + np.sin(np.arange(n) * 2 * np.pi / 24) + rng.uniform(0, 0.5, n)
+
+
+def random_loads(n: int, hours: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    loads = []
+    for i in range(n):
+        duration = int(rng.integers(1, 4))
+        earliest = int(rng.integers(0, hours - duration))
+        latest = int(rng.integers(earliest + duration, hours + 1))
+        loads.append({"name": f"load{i}", "power_kw": float(rng.uniform(0.5, 3)), "duration_hours": duration,
+                      "earliest_start": earliest, "latest_end": latest})
+    return loads
+
+
+def all_placements(loads: list, n_hours: int):
+    first, last, durations, powers = load_bounds(loads, n_hours)
+    for starts in itertools.product(*(range(a, b + 1) for a, b in zip(first.tolist(), last.tolist()))):
+        yield np.array(starts), durations, powers
+
+
+@pytest.mark.parametrize("load, message", [
+    ({"power_kw": 1, "duration_hours": 0}, "positive"),
+    ({"power_kw": 0, "duration_hours": 1}, "positive"),
+    ({"power_kw": 1, "duration_hours": 2, "latest_end": 25}, "beyond"),
+    ({"power_kw": 1, "duration_hours": 3, "earliest_start": 10, "latest_end": 12}, "does not fit"),
+])
+def test_load_bounds_reject_impossible_windows(load, message):
+    with pytest.raises(ValueError, match=message):
+        load_bounds([{"name": "x", **load}], 24)
+
+
+def test_total_objective_is_optimal_per_load():
+    baseline = baseline_curve(48)
+    loads = random_loads(6, 48)
+    result = schedule(baseline, loads, "total")
+    cumulative = np.concatenate(([0.0], np.cumsum(baseline)))
+    first, last, durations, _ = load_bounds(loads, 48)
+    for i in range(len(loads)):
+        windows = [cumulative[s + durations[i]] - cumulative[s] for s in range(first[i], last[i] + 1)]
+        assert result["overlap_kwh"][i] == pytest.approx(min(windows))
+    assert result["converged"] and result["passes"] == 0
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_peak_objective_matches_brute_force_on_small_cases(seed):
+    baseline = baseline_curve(12, seed)
+    loads = random_loads(3, 12, seed)
+    result = schedule(baseline, loads, "peak", time_budget_s=10)
+    best = min(add_loads(baseline, *placement).max() for placement in all_placements(loads, 12))
+    assert result["converged"]
+    assert result["curve"].max() == pytest.approx(best)
+
+
+def test_add_loads_matches_a_direct_sum():
+    baseline = baseline_curve(24)
+    loads = random_loads(5, 24, seed=3)
+    first, _, durations, powers = load_bounds(loads, 24)
+    expected = baseline.copy()
+    for s, d, p in zip(first, durations, powers):
+        expected[s:s + d] += p
+    np.testing.assert_allclose(add_loads(baseline, first, durations, powers), expected)
+
+
+def test_exhausted_budget_places_every_load_at_its_least_baseline_start():
+    baseline = baseline_curve(24 * 14)
+    loads = random_loads(50, 24 * 14, seed=5)
+    result = schedule(baseline, loads, "peak", time_budget_s=0)
+    first, last, durations, _ = load_bounds(loads, len(baseline))
+    assert not result["converged"] and result["passes"] == 0
+    assert ((result["starts"] >= first) & (result["starts"] <= last)).all()
+    np.testing.assert_array_equal(result["starts"], load_shifter._place_total(baseline, first, last, durations))
+
+
+def test_budget_running_out_mid_greedy_keeps_placed_loads(monkeypatch):
+    baseline = baseline_curve(48)
+    loads = random_loads(8, 48, seed=6)
+    ticks = itertools.count()
+    monkeypatch.setattr(load_shifter.time, "perf_counter", lambda: next(ticks))     # one tick per check
+    result = schedule(baseline, loads, "peak", time_budget_s=4)
+    assert not result["converged"] and result["passes"] == 0
+    first, last, _, _ = load_bounds(loads, 48)
+    assert ((result["starts"] >= first) & (result["starts"] <= last)).all()
+
+
+# ── Route ────────────────────────────────────────────────────────────────────
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def request_body(loads: list, hours: int = 24) -> dict:
+    return {"start_hour": 0, "temperature": [20.0] * hours, "humidity": [50.0] * hours, "loads": loads}
+
+
+def test_route_rejects_too_many_loads(client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_SCHEDULE_LOADS", 2)
+    loads = [{"name": f"l{i}", "power_kw": 1, "duration_hours": 1} for i in range(3)]
+    assert client.post("/predict/schedule", json=request_body(loads)).status_code == 413
+
+
+def test_route_rejects_windows_that_cannot_hold_a_load(client):
+    loads = [{"name": "ev", "power_kw": 7, "duration_hours": 4, "earliest_start": 20, "latest_end": 22}]
+    response = client.post("/predict/schedule", json=request_body(loads))
+    assert response.status_code == 422 and "does not fit" in response.json()["detail"]
+
+
+def test_route_schedules_within_windows(client):
+    loads = [{"name": "dishwasher", "power_kw": 1.2, "duration_hours": 2, "latest_end": 14},
+             {"name": "ev", "power_kw": 7, "duration_hours": 4, "earliest_start": 2, "latest_end": 14}]
+    response = client.post("/predict/schedule", json=request_body(loads))
+    assert response.status_code == 200
+    body = response.json()
+    for load, placed in zip(loads, body["schedule"]):
+        assert load.get("earliest_start", 0) <= placed["start"] and placed["end"] <= load["latest_end"]
+    assert body["peak_kwh"] <= body["unshifted_peak_kwh"] + 1e-4
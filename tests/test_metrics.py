@@ -0,0 +1,104 @@
+"""
+Prometheus /metrics: series are labelled by route template (with the /api
+prefix, never the query string or a raw unknown path), requests are split
+into stages, errors are counted by kind, and the text format is well formed.
+"""
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.metrics import Counter, Histogram
+
+LINE = re.compile(r'^(?P<name>[a-z_]+)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def scrape(client) -> dict:
+    """{(name, frozenset(labels)): value} for every sample line."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.text.splitlines():
+        if line.startswith("#"):
+            continue
+        match = LINE.match(line)
+        assert match, f"malformed sample line: {line!r}"
+        labels = frozenset(LABEL.findall(match.group("labels") or ""))
+        samples[(match.group("name"), labels)] = float(match.group("value"))
+    return samples
+
+
+def value(samples: dict, name: str, **labels) -> float:
+    return samples.get((name, frozenset(labels.items())), 0.0)
+
+
+def requests_seen(samples: dict, method: str, route: str, status: int) -> float:
+    return value(samples, "greenmind_http_request_duration_seconds_count", method=method, route=route, status=str(status))
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def test_routes_are_labelled_by_template(client):
+    before = scrape(client)
+    assert client.get("/api/tips", params={"category": "energy", "limit": 2}).status_code == 200
+    assert client.post("/predict", json={"temperature": 22.0, "humidity": 55.0, "hour": 9}).status_code == 200
+    assert client.get("/no/such/route?x=1").status_code == 404
+    after = scrape(client)
+
+    assert requests_seen(after, "GET", "/api/tips", 200) == requests_seen(before, "GET", "/api/tips", 200) + 1
+    assert requests_seen(after, "POST", "/predict", 200) == requests_seen(before, "POST", "/predict", 200) + 1
+    assert requests_seen(after, "GET", "unmatched", 404) == requests_seen(before, "GET", "unmatched", 404) + 1
+    routes = {dict(labels).get("route") for _, labels in after}
+    assert not any(r and ("?" in r or r.startswith("/no/")) for r in routes)
+
+
+def test_request_stages_are_timed(client):
+    before = scrape(client)
+    client.post("/predict", json={"temperature": 22.0, "humidity": 55.0, "hour": 9})
+    after = scrape(client)
+    for stage in ("validation", "handler", "serialization", "inference"):
+        name = "greenmind_stage_duration_seconds_count"
+        assert value(after, name, route="/predict", stage=stage) >= value(before, name, route="/predict", stage=stage) + 1
+
+
+def test_validation_errors_are_counted(client):
+    before = scrape(client)
+    assert client.post("/predict", json={"temperature": "hot", "humidity": 55.0, "hour": 9}).status_code == 422
+    after = scrape(client)
+    kind = {"route": "/predict", "kind": "validation"}
+    assert value(after, "greenmind_errors_total", **kind) == value(before, "greenmind_errors_total", **kind) + 1
+    # Requests that never reach the endpoint are all validation time.
+    name = "greenmind_stage_duration_seconds_count"
+    assert value(after, name, route="/predict", stage="validation") == \
+        value(before, name, route="/predict", stage="validation") + 1
+    assert value(after, name, route="/predict", stage="handler") == value(before, name, route="/predict", stage="handler")
+
+
+def test_model_info_reports_the_active_version(client):
+    client.post("/predict", json={"temperature": 22.0, "humidity": 55.0, "hour": 9})
+    versions = [dict(labels)["version"] for name, labels in scrape(client) if name == "greenmind_model_info"]
+    assert len(versions) == 1 and versions[0]
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("h_seconds", "help", ("route",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(v, "/x")
+    lines = histogram.render()
+    assert 'h_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'h_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 'h_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'h_seconds_count{route="/x"} 4' in lines
+    assert 'h_seconds_sum{route="/x"} 4.25' in lines
+
+
+def test_label_values_are_escaped():
+    counter = Counter("c_total", "help", ("kind",))
+    counter.inc('a"b\\c\nd')
+    assert counter.render()[-1] == 'c_total{kind="a\\"b\\\\c\\nd"} 1'
@@ -0,0 +1,92 @@
+"""
+Micro-batching: every caller gets the prediction for its own row whatever
+order rows arrive and batches finish in, full batches flush at once, and a
+failing batch fails only its own callers.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from api.microbatch import MicroBatcher
+
+
+class SumEngine:
+    """Predicts the row sum; records every batch it is asked about."""
+
+    def __init__(self, fail_on: float = None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        self.batches.append(features.copy())
+        if self.fail_on is not None and (features[:, 0] == self.fail_on).any():
+            raise ValueError("bad row")
+        return features.sum(axis=1)
+
+
+def rows(n: int, offset: int = 0) -> list:
+    return [[float(offset + i), float(i % 7), float(i % 24)] for i in range(n)]
+
+
+async def gather_shuffled(batcher: MicroBatcher, batch: list, seed: int = 0):
+    """Submit rows from concurrent tasks started in a random order."""
+    order = np.random.default_rng(seed).permutation(len(batch))
+    tasks = {int(i): asyncio.ensure_future(batcher.predict(batch[i])) for i in order}
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    return [tasks[i] for i in range(len(batch))]
+
+
+def test_each_caller_gets_its_own_prediction():
+    engine = SumEngine()
+    batcher = MicroBatcher(lambda: ("v7", engine), window_ms=1.0, max_size=16)
+    batch = rows(100)
+    tasks = asyncio.run(gather_shuffled(batcher, batch))
+    assert [t.result() for t in tasks] == [("v7", sum(row)) for row in batch]
+    assert sum(len(b) for b in engine.batches) == 100
+    assert max(len(b) for b in engine.batches) <= 16
+
+
+def test_full_batch_flushes_without_waiting_for_the_window():
+    engine = SumEngine()
+    batcher = MicroBatcher(lambda: ("v1", engine), window_ms=60_000, max_size=8)
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.predict(r) for r in rows(8))), timeout=5)
+
+    assert [p for _, p in asyncio.run(run())] == [sum(r) for r in rows(8)]
+    assert [len(b) for b in engine.batches] == [8]
+
+
+def test_window_collects_concurrent_rows_into_one_batch():
+    engine = SumEngine()
+    batcher = MicroBatcher(lambda: ("v1", engine), window_ms=20.0, max_size=256)
+    asyncio.run(gather_shuffled(batcher, rows(30)))
+    assert [len(b) for b in engine.batches] == [30]
+    stats = batcher.stats()
+    assert stats["batches"] == 1 and stats["requests"] == 30
+    assert stats["queue_depth"] == 0 and stats["batches_in_flight"] == 0
+    assert stats["batch_size_histogram"]["le_32"] == 1
+
+
+def test_failing_batch_only_fails_its_callers():
+    engine = SumEngine(fail_on=1000.0)
+    batcher = MicroBatcher(lambda: ("v1", engine), window_ms=5.0, max_size=4)
+    batch = rows(4, offset=1000) + rows(4, offset=2000)   # two full batches; the first one fails
+
+    async def run():
+        return await asyncio.gather(*(batcher.predict(r) for r in batch), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results[:4])
+    assert results[4:] == [("v1", sum(r)) for r in batch[4:]]
+
+
+def test_missing_model_fails_the_batch():
+    batcher = MicroBatcher(lambda: (None, None), window_ms=1.0)
+
+    async def run():
+        return await batcher.predict([20.0, 50.0, 3.0])
+
+    with pytest.raises(RuntimeError, match="not loaded"):
+        asyncio.run(run())
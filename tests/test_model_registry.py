@@ -0,0 +1,84 @@
+"""
+Model registry: publish/activate repoint CURRENT, get() loads on first use
+while active() never does, and async routes never run that first,
+synchronous load on the event loop.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestRegressor
+
+from api import main
+from models.forest_engine import ForestEngine
+from models.model_registry import ModelRegistry, activate, current_version, publish
+
+ROW = {"temperature": 25.0, "humidity": 60.0, "hour": 14}
+
+
+def small_engine(seed: int) -> ForestEngine:
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 40, (200, 3))
+    model = RandomForestRegressor(n_estimators=3, max_depth=4, random_state=seed).fit(X, X[:, 0] * 0.1 + seed)
+    return ForestEngine.from_sklearn(model)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Fresh registry on an empty root, installed as the app's; records where each load ran."""
+    registry = ModelRegistry(str(tmp_path), check_interval=60)
+    refresh = registry.refresh
+    on_loop = []
+
+    def recording_refresh():
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return refresh()
+
+    monkeypatch.setattr(registry, "refresh", recording_refresh)
+    monkeypatch.setattr(main, "models", registry)
+    return registry, on_loop
+
+
+def test_publish_and_activate_repoint_current(tmp_path):
+    root = str(tmp_path)
+    assert current_version(root) is None
+    assert publish(small_engine(0), root) == "v1"
+    assert publish(small_engine(1), root) == "v2"
+    assert current_version(root) == "v2"
+    activate(root, "v1")
+    assert current_version(root) == "v1"
+    with pytest.raises(FileNotFoundError):
+        activate(root, "v9")
+
+
+def test_get_loads_on_first_use_but_active_does_not(tmp_path):
+    publish(small_engine(0), str(tmp_path))
+    registry = ModelRegistry(str(tmp_path), check_interval=60)
+    assert registry.active() == (None, None)
+    version, engine = registry.get()
+    assert version == "v1" and engine is not None
+    assert registry.active() == (version, engine)
+
+
+def test_async_predict_loads_off_the_event_loop(registry, tmp_path):
+    registry, on_loop = registry
+    publish(small_engine(0), str(tmp_path))
+    response = TestClient(main.app).post("/predict", json=ROW)
+    assert response.status_code == 200
+    assert response.json()["model_version"] == "v1"
+    assert on_loop and not any(on_loop)
+
+
+def test_async_routes_answer_503_without_a_model(registry):
+    registry, on_loop = registry
+    client = TestClient(main.app)
+    assert client.post("/predict", json=ROW).status_code == 503
+    body = np.zeros((1, 3)).tobytes()
+    response = client.post("/predict/batch/binary", content=body, headers={"content-type": "application/x-npy"})
+    assert response.status_code == 503
+    assert on_loop and not any(on_loop)
@@ -0,0 +1,112 @@
+"""
+Out-of-core training: the columnar cache round-trips the CSV and is reused
+while the source is unchanged, row sampling respects the split, and the
+block-wise R² equals sklearn's r2_score on the same test rows.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import r2_score
+
+from models.out_of_core import (
+    FEATURE_DTYPE, MANIFEST_NAME, SPLIT_COLUMN, build_cache, evaluate_streaming, sample_rows, train_out_of_core,
+)
+
+FEATURES = ["temperature", "humidity", "hour"]
+TARGET = "energy_usage"
+
+
+def write_csv(path, rows: int, seed: int = 0, constant_target: bool = False):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "temperature": rng.uniform(0, 40, rows).round(2),
+        "humidity": rng.uniform(10, 95, rows).round(2),
+        "hour": rng.integers(0, 24, rows),
+    })
+    df[TARGET] = 2.5 if constant_target else 0.05 * df.temperature + 0.01 * df.humidity + 0.1 * (df.hour % 7)
+    df.to_csv(path, index=False)
+    return pd.read_csv(path)      # the values as the CSV stores them
+
+
+class MeanModel:
+    """Predicts a constant; enough to exercise the R² bookkeeping."""
+
+    def __init__(self, value: float):
+        self.value = value
+
+    def predict(self, X):
+        return np.full(len(X), self.value)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    csv = tmp_path / "energy.csv"
+    df = write_csv(csv, 5000)
+    cache = build_cache(str(csv), str(tmp_path / "cache"), FEATURES, TARGET, chunk_size=700, test_size=0.25)
+    return csv, df, cache
+
+
+def test_cache_round_trips_the_csv(dataset):
+    _, df, cache = dataset
+    assert cache.rows == len(df)
+    for name in FEATURES:
+        np.testing.assert_array_equal(cache.columns[name], df[name].to_numpy(FEATURE_DTYPE))
+    np.testing.assert_array_equal(cache.columns[TARGET], df[TARGET].to_numpy())
+    share = np.asarray(cache.columns[SPLIT_COLUMN]).mean()
+    assert 0.2 < share < 0.3
+
+
+def test_cache_is_reused_until_the_source_changes(dataset, tmp_path):
+    csv, _, cache = dataset
+    manifest = os.path.join(cache.directory, MANIFEST_NAME)
+    written = os.stat(manifest).st_mtime_ns
+    again = build_cache(str(csv), cache.directory, FEATURES, TARGET, chunk_size=700, test_size=0.25)
+    assert os.stat(manifest).st_mtime_ns == written
+    assert again.rows == cache.rows
+
+    write_csv(csv, 3000, seed=1)
+    rebuilt = build_cache(str(csv), cache.directory, FEATURES, TARGET, chunk_size=700, test_size=0.25)
+    assert rebuilt.rows == 3000
+
+
+def test_sample_rows_respects_the_split(dataset):
+    _, _, cache = dataset
+    flags = np.asarray(cache.columns[SPLIT_COLUMN])
+    rng = np.random.default_rng(3)
+    for split in (0, 1):
+        index = sample_rows(cache, split, 500, rng)
+        assert len(index) <= 500
+        assert np.all(np.diff(index) > 0)
+        assert np.all(flags[index] == split)
+    assert np.array_equal(sample_rows(cache, 1, 10**9, rng), np.flatnonzero(flags == 1))
+
+
+@pytest.mark.parametrize("block_rows", [97, 1000, 1_000_000])
+def test_streaming_r2_matches_sklearn(dataset, block_rows):
+    _, df, cache = dataset
+    model = train_out_of_core(cache, n_estimators=6, subsample_rows=2000, workers=1, params={"max_depth": 6})
+    assert model.n_estimators == len(model.estimators_) == 6
+
+    r2, test_rows, X_sample = evaluate_streaming(model, cache, block_rows=block_rows)
+    test = np.asarray(cache.columns[SPLIT_COLUMN]) == 1
+    X = df.loc[test, FEATURES].to_numpy(FEATURE_DTYPE).astype(np.float64)
+    assert test_rows == int(test.sum())
+    assert r2 == pytest.approx(r2_score(df.loc[test, TARGET], model.predict(X)), abs=1e-9)
+    np.testing.assert_array_equal(X_sample, X[:len(X_sample)])
+
+
+def test_streaming_r2_for_a_constant_target(tmp_path):
+    csv = tmp_path / "flat.csv"
+    write_csv(csv, 400, constant_target=True)
+    cache = build_cache(str(csv), str(tmp_path / "cache"), FEATURES, TARGET, chunk_size=100)
+    assert evaluate_streaming(MeanModel(2.5), cache, block_rows=50)[0] == 1.0
+    assert evaluate_streaming(MeanModel(3.0), cache, block_rows=50)[0] == 0.0
+
+
+def test_missing_columns_are_reported(tmp_path):
+    csv = tmp_path / "partial.csv"
+    pd.DataFrame({"temperature": [1.0], "hour": [2]}).to_csv(csv, index=False)
+    with pytest.raises(ValueError, match="missing required columns"):
+        build_cache(str(csv), str(tmp_path / "cache"), FEATURES, TARGET)
@@ -0,0 +1,187 @@
+"""
+Cohort percentile sketches: t-digest ranks track exact quantiles, merged
+digests match one digest of the union, and files of exited workers (or a
+reused pid, or a claimer that died mid-claim) are absorbed exactly once.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from models.percentile_sketch import CohortRanks, TDigest, _process_stamp
+
+QUANTILES = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+def digest_of(values) -> TDigest:
+    digest = TDigest()
+    for value in values:
+        digest.add(float(value))
+    return digest
+
+
+def cohorts_of(values, cohort: str = "acme") -> dict:
+    return {cohort: {"total": digest_of(values).to_dict()}}
+
+
+def write_sketch(directory, name: str, pid: int, values, stamp: str = "", absorbed=()):
+    with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+        json.dump({"pid": pid, "stamp": stamp, "absorbed": list(absorbed), "cohorts": cohorts_of(values)}, f)
+
+
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def live_process():
+    """A running process that is not a sketch worker: its pid is alive, its stamp is its own."""
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    yield process.pid
+    process.kill()
+    process.wait()
+
+
+@pytest.fixture
+def ranks(tmp_path):
+    """CohortRanks whose sync is driven by the test (no background thread)."""
+    return CohortRanks(str(tmp_path), interval=3600)
+
+
+def local_count(ranks, cohort: str = "acme") -> float:
+    digests = ranks._local.get(cohort)
+    return digests["total"].count if digests else 0
+
+
+def files(directory) -> list:
+    return sorted(os.listdir(directory))
+
+
+# ── TDigest ──────────────────────────────────────────────────────────────────
+def test_cdf_tracks_exact_quantiles():
+    values = np.random.default_rng(0).lognormal(8.5, 0.6, 20_000)
+    digest = digest_of(values)
+    assert digest.count == len(values)
+    assert len(digest.means) <= 2 * digest.compression
+    for q in QUANTILES:
+        assert digest.cdf(float(np.quantile(values, q))) == pytest.approx(q, abs=0.01)
+    assert digest.cdf(values.min() - 1) == 0.0 and digest.cdf(values.max() + 1) == 1.0
+
+
+def test_merge_matches_a_digest_of_the_union():
+    rng = np.random.default_rng(1)
+    a, b = rng.normal(5000, 800, 7000), rng.normal(9000, 1500, 3000)
+    merged = digest_of(a)
+    merged.merge(digest_of(b))
+    union = np.concatenate([a, b])
+    assert merged.count == len(union)
+    assert (merged.min, merged.max) == (union.min(), union.max())
+    for q in QUANTILES:
+        assert merged.cdf(float(np.quantile(union, q))) == pytest.approx(q, abs=0.01)
+
+
+def test_dict_round_trip_keeps_ranks():
+    digest = digest_of(np.random.default_rng(2).exponential(3000, 5000))
+    copy = TDigest.from_dict(json.loads(json.dumps(digest.to_dict())))
+    for value in (10.0, 1500.0, 3000.0, 12000.0):
+        assert copy.cdf(value) == pytest.approx(digest.cdf(value), abs=1e-12)
+
+
+# ── CohortRanks ──────────────────────────────────────────────────────────────
+def test_ranks_and_cohort_limit(tmp_path):
+    ranks = CohortRanks(str(tmp_path), interval=3600, max_cohorts=2)
+    try:
+        results = [ranks.observe_and_rank("a", float(v), {"diet": v / 2}) for v in range(1, 101)]
+        assert results[-1]["count"] == 100 and results[-1]["cohort"] == "a"
+        assert results[-1]["total"] == pytest.approx(99.5, abs=0.5)
+        middle = ranks.observe_and_rank("a", 50.5, {"diet": 25.25})
+        assert middle["total"] == pytest.approx(50, abs=1)
+        assert middle["breakdown"]["diet"] == pytest.approx(50, abs=1)
+        assert ranks.observe_and_rank(None, 1.0, {})["cohort"] == "global"
+        assert ranks.observe_and_rank("c", 1.0, {}) is None        # third cohort: not tracked
+    finally:
+        ranks.close()
+    with open(tmp_path / f"sketch-{os.getpid()}.json", encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["stamp"] == _process_stamp(os.getpid())
+    assert data["cohorts"]["a"]["total"]["count"] == 101
+
+
+def test_exited_worker_file_is_claimed_once(ranks, tmp_path):
+    pid = dead_pid()
+    write_sketch(tmp_path, f"sketch-{pid}.json", pid, range(100))
+    ranks._sync(os.getpid())
+    assert local_count(ranks) == 100
+    assert files(tmp_path) == [f"sketch-{os.getpid()}.json"]
+    ranks._sync(os.getpid())
+    assert local_count(ranks) == 100
+
+
+def test_live_worker_file_is_read_not_claimed(ranks, tmp_path, live_process):
+    name = f"sketch-{live_process}.json"
+    write_sketch(tmp_path, name, live_process, range(40), stamp=_process_stamp(live_process))
+    ranks._sync(os.getpid())
+    assert local_count(ranks) == 0
+    assert ranks._others["acme"]["total"].count == 40
+    assert name in files(tmp_path)
+
+
+@pytest.mark.skipif(not _process_stamp(os.getpid()), reason="needs /proc process stamps")
+def test_reused_pid_does_not_keep_a_file_alive(ranks, tmp_path, live_process):
+    write_sketch(tmp_path, f"sketch-{live_process}.json", live_process, range(30), stamp="000000000000.1")
+    ranks._sync(os.getpid())
+    assert local_count(ranks) == 30
+    assert files(tmp_path) == [f"sketch-{os.getpid()}.json"]
+
+
+def test_claimed_file_of_a_dead_claimer_is_recovered(ranks, tmp_path):
+    claimer, worker = dead_pid(), dead_pid()
+    write_sketch(tmp_path, f"claimed-{claimer}-abc.1-sketch-{worker}.json", worker, range(25))
+    write_sketch(tmp_path, f"claimed-{claimer}-sketch-{worker + 1}.json", worker + 1, range(5))   # older naming
+    ranks._sync(os.getpid())
+    assert local_count(ranks) == 30
+    assert files(tmp_path) == [f"sketch-{os.getpid()}.json"]
+
+
+def test_absorbed_claimed_file_is_deleted_not_merged(ranks, tmp_path, live_process):
+    claimer = dead_pid()
+    orphan = f"claimed-{claimer}-abc.1-sketch-{dead_pid()}.json"
+    write_sketch(tmp_path, orphan, 0, range(25))
+    # The claimer persisted into a file that another worker has since taken over.
+    write_sketch(tmp_path, f"sketch-{live_process}.json", live_process, range(25),
+                 stamp=_process_stamp(live_process), absorbed=[orphan])
+    ranks._sync(os.getpid())
+    assert local_count(ranks) == 0
+    assert orphan not in files(tmp_path)
+
+
+def test_inherited_marks_cover_the_claimed_file_of_a_dead_claimer(ranks, tmp_path):
+    claimer = dead_pid()
+    orphan = f"claimed-{claimer}-abc.1-sketch-{dead_pid()}.json"
+    write_sketch(tmp_path, orphan, 0, range(25))
+    write_sketch(tmp_path, f"sketch-{claimer}.json", claimer, range(60), absorbed=[orphan])
+    ranks._sync(os.getpid())
+    assert local_count(ranks) == 60          # the claimer's file already holds the orphan's 25
+    assert files(tmp_path) == [f"sketch-{os.getpid()}.json"]
+
+
+def test_file_being_claimed_by_a_live_worker_is_left_alone(ranks, tmp_path, live_process):
+    name = f"claimed-{live_process}-{_process_stamp(live_process)}-sketch-{dead_pid()}.json"
+    write_sketch(tmp_path, name, 0, range(10))
+    ranks._sync(os.getpid())
+    assert local_count(ranks) == 0
+    assert name in files(tmp_path)
+
+
+def test_failed_persist_hands_the_file_back(ranks, tmp_path, monkeypatch):
+    pid = dead_pid()
+    write_sketch(tmp_path, f"sketch-{pid}.json", pid, range(10))
+    monkeypatch.setattr(ranks, "_persist", lambda *args, **kwargs: False)
+    ranks._sync(os.getpid())
+    assert local_count(ranks) == 0
+    assert files(tmp_path) == [f"sketch-{pid}.json"]
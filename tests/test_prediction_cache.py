@@ -0,0 +1,131 @@
+"""
+/predict cache: inputs are keyed on their rounded cell, the LRU evicts its
+oldest entry and is cleared when the active model version changes, and the
+optional grid is built for one version, skipped above its cell limit and
+reported in stats().
+"""
+import numpy as np
+import pytest
+
+from api.prediction_cache import PredictionCache
+
+
+class SumModel:
+    """Predicts temperature + humidity + hour, so every cell has a known answer."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+
+    def predict(self, X):
+        if self.fail:
+            raise RuntimeError("no predictions today")
+        return np.asarray(X, dtype=np.float64).sum(axis=1)
+
+
+class Models:
+    def __init__(self, version="v1", engine=None):
+        self.version, self.engine = version, engine or SumModel()
+
+    def active(self):
+        return self.version, self.engine
+
+
+@pytest.fixture
+def models():
+    return Models()
+
+
+def coarse(models, **kwargs) -> PredictionCache:
+    """121 × 101 × 24 = 293k cells: under the default grid limit."""
+    return PredictionCache(models.active, temperature_step=0.5, humidity_step=1.0, **kwargs)
+
+
+@pytest.mark.parametrize("row, key", [
+    ((21.04, 50.2, 9), (210, 100, 9)),
+    ((21.06, 50.3, 9), (211, 101, 9)),
+    ((0.0, 0.0, 0), (0, 0, 0)),
+    ((60.0, 100.0, 23), (600, 200, 23)),
+])
+def test_rows_are_keyed_on_their_rounded_cell(models, row, key):
+    cache = PredictionCache(models.active)
+    assert cache.key(row) == key
+    assert cache.features(key) == pytest.approx([key[0] * 0.1, key[1] * 0.5, key[2]])
+
+
+def test_nearby_readings_share_an_entry(models):
+    cache = PredictionCache(models.active)
+    key = cache.key((21.04, 50.2, 9))
+    assert cache.get(key) is None
+    cache.put("v1", key, 1.5)
+    assert cache.get(cache.key((20.98, 49.9, 9))) == ("v1", 1.5)
+    assert cache.get(cache.key((21.06, 49.9, 9))) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_lru_evicts_the_least_recently_used(models):
+    cache = PredictionCache(models.active, max_entries=2)
+    a, b, c = (1, 1, 1), (2, 2, 2), (3, 3, 3)
+    cache.get(a)
+    cache.put("v1", a, 1.0)
+    cache.put("v1", b, 2.0)
+    assert cache.get(a) == ("v1", 1.0)          # a is now the most recent
+    cache.put("v1", c, 3.0)
+    assert cache.get(b) is None
+    assert cache.get(a) == ("v1", 1.0) and cache.get(c) == ("v1", 3.0)
+    assert cache.stats()["entries"] == 2 and cache.evictions == 1
+
+
+def test_version_change_clears_the_lru(models):
+    cache = PredictionCache(models.active)
+    key = (1, 1, 1)
+    cache.get(key)
+    cache.put("v1", key, 1.0)
+    models.version = "v2"
+    assert cache.get(key) is None
+    assert cache.invalidations == 1 and cache.stats()["entries"] == 0
+    cache.put("v1", key, 1.0)                   # a late result from the old model is dropped
+    assert cache.get(key) is None
+
+
+def test_grid_answers_every_cell_of_its_version(models):
+    cache = coarse(models)
+    assert cache.stats()["grid_status"] == "off"
+    cache.build_grid("v1", models.engine)
+    cache.wait_for_grid()
+    stats = cache.stats()
+    assert stats["grid_status"] == "ready"
+    assert stats["grid"]["cells"] == stats["grid_cells"] == 121 * 101 * 24
+    for row in ((0.0, 0.0, 0), (21.3, 55.4, 13), (60.0, 100.0, 23)):
+        key = cache.key(row)
+        assert cache.get(key) == ("v1", pytest.approx(sum(cache.features(key))))
+    assert cache.grid_hits == 3 and cache.misses == 0
+
+    models.version = "v2"
+    assert cache.stats()["grid_status"] == "stale"
+    assert cache.get(cache.key((21.3, 55.4, 13))) is None
+
+
+def test_grid_is_not_installed_for_a_replaced_version(models):
+    cache = coarse(models)
+    models.version = "v2"
+    cache.build_grid("v1", models.engine)
+    cache.wait_for_grid()
+    assert cache.stats()["grid"] is None
+
+
+def test_oversized_grid_is_skipped_and_reported(models, capsys):
+    cache = PredictionCache(models.active)       # 0.1 °C and 0.5 %: 2.9M cells
+    cache.build_grid("v1", models.engine)
+    cache.wait_for_grid()
+    stats = cache.stats()
+    assert stats["grid_status"] == "skipped" and stats["grid"] is None
+    assert stats["grid_cells"] == 601 * 201 * 24 > stats["max_grid_cells"]
+    assert "exceeds GREENMIND_PREDICTION_CACHE_MAX_GRID_CELLS" in capsys.readouterr().out
+
+
+def test_failed_grid_is_reported():
+    models = Models(engine=SumModel(fail=True))
+    cache = coarse(models)
+    cache.build_grid("v1", models.engine)
+    cache.wait_for_grid()
+    assert cache.stats()["grid_status"] == "failed"
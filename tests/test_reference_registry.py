@@ -0,0 +1,181 @@
+"""
+Hot reload of the reference-data registry under concurrent readers.
+
+A writer thread flips emissions_factors.json between two variants while
+reader threads estimate footprints, through a private ReferenceRegistry and
+through the /api/carbon-footprint route. Every result must come from exactly
+one snapshot, and per-snapshot derived tables must be built once per snapshot.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from data import registry as registry_module
+from data.registry import DATA_DIR, ECO_TIPS_FILE, EMISSIONS_FACTORS_FILE, ReferenceRegistry
+from models.carbon_estimator import CarbonEstimator
+
+READERS = 8
+SWAPS = 40
+PROFILE = {"transport_mode": "car_petrol", "km_per_week": 200, "diet_type": "meat_medium"}
+
+
+def variant(factors: dict, k: float) -> dict:
+    """Factors with the car, diet and global-average entries scaled by k (k=1: unchanged)."""
+    changed = json.loads(json.dumps(factors))
+    changed["transport"]["car_petrol_km"] *= k
+    changed["diet"]["meat_medium_daily_kg_co2"] *= k
+    changed["global_average_annual_kg"] *= k
+    return changed
+
+
+class FactorFlipper:
+    """Writes the two factor variants into a data directory, bumping mtime on every write."""
+
+    def __init__(self, data_dir: str):
+        self.path = os.path.join(data_dir, EMISSIONS_FACTORS_FILE)
+        with open(os.path.join(DATA_DIR, EMISSIONS_FACTORS_FILE), encoding="utf-8") as f:
+            base = json.load(f)
+        self.variants = [variant(base, 1.0), variant(base, 1.5)]
+        self.writes = 0
+
+    def write(self, i: int):
+        # Write next to the file and rename, as a deploy would; the registry
+        # must never see a half-written file either way.
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.variants[i], f)
+        self.writes += 1
+        os.utime(tmp, ns=(self.writes * 10**9, self.writes * 10**9))
+        os.replace(tmp, self.path)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    shutil.copy(os.path.join(DATA_DIR, ECO_TIPS_FILE), tmp_path / ECO_TIPS_FILE)
+    flipper = FactorFlipper(str(tmp_path))
+    flipper.write(0)
+    return tmp_path, flipper
+
+
+def expected_results(data_dir, flipper) -> set:
+    """(total, global average) for PROFILE under each variant, from a fresh registry."""
+    expected = set()
+    for i in range(2):
+        flipper.write(i)
+        result = CarbonEstimator(ReferenceRegistry(str(data_dir), check_interval=0)).estimate(PROFILE)
+        expected.add((result["total_kg_co2_year"], result["global_average_kg"]))
+    flipper.write(0)
+    assert len(expected) == 2
+    return expected
+
+
+def run_concurrently(read, flip, swaps: int = SWAPS):
+    """Run READERS threads calling read() until `swaps` flips are done; returns their results."""
+    done = threading.Event()
+    results = []
+
+    def reader():
+        seen = []
+        while not done.is_set():
+            seen.append(read())
+        seen.append(read())
+        return seen
+
+    with ThreadPoolExecutor(READERS) as pool:
+        futures = [pool.submit(reader) for _ in range(READERS)]
+        try:
+            for n in range(swaps):
+                flip(n % 2)
+                time.sleep(0.005)       # let readers run between swaps
+        finally:
+            done.set()
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def test_readers_see_one_snapshot_during_swaps(data_dir):
+    data_dir, flipper = data_dir
+    expected = expected_results(data_dir, flipper)
+    registry = ReferenceRegistry(str(data_dir), check_interval=0)
+    estimator = CarbonEstimator(registry)
+
+    def read():
+        snapshot = registry.snapshot()
+        tables = estimator.tables(snapshot)
+        mode = tables.mode_code("car_petrol")
+        # Derived tables must belong to the snapshot they were fetched for.
+        assert tables.transport_rows[0][mode] == snapshot.emissions_factors["transport"]["car_petrol_km"]
+        result = estimator.estimate(PROFILE)
+        return snapshot.version, (result["total_kg_co2_year"], result["global_average_kg"])
+
+    def flip(i):
+        flipper.write(1 - i)
+        registry.reload()
+
+    results = run_concurrently(read, flip)
+    assert {pair for _, pair in results} <= expected
+    assert registry.snapshot().version > SWAPS // 2      # the swaps really happened
+    assert len({version for version, _ in results}) > 1
+
+
+def test_derived_tables_built_once_per_snapshot(data_dir):
+    data_dir, flipper = data_dir
+    registry = ReferenceRegistry(str(data_dir), check_interval=0)
+    builds = {}
+    lock = threading.Lock()
+
+    def build(snapshot):
+        with lock:
+            builds[snapshot.version] = builds.get(snapshot.version, 0) + 1
+        return snapshot.emissions_factors["transport"]["car_petrol_km"]
+
+    def read():
+        snapshot = registry.snapshot()
+        value = snapshot.derived("test_car_factor", build)
+        assert value == snapshot.emissions_factors["transport"]["car_petrol_km"]
+        return snapshot
+
+    def flip(i):
+        flipper.write(1 - i)
+        registry.reload()
+
+    snapshots = {snap.version: snap for snap in run_concurrently(read, flip)}
+    assert len(snapshots) > 1
+    assert all(builds[version] == 1 for version in snapshots)
+    # Compiled estimator tables follow the snapshot too: one object per snapshot.
+    estimator = CarbonEstimator(registry)
+    for snapshot in snapshots.values():
+        assert estimator.tables(snapshot) is estimator.tables(snapshot)
+    first, second = sorted(snapshots)[:2]
+    assert estimator.tables(snapshots[first]) is not estimator.tables(snapshots[second])
+
+
+def test_route_answers_from_one_snapshot_during_swaps(data_dir, monkeypatch):
+    from fastapi.testclient import TestClient
+    from api.main import app
+
+    data_dir, flipper = data_dir
+    expected = expected_results(data_dir, flipper)
+    # Point the process-wide registry every service shares at the temp directory.
+    shared = registry_module.reference_data
+    monkeypatch.setattr(shared, "data_dir", str(data_dir))
+    monkeypatch.setattr(shared, "check_interval", 0)
+    monkeypatch.setattr(shared, "_snapshot", None)
+    monkeypatch.setattr(shared, "_stats", {})
+    client = TestClient(app)
+
+    def read():
+        response = client.post("/api/carbon-footprint", json=PROFILE)
+        assert response.status_code == 200
+        body = response.json()
+        return body["total_kg_co2_year"], body["global_average_kg"]
+
+    results = run_concurrently(read, lambda i: flipper.write(1 - i), swaps=10)
+    assert set(results) <= expected
+    assert len(set(results)) == 2       # readers saw both variants
@@ -0,0 +1,80 @@
+"""
+Cached reference responses: GET /api/tips is built from the very snapshot
+whose version it is cached under, and every cached body is served with a
+strong ETag (304 on revalidation) and its precompressed variant.
+"""
+import itertools
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import tips as tips_route
+from data.registry import ReferenceSnapshot, reference_data
+
+_versions = itertools.count(900_000)
+
+
+def snapshot_with(tips: list) -> ReferenceSnapshot:
+    return ReferenceSnapshot(next(_versions), reference_data.snapshot().emissions_factors, tips, {})
+
+
+def tip(i: int, category: str = "energy", tags=("solar",)) -> dict:
+    return {"id": i, "tip": f"tip {i}", "category": category, "impact": "high", "tags": list(tags),
+            "savings_kg_co2_year": 10 * i, "difficulty": "easy"}
+
+
+class SwappingRegistry:
+    """Hands the route `first` once, then `second`: a reload right after the route read its snapshot."""
+
+    def __init__(self, first, second):
+        self._snapshots = iter([first])
+        self._last = second
+
+    def snapshot(self):
+        return next(self._snapshots, self._last)
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+def test_tips_are_built_from_the_snapshot_they_are_cached_under(client, monkeypatch):
+    first = snapshot_with([tip(1), tip(2, "diet", ("food",))])
+    second = snapshot_with([tip(3), tip(4)])
+    monkeypatch.setattr(tips_route, "reference_data", SwappingRegistry(first, second))
+    monkeypatch.setattr(tips_route.advisor, "registry", SwappingRegistry(second, second))
+
+    body = client.get("/api/tips", params={"limit": 50}).json()
+    assert [t["id"] for t in body["tips"]] == [1, 2]
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({"category": "energy"}, [1, 3]),
+    ({"tag": "food"}, [2]),
+    ({"category": "energy", "tag": "wind"}, [3]),
+    ({"category": "nope"}, []),
+    ({"limit": 2}, [1, 2]),
+])
+def test_tip_filters_use_the_snapshot_index(params, expected):
+    snapshot = snapshot_with([tip(1), tip(2, "diet", ("food",)), tip(3, tags=("wind",))])
+    body = tips_route.build_tips(snapshot, params.get("category"), params.get("tag"), params.get("limit", 10))
+    assert [t["id"] for t in json.loads(body)["tips"]] == expected
+
+
+@pytest.mark.parametrize("path", ["/api/tips?category=energy", "/api/dashboard/summary"])
+def test_cached_bodies_revalidate_and_compress(client, path):
+    plain = client.get(path, headers={"accept-encoding": "identity"})
+    assert plain.status_code == 200
+    etag = plain.headers["etag"]
+    assert etag.startswith('"') and "max-age" in plain.headers["cache-control"]
+
+    assert client.get(path, headers={"if-none-match": etag, "accept-encoding": "identity"}).status_code == 304
+    assert client.get(path, headers={"if-none-match": f"W/{etag}", "accept-encoding": "identity"}).status_code == 304
+
+    zipped = client.get(path, headers={"accept-encoding": "gzip"})
+    if zipped.headers.get("content-encoding") == "gzip":
+        assert zipped.headers["etag"] == etag[:-1] + '-gzip"'
+    assert zipped.content == plain.content      # httpx decodes the gzip body
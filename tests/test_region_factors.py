@@ -0,0 +1,111 @@
+"""
+Regional emission factors: each region row overrides only the factors it
+lists, region codes are case-insensitive with a global fallback, single and
+batch estimates agree per region, and the dashboard's region comparison is
+computed from the snapshot it is cached under.
+"""
+import copy
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import dashboard
+from data.registry import ReferenceSnapshot, reference_data
+from models.carbon_estimator import (
+    CATEGORIES, GLOBAL_REGION, SCALAR_FACTORS, CarbonEstimator, FactorTables,
+)
+
+PROFILE = {
+    "transport_mode": "car_electric", "km_per_week": 200, "flights_short_per_year": 2, "flights_long_per_year": 1,
+    "electricity_kwh_month": 350, "natural_gas_kwh_month": 120, "diet_type": "vegetarian",
+    "clothing_items_per_year": 15, "electronics_per_year": 1, "waste_recycling_pct": 45,
+}
+
+
+class StaticRegistry:
+    def __init__(self, factors: dict):
+        self._snapshot = ReferenceSnapshot(1, factors, [], {})
+
+    def snapshot(self):
+        return self._snapshot
+
+
+@pytest.fixture(scope="module")
+def factors():
+    return reference_data.snapshot().emissions_factors
+
+
+def test_regions_override_only_what_they_list(factors):
+    tables = FactorTables(factors)
+    assert tables.regions[0] == GLOBAL_REGION
+    assert tables.regions[1:] == list(factors["regions"])
+    for r, code in enumerate(tables.regions):
+        override = factors["regions"].get(code, {}) if r else {}
+        assert tables.region_average_kg[r] == override.get("average_annual_kg", factors["global_average_annual_kg"])
+        for j, (cat, key) in enumerate(SCALAR_FACTORS):
+            assert tables.scalars[r, j] == override.get(cat, {}).get(key, factors[cat][key])
+        for j, mode in enumerate(tables.transport_modes):
+            key = f"{mode}_km"
+            assert tables.transport_factors[r, j] == override.get("transport", {}).get(key, factors["transport"][key])
+        for j, diet in enumerate(tables.diet_types):
+            key = f"{diet}_daily_kg_co2"
+            assert tables.diet_daily_kg[r, j] == override.get("diet", {}).get(key, factors["diet"][key])
+
+
+def test_region_codes_are_case_insensitive_with_global_fallback(factors):
+    tables = FactorTables(factors)
+    gb = tables.regions.index("GB")
+    assert tables.region_code("GB") == tables.region_code("gb") == tables.region_code("Gb") == gb
+    assert tables.region_code("ATLANTIS") == tables.region_code(None) == tables.region_code("") == 0
+    codes = CarbonEstimator.region_codes({"region": ["gb", "GB", "xx", "global"]}, tables)
+    assert codes.tolist() == [gb, gb, 0, 0]
+
+
+def test_region_changes_only_overridden_terms(factors):
+    estimator = CarbonEstimator()
+    gb = estimator.estimate({**PROFILE, "region": "gb"})
+    base = estimator.estimate(PROFILE)
+    assert gb["region"] == "GB" and base["region"] == GLOBAL_REGION
+    assert gb["region_average_kg"] == factors["regions"]["GB"]["average_annual_kg"]
+    expected_energy = PROFILE["electricity_kwh_month"] * 12 * factors["regions"]["GB"]["energy"]["electricity_kwh"] + \
+        PROFILE["natural_gas_kwh_month"] * 12 * factors["energy"]["natural_gas_kwh"]
+    assert gb["breakdown"]["energy"] == round(expected_energy, 1)
+    overridden = {cat for cat in CATEGORIES if cat in factors["regions"]["GB"]}
+    for cat in set(CATEGORIES) - overridden:
+        assert gb["breakdown"][cat] == base["breakdown"][cat]
+
+
+def test_batch_matches_single_estimates_for_every_region(factors):
+    estimator = CarbonEstimator()
+    regions = [GLOBAL_REGION, "unknown", None] + [code.lower() for code in factors["regions"]]
+    columns = {field: [value] * len(regions) for field, value in PROFILE.items()}
+    columns["region"] = [r if r is not None else "" for r in regions]
+    batch = estimator.estimate_batch(columns)
+    for i, region in enumerate(regions):
+        single = estimator.estimate({**PROFILE, "region": region})
+        assert batch["total_kg_co2_year"][i] == single["total_kg_co2_year"]
+        assert batch["region"][i] == single["region"]
+        assert batch["region_average_kg"][i] == single["region_average_kg"]
+        for cat in CATEGORIES:
+            assert batch["breakdown"][cat][i] == single["breakdown"][cat]
+
+
+def test_region_comparison_uses_the_given_snapshot(factors):
+    edited = copy.deepcopy(factors)
+    edited["regions"]["GB"]["energy"]["electricity_kwh"] *= 2
+    snapshot = ReferenceSnapshot(-1, edited, [], {})
+    rows = {row["region"]: row for row in dashboard.compare_regions(snapshot)}
+
+    expected = CarbonEstimator(StaticRegistry(edited))
+    default_profile = dashboard.CarbonInput().model_dump(exclude={"cohort", "region"})
+    assert rows["GB"]["electricity_kg_per_kwh"] == edited["regions"]["GB"]["energy"]["electricity_kwh"]
+    assert rows["GB"]["reference_profile_kg"] == expected.estimate({**default_profile, "region": "GB"})["total_kg_co2_year"]
+    assert rows["GB"]["reference_profile_kg"] != \
+        CarbonEstimator().estimate({**default_profile, "region": "GB"})["total_kg_co2_year"]
+
+
+def test_carbon_footprint_route_reports_the_region():
+    body = TestClient(app).post("/api/carbon-footprint", json={**PROFILE, "region": "fr"}).json()
+    assert body["region"] == "FR"
+    assert body["region_average_kg"] == reference_data.snapshot().emissions_factors["regions"]["FR"]["average_annual_kg"]
@@ -0,0 +1,105 @@
+"""
+What-if scenario engine: incremental evaluation must equal a full estimate
+of the changed profile, custom specs are validated, and the number of tip
+combinations stays bounded however large the tip catalogue grows.
+"""
+import pytest
+
+from data.registry import ReferenceSnapshot, reference_data
+from models import scenario_engine as engine_module
+from models.carbon_estimator import CarbonEstimator, INPUT_DEFAULTS
+from models.eco_advisor import EcoAdvisor
+from models.scenario_engine import ScenarioEngine, apply_spec, validate_spec
+from models.sustainability_score import SustainabilityScorer
+
+PROFILE = {
+    "transport_mode": "car_petrol", "km_per_week": 300, "flights_short_per_year": 4, "flights_long_per_year": 2,
+    "electricity_kwh_month": 450, "natural_gas_kwh_month": 300, "diet_type": "meat_heavy",
+    "clothing_items_per_year": 40, "electronics_per_year": 3, "waste_recycling_pct": 10,
+}
+NUMERIC_FIELDS = [f for f in INPUT_DEFAULTS if f not in ("transport_mode", "diet_type", "region")]
+
+
+class StaticRegistry:
+    """Real emission factors, custom tip catalogue."""
+
+    def __init__(self, tips: list):
+        self._snapshot = ReferenceSnapshot(1, reference_data.snapshot().emissions_factors, tips, {})
+
+    def snapshot(self):
+        return self._snapshot
+
+
+def engine_with(tips: list) -> ScenarioEngine:
+    registry = StaticRegistry(tips)
+    return ScenarioEngine(CarbonEstimator(registry), SustainabilityScorer(registry), EcoAdvisor(registry))
+
+
+def many_tips(per_field: int) -> list:
+    """per_field saving tips for every numeric field: a catalogue far larger than the shipped one."""
+    tips = []
+    for field in NUMERIC_FIELDS:
+        for k in range(per_field):
+            spec = {"add": {field: 10.0}} if field == "waste_recycling_pct" else {"scale": {field: 0.9 - 0.05 * k}}
+            tips.append({"id": len(tips), "tip": f"{field} {k}", "category": "general", "impact": "low",
+                         "scenario": spec})
+    return tips
+
+
+def test_incremental_evaluation_matches_full_estimate():
+    engine = ScenarioEngine()
+    estimator = engine.estimator
+    specs = [
+        {"set": {"transport_mode": "train"}},
+        {"scale": {"km_per_week": 0.5}, "add": {"flights_long_per_year": -1}},
+        {"set": {"diet_type": "vegan", "region": "GB"}},
+        {"add": {"waste_recycling_pct": 200}},           # clamped to 100
+        {"scale": {"clothing_items_per_year": 0.33}},   # truncated to an int
+    ]
+    result = engine.evaluate(PROFILE, [{"specs": [spec]} for spec in specs])
+    for i, spec in enumerate(specs):
+        changed = {**PROFILE, **apply_spec(PROFILE, spec)}
+        assert result["total"][i] == estimator.estimate(changed)["total_kg_co2_year"], spec
+
+
+@pytest.mark.parametrize("spec", [
+    {"set": {"km_per_week": "abc"}},
+    {"set": {"km_per_week": None}},
+    {"set": {"km_per_week": float("inf")}},
+    {"set": {"transport_mode": "rocket"}},
+    {"set": {"diet_type": 3}},
+    {"set": {"region": 3}},
+    {"scale": {"km_per_week": float("nan")}},
+    {"scale": {"diet_type": 0.5}},
+    {"set": {"unknown_field": 1}},
+    {"replace": {}},
+])
+def test_invalid_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        validate_spec(spec, CarbonEstimator().tables())
+
+
+def test_tip_combinations_are_capped(monkeypatch):
+    tips = many_tips(per_field=6)       # 54 saving tips: C(54, 3) would be ~25000 triples
+    engine = engine_with(tips)
+    result = engine.rank(PROFILE, max_combination_size=3, top_n=5)
+    assert result["evaluated"] <= max(engine_module.MAX_CANDIDATES, len(tips))
+    assert result["scenarios"]
+
+    monkeypatch.setattr(engine_module, "MAX_COMBINED_TIPS", 4)
+    monkeypatch.setattr(engine_module, "MAX_CANDIDATES", 60)
+    capped = engine.rank(PROFILE, max_combination_size=3, top_n=5)
+    assert capped["evaluated"] <= 60
+    # Every combined scenario uses only the 4 best single tips.
+    single = engine.evaluate(PROFILE, engine.tip_scenarios())
+    best = {tips[i]["id"] for i in sorted(range(len(tips)), key=lambda i: single["total"][i])[:4]}
+    for scenario in capped["scenarios"]:
+        if len(scenario["tip_ids"]) > 1:
+            assert set(scenario["tip_ids"]) <= best
+
+
+def test_shipped_catalogue_ranks_best_savings_first():
+    result = ScenarioEngine().rank(PROFILE, max_combination_size=2, top_n=10)
+    saved = [s["saved_kg_co2_year"] for s in result["scenarios"]]
+    assert saved and saved == sorted(saved, reverse=True)
+    assert all(s > 0 for s in saved)
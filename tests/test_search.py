@@ -0,0 +1,83 @@
+"""
+Cross-validated parameter search: trial R² equals sklearn on the same folds,
+process-pool and in-process runs agree, clearly worse trials stop early,
+and pick() trades a little accuracy for the cheapest model to serve.
+"""
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import r2_score
+
+from models.search import GRID, grid_trials, pick, random_trials, search, share_arrays
+
+GOOD = {"n_estimators": 8, "max_depth": 8, "min_samples_leaf": 1, "max_features": 1.0}
+POOR = {"n_estimators": 2, "max_depth": 1, "min_samples_leaf": 1, "max_features": 1.0}
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(0, 40, 600), rng.uniform(10, 95, 600), rng.integers(0, 24, 600)])
+    y = np.sin(X[:, 2] / 24 * 2 * np.pi) * 2 + 0.05 * X[:, 0] + rng.normal(0, 0.1, 600)
+    return X, y
+
+
+def test_trial_grid_and_random_draws():
+    trials = grid_trials()
+    assert len(trials) == np.prod([len(v) for v in GRID.values()])
+    assert len({tuple(t.values()) for t in trials}) == len(trials)
+    assert random_trials(5, seed=1) == random_trials(5, seed=1)
+    assert random_trials(5, seed=1) != random_trials(5, seed=2)
+
+
+def test_share_arrays_writes_balanced_folds(data, tmp_path):
+    X, y = data
+    share_arrays(X, y, folds=4, seed=3, directory=str(tmp_path))
+    fold = np.load(os.path.join(tmp_path, "fold.npy"))
+    assert np.bincount(fold).tolist() == [150] * 4
+    np.testing.assert_array_equal(np.load(os.path.join(tmp_path, "X.npy")), X)
+
+
+def test_r2_matches_sklearn_on_the_same_folds(data, tmp_path):
+    X, y = data
+    [result] = search(X, y, [GOOD], folds=3, seed=5)
+    assert result["folds_run"] == 3 and not result["stopped_early"]
+    assert result["nodes"] > 0 and result["predict_one_us"] > 0
+
+    share_arrays(X, y, folds=3, seed=5, directory=str(tmp_path))
+    fold = np.load(os.path.join(tmp_path, "fold.npy"))
+    scores = []
+    for k in range(3):
+        test = fold == k
+        model = RandomForestRegressor(random_state=5, n_jobs=1, **GOOD).fit(X[~test], y[~test])
+        scores.append(r2_score(y[test], model.predict(X[test])))
+    assert result["r2_mean"] == round(float(np.mean(scores)), 4)
+    assert result["r2_std"] == round(float(np.std(scores)), 4)
+
+
+def test_process_pool_matches_in_process(data):
+    X, y = data
+    trials = [GOOD, dict(GOOD, max_depth=4)]
+    serial = search(X, y, trials, folds=3, workers=1, early_stop_margin=float("inf"))
+    pooled = search(X, y, trials, folds=3, workers=2, early_stop_margin=float("inf"))
+    assert [(r["params"], r["r2_mean"]) for r in pooled] == [(r["params"], r["r2_mean"]) for r in serial]
+
+
+def test_clearly_worse_trial_stops_early_and_sorts_last(data):
+    X, y = data
+    results = search(X, y, [GOOD, POOR], folds=4, workers=1, early_stop_margin=0.05)
+    assert [r["params"] for r in results] == [GOOD, POOR]
+    assert not results[0]["stopped_early"] and results[0]["folds_run"] == 4
+    assert results[1]["stopped_early"] and results[1]["folds_run"] == 1
+
+
+def test_pick_prefers_the_cheapest_within_tolerance():
+    def record(r2, one_us, stopped=False):
+        return {"r2_mean": r2, "predict_one_us": one_us, "predict_batch_us_per_row": 1.0, "stopped_early": stopped}
+
+    results = [record(0.95, 90.0), record(0.947, 40.0), record(0.93, 5.0), record(0.99, 1.0, stopped=True)]
+    best, cheapest = pick(results, r2_tolerance=0.005)
+    assert best is results[0]
+    assert cheapest is results[1]
@@ -0,0 +1,145 @@
+"""
+Submission store: the write-behind aggregates always equal a GROUP BY over
+the logged rows, across batches and across writers sharing one file, and
+summary() reports them per dimension and re-reads only when meta.seq moves.
+"""
+import sqlite3
+
+import numpy as np
+import pytest
+
+from data import submissions as submissions_module
+from data.submissions import SubmissionStore
+from models.carbon_estimator import CATEGORIES
+
+MODES = ["car_petrol", "bus", "train", None]
+DIETS = ["vegan", "meat_heavy"]
+REGIONS = ["GB", "US", None]
+
+
+def grade_of(total_kg: float, breakdown: dict) -> str:
+    return "A" if total_kg < 5000 else "C"
+
+
+def submit(store: SubmissionStore, n: int, seed: int = 0) -> list:
+    """Record n random submissions (some without a grade); returns what was recorded."""
+    rng = np.random.default_rng(seed)
+    recorded = []
+    for i in range(n):
+        breakdown = {cat: round(float(rng.uniform(100, 3000)), 1) for cat in CATEGORIES}
+        total = round(sum(breakdown.values()), 1)
+        row = {
+            "total_kg": total, "breakdown": breakdown, "grade": None if i % 3 == 0 else "B",
+            "region": REGIONS[i % len(REGIONS)], "transport_mode": MODES[i % len(MODES)],
+            "diet_type": DIETS[i % len(DIETS)],
+        }
+        store.record("/api/carbon-footprint", {"cohort": "acme", "km_per_week": i}, **row)
+        recorded.append(row)
+    return recorded
+
+
+def aggregates(path: str) -> dict:
+    with sqlite3.connect(path) as conn:
+        return {(r[0], r[1]): r[2:] for r in conn.execute("SELECT * FROM aggregates WHERE dimension != 'day'")}
+
+
+def group_by(path: str) -> dict:
+    """The aggregates recomputed from the submissions log."""
+    sums = ", ".join(f"SUM({cat}_kg)" for cat in CATEGORIES)
+    expected = {}
+    with sqlite3.connect(path) as conn:
+        expected[("all", "all")] = conn.execute(f"SELECT COUNT(*), SUM(total_kg), {sums} FROM submissions").fetchone()
+        for dimension in ("transport_mode", "diet_type", "grade", "region"):
+            query = (f"SELECT {dimension}, COUNT(*), SUM(total_kg), {sums} FROM submissions "
+                     f"WHERE {dimension} IS NOT NULL GROUP BY {dimension}")
+            for key, *values in conn.execute(query):
+                expected[(dimension, key)] = tuple(values)
+    return expected
+
+
+def assert_aggregates_match_log(path: str):
+    actual, expected = aggregates(path), group_by(path)
+    assert actual.keys() == expected.keys()
+    for key, values in expected.items():
+        assert actual[key][0] == values[0]
+        assert actual[key][1:] == pytest.approx(values[1:], rel=1e-9)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SubmissionStore(str(tmp_path / "submissions.db"), grade=grade_of, flush_interval=0.0)
+    yield store
+    store.close()
+
+
+def test_aggregates_match_the_log_across_batches(store, monkeypatch):
+    monkeypatch.setattr(submissions_module, "FLUSH_ROWS", 7)
+    recorded = submit(store, 100)
+    store.close()
+    assert_aggregates_match_log(store.path)
+
+    with sqlite3.connect(store.path) as conn:
+        seq = conn.execute("SELECT value FROM meta WHERE name = 'seq'").fetchone()[0]
+        grades = dict(conn.execute("SELECT grade, COUNT(*) FROM submissions GROUP BY grade"))
+    assert seq >= 100 // 7
+    expected_grades = {}
+    for row in recorded:
+        grade = row["grade"] or grade_of(row["total_kg"], row["breakdown"])
+        expected_grades[grade] = expected_grades.get(grade, 0) + 1
+    assert grades == expected_grades
+
+
+def test_summary_reports_every_dimension(store):
+    recorded = submit(store, 60, seed=1)
+    store.close()
+    summary = store.summary()
+    assert summary["count"] == 60
+    assert summary["mean_kg"] == pytest.approx(sum(r["total_kg"] for r in recorded) / 60, abs=0.01)
+    for dimension, values in (("transport_mode", MODES), ("diet_type", DIETS), ("region", REGIONS)):
+        group = summary[f"by_{dimension}"]
+        assert set(group) == {v for v in values if v is not None}
+        for key, stats in group.items():
+            rows = [r for r in recorded if r[dimension] == key]
+            assert stats["count"] == len(rows)
+            assert stats["sum_kg"] == pytest.approx(sum(r["total_kg"] for r in rows), abs=0.01)
+    assert sum(day["count"] for day in summary["by_day"].values()) == 60
+
+
+def test_writers_sharing_a_file_add_up(tmp_path):
+    path = str(tmp_path / "shared.db")
+    stores = [SubmissionStore(path, grade=grade_of, flush_interval=0.0) for _ in range(2)]
+    for seed, store in enumerate(stores):
+        submit(store, 40, seed=seed)
+    for store in stores:
+        store.close()
+    assert_aggregates_match_log(path)
+    assert aggregates(path)[("all", "all")][0] == 80
+
+
+def test_summary_is_cached_until_seq_moves(store):
+    submit(store, 5)
+    store.close()
+    first = store.summary()
+    assert store.summary() is first
+    submit(store, 5, seed=2)
+    store.close()
+    second = store.summary()
+    assert second["seq"] > first["seq"] and second["count"] == 10
+
+
+def test_summary_without_a_database(tmp_path):
+    store = SubmissionStore(str(tmp_path / "missing.db"), flush_interval=0.0)
+    assert store.summary()["count"] == 0
+
+
+def test_databases_without_a_region_column_are_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        columns = ", ".join(f"{cat}_kg REAL" for cat in CATEGORIES)
+        conn.execute(f"CREATE TABLE submissions (id INTEGER PRIMARY KEY, ts REAL NOT NULL, endpoint TEXT NOT NULL, "
+                     f"cohort TEXT, transport_mode TEXT, diet_type TEXT, grade TEXT, total_kg REAL NOT NULL, "
+                     f"{columns}, inputs TEXT NOT NULL)")
+    store = SubmissionStore(path, flush_interval=0.0)
+    submit(store, 3)
+    store.close()
+    assert store.summary()["by_region"]["GB"]["count"] == 1
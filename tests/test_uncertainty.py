@@ -0,0 +1,87 @@
+"""
+Monte Carlo uncertainty bands: a seed reproduces its bands exactly, the
+lognormal multipliers are mean-preserving, and with zero uncertainty every
+band collapses onto CarbonEstimator's point estimate.
+"""
+import numpy as np
+import pytest
+
+from data.registry import ReferenceSnapshot, reference_data
+from models.carbon_estimator import CarbonEstimator, CATEGORIES
+from models.uncertainty import UncertaintyEstimator, lognormal_multipliers, sorted_percentiles
+
+PROFILE = {
+    "transport_mode": "car_diesel", "km_per_week": 250, "flights_short_per_year": 3, "flights_long_per_year": 1,
+    "electricity_kwh_month": 380, "natural_gas_kwh_month": 150, "diet_type": "meat_medium",
+    "clothing_items_per_year": 25, "electronics_per_year": 2, "waste_recycling_pct": 35, "region": "GB",
+}
+
+
+class StaticRegistry:
+    """Real emission factors with a custom "uncertainty" block."""
+
+    def __init__(self, uncertainty: dict):
+        factors = dict(reference_data.snapshot().emissions_factors, uncertainty=uncertainty)
+        self._snapshot = ReferenceSnapshot(1, factors, [], {})
+
+    def snapshot(self):
+        return self._snapshot
+
+
+def test_same_seed_reproduces_bands():
+    uncertainty = UncertaintyEstimator()
+    first = uncertainty.estimate(PROFILE, samples=5000, seed=42)
+    assert uncertainty.estimate(PROFILE, samples=5000, seed=42) == first
+    assert uncertainty.estimate(PROFILE, samples=5000, seed=43) != first
+
+
+def test_returned_seed_reproduces_unseeded_run():
+    uncertainty = UncertaintyEstimator()
+    result = uncertainty.estimate(PROFILE, samples=2000)
+    assert isinstance(result["seed"], int)
+    assert uncertainty.estimate(PROFILE, samples=2000, seed=result["seed"]) == result
+
+
+def test_bands_are_ordered_and_centred_on_the_point_estimate():
+    point = CarbonEstimator().estimate(PROFILE)
+    result = UncertaintyEstimator().estimate(PROFILE, samples=100_000, seed=7)
+    assert result["samples"] == 100_000
+    assert result["percentiles"] == [5.0, 50.0, 95.0]
+    for band, expected in [(result["total"], point["total_kg_co2_year"])] + [
+        (result["breakdown"][c], point["breakdown"][c]) for c in CATEGORIES
+    ]:
+        assert band["p5"] <= band["p50"] <= band["p95"]
+        # Multipliers are mean-preserving, so the Monte Carlo mean tracks the point estimate.
+        assert band["mean"] == pytest.approx(expected, rel=0.02, abs=0.5)
+
+
+def test_zero_uncertainty_collapses_to_point_estimate():
+    registry = StaticRegistry({})
+    estimator = CarbonEstimator(registry)
+    point = estimator.estimate(PROFILE)
+    result = UncertaintyEstimator(estimator).estimate(PROFILE, samples=500, seed=1)
+    for cat in CATEGORIES:
+        band = result["breakdown"][cat]
+        assert band["p5"] == band["p50"] == band["p95"] == pytest.approx(point["breakdown"][cat], abs=0.2)
+    assert result["total"]["p50"] == pytest.approx(point["total_kg_co2_year"], abs=0.2)
+
+
+def test_custom_percentiles_are_reported():
+    result = UncertaintyEstimator().estimate(PROFILE, samples=1000, seed=3, percentiles=(10, 90))
+    assert result["percentiles"] == [10.0, 90.0]
+    assert set(result["total"]) == {"mean", "p10", "p90"}
+
+
+def test_lognormal_multipliers_are_mean_preserving():
+    cv = np.array([0.0, 0.1, 0.3, 0.5])
+    m = lognormal_multipliers(np.random.default_rng(0), cv, 200_000)
+    assert m.shape == (4, 200_000) and m.dtype == np.float32
+    assert np.all(m[0] == 1.0)
+    np.testing.assert_allclose(m.mean(axis=1), 1.0, atol=0.01)
+    np.testing.assert_allclose(m.std(axis=1) / m.mean(axis=1), cv, atol=0.01)
+
+
+def test_sorted_percentiles_matches_numpy():
+    values = np.random.default_rng(5).gamma(2.0, 100.0, size=(3, 1001))
+    percentiles = (0, 2.5, 50, 97.5, 100)
+    np.testing.assert_allclose(sorted_percentiles(values, percentiles), np.percentile(values, percentiles, axis=1))